@@ -1,16 +1,22 @@
+import os
+
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from app import create_app
+from app import create_app, start_background_services
 from app.models.database import db
 
-# Create app instance
-app = create_app()
-
 if __name__ == "__main__":
+    # Created here, not at import: OCR pool workers are spawned processes that
+    # re-import this module, and must not build an app of their own
+    app = create_app()
+
     # Initialize database tables
     with app.app_context():
         db.create_all()
 
+    # With the reloader on, only the child process that serves requests runs them
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_services()
     app.run(debug=True, host="0.0.0.0", port=5000)
@@ -1,7 +1,11 @@
+import hmac
+import multiprocessing
+
 from dotenv import load_dotenv
-from flask import Flask
+from flask import Flask, jsonify, request, session
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from sqlalchemy import text
 
 # Load environment variables
 load_dotenv()
@@ -19,6 +23,11 @@ from app.routes.user import user_bp
 from app.routes.admin import admin_bp
 from app.routes.chatbot import chatbot_bp
 from app.routes.feedback import feedback_bp
+from app.routes.jobs import jobs_bp
+from app.routes import chatbot
+from app.ai_models import llm_client, ocr_engine
+from app.ai_models.registry import registry
+from app.utils import jobs, sentiment_analyzer, sentiment_labeller
 from config import Config
 
 # Import Firebase initialization
@@ -49,16 +58,92 @@ def create_app():
     app.register_blueprint(admin_bp)
     app.register_blueprint(chatbot_bp)
     app.register_blueprint(feedback_bp)
+    app.register_blueprint(jobs_bp)
+
+    # Background job workers and the sentiment labeller need the app to push a context.
+    # They are started by start_background_services(), not here: scripts call create_app() too.
+    jobs.init_app(app)
+    sentiment_labeller.init_app(app)
 
     # Health check route
     @app.route('/api/health', methods=['GET'])
     def health_check():
-        from flask import jsonify
-        return jsonify({'status': 'healthy', 'message': 'TOEFL Learning API is running'}), 200
+        return jsonify({
+            'status': 'healthy',
+            'message': 'TOEFL Learning API is running',
+            'subsystems': subsystem_readiness()
+        }), 200
+
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics():
+        # Internal numbers (queue depths, cache sizes, model memory): admin session,
+        # METRICS_TOKEN, or METRICS_PUBLIC=true
+        if not metrics_allowed():
+            return jsonify({'error': 'Unauthorized'}), 401
+        from app.utils.metrics import snapshot
+        return jsonify(snapshot()), 200
 
     @app.route('/', methods=['GET'])
     def home():
-        from flask import jsonify
         return jsonify({'status': 'healthy', 'message': 'TOEFL Learning API is running'}), 200
 
     return app
+
+
+def start_background_services():
+    """
+    Start the long-running threads of a server process and the model warm-up.
+    Only server entry points call this (app.py and gunicorn.conf.py), so CLI
+    scripts never claim jobs. It is a no-op in child processes (e.g. OCR pool
+    workers), which would otherwise claim jobs and spawn pools of their own.
+    """
+    if multiprocessing.parent_process() is not None:
+        return
+
+    if Config.JOB_WORKERS_AUTOSTART:
+        # Workers poll the jobs table, so jobs left queued by a restart are picked up
+        jobs.start_workers()
+    if Config.SENTIMENT_LABEL_ON_START:
+        # Feedback left Pending by a restart is labelled without waiting for new submissions
+        sentiment_labeller.start()
+
+    # Models load lazily on first use; optionally start loading them now in the background
+    warm_up_models = [m.strip() for m in Config.WARMUP_MODELS.split(',') if m.strip()]
+    if warm_up_models == ['all']:
+        warm_up_models = registry.names()
+    if Config.OCR_ENGINE == 'pool' and 'ocr_reader' in warm_up_models:
+        # OCR runs in worker processes; warm those instead of an in-process reader
+        warm_up_models.remove('ocr_reader')
+        ocr_engine.get_engine()
+    if warm_up_models:
+        registry.start_background_warm_up(warm_up_models)
+
+
+def metrics_allowed():
+    """True for a logged-in admin, a matching X-Metrics-Token header, or METRICS_PUBLIC."""
+    if Config.METRICS_PUBLIC or session.get('admin_logged_in'):
+        return True
+    token = request.headers.get('X-Metrics-Token', '')
+    return bool(Config.METRICS_TOKEN) and hmac.compare_digest(token, Config.METRICS_TOKEN)
+
+
+def subsystem_readiness():
+    """Per-subsystem readiness; AI models report 'ready' only once loaded."""
+    try:
+        db.session.execute(text('SELECT 1'))
+        database = 'ready'
+    except Exception as e:
+        database = f'error: {e}'
+
+    model_stats = registry.stats()
+    return {
+        'database': database,
+        'models': {
+            name: 'ready' if info['loaded'] else 'not_loaded'
+            for name, info in model_stats['models'].items()
+        },
+        'warm_up': model_stats['warm_up'],
+        'llm_client': 'ready' if llm_client.is_ready() else 'not_loaded',
+        'chatbot': 'ready' if chatbot.is_ready() else 'not_loaded',
+        'sentiment_remote': 'ready' if sentiment_analyzer.remote.stats()['connected'] else 'not_loaded',
+    }
@@ -1,43 +1,67 @@
-import os
+# ===== SHARED MODELS =====
+# LanguageTool, the embedder and model.pkl are loaded once per process by the
+# registry, on first use.
+from app.ai_models.registry import (
+    get_embedder,
+    get_examiner_model,
+    get_language_tool,
+)
 
-import joblib
-import language_tool_python
-from sentence_transformers import SentenceTransformer, util
 
-# ===== LOAD TOOLS =====
-tool = language_tool_python.LanguageTool("en-US")
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
-
-# ===== LOAD MODEL =====
-base_dir = os.path.dirname(os.path.abspath(__file__))
-model_path = os.path.join(base_dir, "model.pkl")
-model = joblib.load(model_path)
+def pairwise_cos_sim(a, b):
+    # sentence_transformers is imported on first use, like the models themselves
+    from sentence_transformers import util
+    return util.pairwise_cos_sim(a, b)
 
 
 # FEATURE EXTRACTION
-def extract_features(question, answer):
-    grammar_errors = len(tool.check(answer))
-
-    words = answer.split()
-    word_count = len(words)
-    lexical_ratio = len(set(words)) / max(1, word_count)
-
-    q_emb = embedder.encode(question)
-    a_emb = embedder.encode(answer)
-    relevance = util.cos_sim(q_emb, a_emb).item()
-
-    content_score = min(1.0, word_count / 60)
+def extract_features_batch(pairs):
+    """
+    Extract features for many (question, answer) pairs at once.
+    All questions and answers are embedded in a single batched encoder pass.
+    """
+    if not pairs:
+        return [], []
+
+    tool = get_language_tool()
+    embedder = get_embedder()
+
+    # Encode every distinct text once (questions are often shared)
+    texts = list(dict.fromkeys(text for pair in pairs for text in pair))
+    position = {text: i for i, text in enumerate(texts)}
+    embeddings = embedder.encode(texts, convert_to_tensor=True)
+
+    q_embs = embeddings[[position[q] for q, _ in pairs]]
+    a_embs = embeddings[[position[a] for _, a in pairs]]
+    relevances = pairwise_cos_sim(q_embs, a_embs).tolist()
+
+    all_features = []
+    all_diagnostics = []
+    for (question, answer), relevance in zip(pairs, relevances):
+        grammar_errors = len(tool.check(answer))
+
+        words = answer.split()
+        word_count = len(words)
+        lexical_ratio = len(set(words)) / max(1, word_count)
+
+        content_score = min(1.0, word_count / 60)
+
+        all_features.append(
+            [grammar_errors, word_count, lexical_ratio, relevance, content_score]
+        )
+        all_diagnostics.append({
+            "grammar_errors": grammar_errors,
+            "lexical_ratio": lexical_ratio,
+            "relevance": relevance,
+            "word_count": word_count,
+        })
+
+    return all_features, all_diagnostics
 
-    features = [grammar_errors, word_count, lexical_ratio, relevance, content_score]
 
-    diagnostics = {
-        "grammar_errors": grammar_errors,
-        "lexical_ratio": lexical_ratio,
-        "relevance": relevance,
-        "word_count": word_count,
-    }
-
-    return features, diagnostics
+def extract_features(question, answer):
+    features, diagnostics = extract_features_batch([(question, answer)])
+    return features[0], diagnostics[0]
 
 
 # SCORING FEEDBACK (DIAGNOSTIC)
@@ -150,11 +174,7 @@ def get_reference_answer(answer: str):
 
 
 # MAIN EVALUATION FUNCTION
-def evaluate(question, answer):
-    features, diag = extract_features(question, answer)
-
-    raw_score = model.predict([features])[0]
-
+def build_result(raw_score, diag, answer):
     # Scale from 0–5 → IELTS 0–9
     ielts_score = (raw_score / 5.0) * 9.0
     score = round(ielts_score * 2) / 2
@@ -181,3 +201,28 @@ def evaluate(question, answer):
         "pro_tips": pro_tips,
         "reference_answer": reference_answer,
     }
+
+
+def evaluate_batch(pairs):
+    """
+    Score a list of (question, answer) pairs with one embedder pass and one
+    RandomForest prediction. Identical pairs are scored once. Results are
+    returned in input order.
+    """
+    pairs = [tuple(pair) for pair in pairs]
+    if not pairs:
+        return []
+
+    unique = list(dict.fromkeys(pairs))
+    features, diagnostics = extract_features_batch(unique)
+    raw_scores = get_examiner_model().predict(features)
+
+    results = {
+        pair: build_result(raw_score, diag, pair[1])
+        for raw_score, diag, pair in zip(raw_scores, diagnostics, unique)
+    }
+    return [dict(results[pair]) for pair in pairs]
+
+
+def evaluate(question, answer):
+    return evaluate_batch([(question, answer)])[0]
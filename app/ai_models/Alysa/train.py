@@ -1,46 +1,28 @@
+import os
+import sys
+
 import pandas as pd
 import joblib
-import language_tool_python
-import numpy as np
 
-from sentence_transformers import SentenceTransformer, util
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error
 
+# Allow running as `python train.py` from this folder
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
 
 # ===== INIT =====
-tool = language_tool_python.LanguageTool("en-US")
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
-
-
-def extract_features(question, answer):
-    grammar_errors = len(tool.check(answer))
-
-    words = answer.split()
-    word_count = len(words)
-    lexical_ratio = len(set(words)) / max(1, word_count)
-
-    q_emb = embedder.encode(question)
-    a_emb = embedder.encode(answer)
-    relevance = util.cos_sim(q_emb, a_emb).item()
-
-    content_score = min(1.0, word_count / 60)
-
-    return [
-        grammar_errors,
-        word_count,
-        lexical_ratio,
-        relevance,
-        content_score
-    ]
+# Feature extraction (and the LanguageTool / embedder it needs) is shared with
+# the examiner through the model registry, so training and serving use the
+# exact same features.
+from app.ai_models.Alysa.examiner import extract_features
 
 
 # ===== LOAD DATA =====
 df = pd.read_csv("dataset.csv")
 
 X = df.apply(
-    lambda r: extract_features(r["question"], r["answer"]),
+    lambda r: extract_features(r["question"], r["answer"])[0],
     axis=1
 ).tolist()
 
@@ -70,4 +52,4 @@ joblib.dump(model, "model.pkl")
 
 print("Model saved as model.pkl")
 print("Current dir:", os.getcwd())
-print("Files:", os.listdir("."))
\ No newline at end of file
+print("Files:", os.listdir("."))
@@ -1,16 +1,16 @@
 # AI TOEFL Feedback Generator
 import re
 
-import language_tool_python
-import torch
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import util
+
+from app.ai_models.registry import get_embedder, get_language_tool
 
 
 def ai_toefl_feedback(essay_text):
     # ------------------------------------------------------------
     # 1. Grammar Check (LanguageTool)
     # ------------------------------------------------------------
-    tool = language_tool_python.LanguageTool('en-US')
+    tool = get_language_tool()
     matches = tool.check(essay_text)
     corrected = tool.correct(essay_text)
     grammar_errors = len(matches)
@@ -34,7 +34,7 @@ def ai_toefl_feedback(essay_text):
     avg_coherence = 0.0
 
     if len(sentences) > 1:
-        model = SentenceTransformer('all-MiniLM-L6-v2')
+        model = get_embedder()
         embeddings = model.encode(sentences, convert_to_tensor=True)
 
         sims = []
@@ -43,9 +43,6 @@ def ai_toefl_feedback(essay_text):
             sims.append(sim)
 
         avg_coherence = sum(sims) / len(sims)
-        del model
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
 
     # ------------------------------------------------------------
     # 3. AI-Style Scoring (Heuristic)
@@ -69,7 +66,6 @@ def ai_toefl_feedback(essay_text):
     # ------------------------------------------------------------
     # 5. Return Structured Output
     # ------------------------------------------------------------
-    tool.close()
     return {
         "original": essay_text.strip(),
         "corrected": corrected.strip(),
@@ -1,17 +1,45 @@
 # feedback-model-gemini.py
+import hashlib
 import json
-from google import genai
+import re
 
-def ai_toefl_feedback(essay_text, mode="learning"):
-    """
-    English evaluator for mobile app with separate modes for learning and testing.
-    """
+from app.ai_models import llm_client
+from app.utils.cache import build_cache
+from app.utils.concurrency import map_bounded
+from app.utils.json_stream import JsonStreamParser
+from config import Config
 
-    try:
-        client = genai.Client()
+MODEL_NAME = llm_client.DEFAULT_MODEL
+
+# Bump the version whenever a prompt template changes so cached feedback
+# produced by the old prompt is no longer served.
+PROMPT_VERSIONS = {"test": 1, "learning": 1}
+
+_cache = build_cache(
+    "gemini",
+    backend=Config.GEMINI_CACHE_BACKEND,
+    ttl=Config.GEMINI_CACHE_TTL
+)
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different resubmissions share a cache entry."""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def feedback_cache_key(essay_text, mode):
+    payload = json.dumps([
+        mode,
+        PROMPT_VERSIONS.get(mode, PROMPT_VERSIONS["learning"]),
+        normalize_text(essay_text),
+        MODEL_NAME
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-        if mode == "test":
-            prompt = f"""
+
+def build_prompt(essay_text, mode):
+    if mode == "test":
+        return f"""
 Act as an official IELTS/TOEFL Examiner. 
 Evaluate the following student response and provide feedback that is scannable and educational.
 
@@ -39,8 +67,8 @@ Rules:
 - Ensure 'suggested_correction' is a complete, improved version of the response.
 - Score MUST be between 0.0 and 9.0 (IELTS band scale).
 """
-        else:  # learning mode
-            prompt = f"""
+    # learning mode
+    return f"""
 Act as a friendly English Tutor for a learning app. 
 Focus on immediate correction and encouragement.
 
@@ -56,74 +84,152 @@ Output ONLY a JSON object:
 }}
 """
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", 
-            contents=prompt
-        )
 
-        response_text = response.text.strip()
-        print(f"Gemini Response: {response_text[:100]}...") # Debug log
+def parse_feedback(response_text, mode):
+    """Extract the JSON object from Gemini's reply and fill in safe defaults."""
+    response_text = response_text.strip()
+    print(f"Gemini Response: {response_text[:100]}...") # Debug log
 
-        # Extract JSON logic
-        json_start = response_text.find("{")
-        json_end = response_text.rfind("}") + 1
+    # Extract JSON logic
+    json_start = response_text.find("{")
+    json_end = response_text.rfind("}") + 1
+    
+    if json_start == -1 or json_end <= json_start:
+         raise ValueError(f"Invalid JSON response from Gemini: {response_text}")
+
+    json_text = response_text[json_start:json_end]
+    result = json.loads(json_text)
+
+    # Safety defaults for TEST mode
+    if mode == "test":
+        if "score" not in result:
+            result["score"] = 0.0
+        if "suggested_correction" not in result:
+            result["suggested_correction"] = ""
+        if "evaluation" not in result or not isinstance(result["evaluation"], dict):
+            result["evaluation"] = {
+                "relevance": "N/A",
+                "coherence": "N/A",
+                "vocabulary": "N/A",
+                "grammar": "N/A"
+            }
+        if "pro_tips" not in result or not isinstance(result["pro_tips"], list):
+            result["pro_tips"] = []
+        if "reference_answer" not in result:
+            result["reference_answer"] = ""
         
-        if json_start == -1 or json_end <= json_start:
-             raise ValueError(f"Invalid JSON response from Gemini: {response_text}")
-
-        json_text = response_text[json_start:json_end]
-        result = json.loads(json_text)
-
-        # Safety defaults for TEST mode
-        if mode == "test":
-            if "score" not in result:
-                result["score"] = 0.0
-            if "suggested_correction" not in result:
-                result["suggested_correction"] = ""
-            if "evaluation" not in result or not isinstance(result["evaluation"], dict):
-                result["evaluation"] = {
-                    "relevance": "N/A",
-                    "coherence": "N/A",
-                    "vocabulary": "N/A",
-                    "grammar": "N/A"
-                }
-            if "pro_tips" not in result or not isinstance(result["pro_tips"], list):
-                result["pro_tips"] = []
-            if "reference_answer" not in result:
-                result["reference_answer"] = ""
-            
-            # Legacy compatibility for parts of the app expecting a flat list of feedback
-            if "feedback" not in result or not result["feedback"]:
-                eval_dict = result.get("evaluation", {})
-                result["feedback"] = [
-                    f"Relevance: {eval_dict.get('relevance', 'N/A')}",
-                    f"Coherence: {eval_dict.get('coherence', 'N/A')}",
-                    f"Vocabulary: {eval_dict.get('vocabulary', 'N/A')}",
-                    f"Grammar: {eval_dict.get('grammar', 'N/A')}"
-                ]
-            
-            # Ensure score is within range
-            try:
-                result["score"] = max(0.0, min(9.0, float(result.get("score", 0))))
-            except:
-                result["score"] = 0.0
+        # Legacy compatibility for parts of the app expecting a flat list of feedback
+        if "feedback" not in result or not result["feedback"]:
+            eval_dict = result.get("evaluation", {})
+            result["feedback"] = [
+                f"Relevance: {eval_dict.get('relevance', 'N/A')}",
+                f"Coherence: {eval_dict.get('coherence', 'N/A')}",
+                f"Vocabulary: {eval_dict.get('vocabulary', 'N/A')}",
+                f"Grammar: {eval_dict.get('grammar', 'N/A')}"
+            ]
+        
+        # Ensure score is within range
+        try:
+            result["score"] = max(0.0, min(9.0, float(result.get("score", 0))))
+        except:
+            result["score"] = 0.0
+
+    return result
+
+
+def ai_toefl_feedback(essay_text, mode="learning"):
+    """
+    English evaluator for mobile app with separate modes for learning and testing.
+    Identical submissions are answered from the response cache.
+    """
+
+    cache_key = feedback_cache_key(essay_text, mode)
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        response = llm_client.generate_content(build_prompt(essay_text, mode), model=MODEL_NAME)
+        result = parse_feedback(response.text, mode)
 
+        # Only successful evaluations are cached; errors are retried next time
+        _cache.set(cache_key, result)
         return result
 
     except Exception as e:
         print(f"ERROR in ai_toefl_feedback: {e}") # Print to terminal for debugging
-        error_msg = str(e)[:100]
-        if mode == "test":
-            return {
-                "score": 0, 
-                "error": f"Error: {error_msg}",
-                "suggested_correction": f"Evaluation error: {error_msg}",
-                "evaluation": {"relevance": "Error", "coherence": "Error", "vocabulary": "Error", "grammar": "Error"},
-                "pro_tips": ["System was unable to generate feedback."],
-                "reference_answer": ""
-            }
-        else:
-            return {"status": "error", "title": "Error ❗", "feedback_id": "Gagal memproses."}
+        return _error_result(e, mode)
+
+
+# Learning-mode fields pushed to the client as soon as Gemini has written them
+STREAM_FIELDS = ("status", "title", "feedback_id", "feedback_en", "corrected_text")
+
+
+def stream_toefl_feedback(essay_text, mode="learning"):
+    """
+    Streaming version of ai_toefl_feedback. Yields (event, data):
+    - (field, {field: value}) for each of STREAM_FIELDS as soon as it is complete
+    - ("result", result) once, at the end, with the same dict ai_toefl_feedback returns
+    """
+    cache_key = feedback_cache_key(essay_text, mode)
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        for field in STREAM_FIELDS:
+            if field in cached:
+                yield field, {field: cached[field]}
+        yield "result", cached
+        return
+
+    try:
+        parser = JsonStreamParser()
+        for chunk in llm_client.generate_content_stream(build_prompt(essay_text, mode), model=MODEL_NAME):
+            for kind, key, value in parser.feed(chunk):
+                if kind == "field" and key in STREAM_FIELDS:
+                    yield key, {key: value}
+
+        result = parse_feedback(parser.text, mode)
+        _cache.set(cache_key, result)
+    except Exception as e:
+        print(f"ERROR in stream_toefl_feedback: {e}")
+        result = _error_result(e, mode)
+
+    yield "result", result
+
+
+def _error_result(e, mode):
+    """Fallback response with the same shape the mobile app expects."""
+    error_msg = str(e)[:100]
+    if mode == "test":
+        return {
+            "score": 0, 
+            "error": f"Error: {error_msg}",
+            "suggested_correction": f"Evaluation error: {error_msg}",
+            "evaluation": {"relevance": "Error", "coherence": "Error", "vocabulary": "Error", "grammar": "Error"},
+            "pro_tips": ["System was unable to generate feedback."],
+            "reference_answer": ""
+        }
+    else:
+        return {"status": "error", "title": "Error ❗", "feedback_id": "Gagal memproses."}
+
+
+def evaluate_many(texts, mode="test"):
+    """
+    Evaluate several independent responses concurrently.
+    Results keep the order of `texts`; a call that fails, exceeds
+    GEMINI_TASK_TIMEOUT, or is unfinished after GEMINI_BATCH_TIMEOUT (queue
+    wait included) gets the usual error result instead.
+    """
+    def on_failure(text, e):
+        print(f"ERROR in evaluate_many: {e}")
+        return _error_result(e, mode)
+
+    return map_bounded(
+        lambda text: ai_toefl_feedback(text, mode=mode),
+        texts,
+        timeout=Config.GEMINI_TASK_TIMEOUT,
+        deadline=Config.GEMINI_BATCH_TIMEOUT,
+        fallback=on_failure
+    )
 
 
 if __name__ == "__main__":
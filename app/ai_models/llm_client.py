@@ -0,0 +1,175 @@
+"""
+Shared Gemini client used by every module that talks to the LLM
+(gemini.py feedback, ocr.py translation), blocking or streamed.
+
+One genai.Client is created per process, on first use, and reused by all
+threads. Its underlying httpx client keeps connections alive, so steady-state
+calls skip TLS/connection setup. Calls are retried with jittered exponential
+backoff on 429/5xx and transient network errors, and their latency is
+recorded for /api/metrics. The google-genai SDK itself is only imported when
+the client is first built, which keeps app startup fast.
+"""
+import random
+import threading
+import time
+from collections import deque
+
+import httpx
+
+from app.utils.metrics import register_stats
+from config import Config
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _build_client():
+    from google import genai
+    from google.genai import types
+
+    limits = httpx.Limits(
+        max_connections=Config.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=Config.LLM_MAX_CONNECTIONS,
+        keepalive_expiry=Config.LLM_KEEPALIVE_SECONDS
+    )
+    http_options = types.HttpOptions(
+        timeout=int(Config.LLM_TIMEOUT * 1000),  # milliseconds
+        client_args={'limits': limits}
+    )
+    return genai.Client(http_options=http_options)
+
+
+def get_client():
+    """Process-wide Gemini client, created lazily and shared by all threads."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+def is_ready():
+    """True once the shared client has been created."""
+    return _client is not None
+
+
+def reset_client():
+    """Drop the shared client (e.g. after the API key changes)."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+# ===== METRICS =====
+class _CallStats:
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+
+    def record(self, seconds, ok, retries):
+        with self._lock:
+            self.calls += 1
+            self.retries += retries
+            if not ok:
+                self.errors += 1
+            self._latencies.append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            calls, errors_, retries = self.calls, self.errors, self.retries
+
+        def pct(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+
+        return {
+            'calls': calls,
+            'errors': errors_,
+            'retries': retries,
+            'latency_seconds': {
+                'avg': round(sum(latencies) / len(latencies), 3) if latencies else None,
+                'p50': pct(0.50),
+                'p95': pct(0.95),
+                'max': round(latencies[-1], 3) if latencies else None,
+            },
+            'client_ready': _client is not None,
+        }
+
+
+stats = _CallStats()
+register_stats('llm', stats.snapshot)
+
+
+# ===== RETRIES =====
+def _is_retryable(e):
+    from google.genai import errors
+    if isinstance(e, errors.APIError):
+        return e.code in RETRY_STATUS_CODES
+    return isinstance(e, (httpx.TransportError, httpx.TimeoutException))
+
+
+def _backoff(attempt):
+    """Full-jitter exponential backoff."""
+    ceiling = min(Config.LLM_BACKOFF_MAX, Config.LLM_BACKOFF_BASE * (2 ** attempt))
+    time.sleep(random.uniform(0, ceiling))
+
+
+def generate_content(prompt, model=DEFAULT_MODEL):
+    """generate_content on the shared client, with retries and latency metrics."""
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        try:
+            response = get_client().models.generate_content(model=model, contents=prompt)
+            stats.record(time.perf_counter() - start, True, attempt)
+            return response
+        except Exception as e:
+            if attempt >= Config.LLM_MAX_RETRIES or not _is_retryable(e):
+                stats.record(time.perf_counter() - start, False, attempt)
+                raise
+            print(f"LLM call failed ({e}), retrying ({attempt + 1}/{Config.LLM_MAX_RETRIES})")
+            _backoff(attempt)
+            attempt += 1
+
+
+def generate_content_stream(prompt, model=DEFAULT_MODEL):
+    """
+    Yield response text chunks as Gemini produces them.
+
+    Retries only happen before the first chunk arrives: once text has been
+    handed to the caller, a failure is raised instead of replaying the stream.
+    """
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        try:
+            chunks = iter(get_client().models.generate_content_stream(model=model, contents=prompt))
+            first = next(chunks, None)
+            break
+        except Exception as e:
+            if attempt >= Config.LLM_MAX_RETRIES or not _is_retryable(e):
+                stats.record(time.perf_counter() - start, False, attempt)
+                raise
+            print(f"LLM stream failed ({e}), retrying ({attempt + 1}/{Config.LLM_MAX_RETRIES})")
+            _backoff(attempt)
+            attempt += 1
+
+    ok = False
+    try:
+        if first is not None and first.text:
+            yield first.text
+        for chunk in chunks:
+            if chunk.text:
+                yield chunk.text
+        ok = True
+    finally:
+        stats.record(time.perf_counter() - start, ok, attempt)
@@ -1,28 +1,104 @@
+"""
+OCR + translate + grammar pipeline used by the /api/ocr routes.
+
+This module is a plain library: it does not import gradio. The interactive demo
+lives in ocr_demo.py (python -m app.ai_models.ocr_demo).
+"""
 import json
 import re
 import ssl
 
 import certifi
-import easyocr
-import gradio as gr
 import numpy as np
-from google import genai
-from PIL import Image
+from PIL import Image, ImageOps
+
+from app.ai_models import llm_client, ocr_cache, ocr_engine
+from app.utils.json_stream import JsonStreamParser
+from config import Config
 
 # KONFIGURASI API & SSL
 ssl._create_default_https_context = lambda: ssl.create_default_context(cafile=certifi.where())
 
-client = None
-reader = easyocr.Reader(['id', 'en'])
+
+class _LazyReader:
+    """
+    Stand-in for easyocr.Reader. Text is read by the configured OCR engine: the
+    registry's in-process reader, or the worker pool (Config.OCR_ENGINE).
+    """
+
+    def readtext(self, image, detail=0):
+        return ocr_engine.readtext(image, detail=detail)
+
+
+reader = _LazyReader()
+
+
+# 🧩 PREPROCESSING
+def preprocess_options(**overrides):
+    """Opsi preprocessing dari Config, bisa di-override per panggilan."""
+    options = {
+        "exif_transpose": Config.OCR_EXIF_TRANSPOSE,
+        "max_side": Config.OCR_MAX_SIDE,
+        "grayscale": Config.OCR_GRAYSCALE,
+        "autocontrast": Config.OCR_AUTOCONTRAST,
+        "crop_text": Config.OCR_CROP_TEXT,
+    }
+    options.update(overrides)
+    return options
+
+
+def resize_max_side(image: Image.Image, max_side: int):
+    """Perkecil gambar agar sisi terpanjang <= max_side (0 = tidak diubah)."""
+    if not max_side or max(image.size) <= max_side:
+        return image
+    scale = max_side / max(image.size)
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.LANCZOS)
+
+
+def crop_to_text(image: Image.Image, threshold=40, margin=0.02):
+    """
+    Potong gambar ke area yang berisi tulisan: piksel yang jauh berbeda dari
+    warna latar (median). Jika tidak ada area yang jelas, gambar dikembalikan utuh.
+    """
+    grey = np.asarray(image.convert("L"), dtype=np.int16)
+    ink = np.abs(grey - int(np.median(grey))) > threshold
+    rows = np.flatnonzero(ink.any(axis=1))
+    cols = np.flatnonzero(ink.any(axis=0))
+    if rows.size == 0 or cols.size == 0:
+        return image
+
+    pad = int(max(image.size) * margin)
+    box = (
+        max(0, cols[0] - pad), max(0, rows[0] - pad),
+        min(image.width, cols[-1] + 1 + pad), min(image.height, rows[-1] + 1 + pad)
+    )
+    if box == (0, 0, image.width, image.height):
+        return image
+    return image.crop(box)
 
 
 # 🧩 PIPELINE FUNCTIONS
-def preprocess_image(image: Image.Image):
-    """Validasi dan konversi gambar ke format OCR-ready (RGB numpy array)."""
+def preprocess_image(image: Image.Image, **overrides):
+    """
+    Validasi dan siapkan gambar untuk OCR: rotasi sesuai EXIF, resize sisi
+    terpanjang, grayscale/kontras, dan (opsional) crop ke area teks.
+    Hasilnya numpy array (RGB, atau 2D jika grayscale).
+    """
     if image is None:
         raise ValueError("No image uploaded")
+    options = preprocess_options(**overrides)
     try:
+        if options["exif_transpose"]:
+            image = ImageOps.exif_transpose(image)
         image = image.convert("RGB")
+        image = resize_max_side(image, options["max_side"])
+        if options["grayscale"]:
+            image = image.convert("L")
+        if options["autocontrast"]:
+            image = ImageOps.autocontrast(image, cutoff=1)
+        if options["crop_text"]:
+            image = crop_to_text(image)
         return np.array(image)
     except Exception:
         raise ValueError("Invalid image file")
@@ -61,18 +137,16 @@ Text: {ocr_text}
 
 
 def query_gemini(prompt: str):
-    """Kirim prompt ke Gemini dan kembalikan hasil teks mentah."""
-    global client
-    if client is None:
-        client = genai.Client()
-        
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt
-    )
+    """Kirim prompt ke Gemini (lewat client bersama) dan kembalikan hasil teks mentah."""
+    response = llm_client.generate_content(prompt)
     return response.text.strip()
 
 
+def query_gemini_stream(prompt: str):
+    """Seperti query_gemini, tapi menghasilkan potongan teks selama Gemini menulis."""
+    return llm_client.generate_content_stream(prompt)
+
+
 def parse_model_output(text: str):
     """Bersihkan dan parsing hasil output dari Gemini menjadi JSON."""
     # Bersihkan dari wrapper Markdown
@@ -90,24 +164,77 @@ def parse_model_output(text: str):
 def process_image(image):
     try:
         img_array = preprocess_image(image)
+
+        # Gambar yang persis sama pernah diproses: lewati OCR dan Gemini
+        digest = ocr_cache.image_digest(img_array)
+        cached = ocr_cache.lookup_image(digest)
+        if cached is not None:
+            return cached
+
         ocr_text = extract_text(img_array)
-        prompt = build_prompt(ocr_text)
-        raw_response = query_gemini(prompt)
-        result = parse_model_output(raw_response)
+
+        # Teks yang sama dari foto lain: lewati Gemini
+        result = ocr_cache.lookup_text(ocr_text)
+        if result is None:
+            prompt = build_prompt(ocr_text)
+            raw_response = query_gemini(prompt)
+            result = parse_model_output(raw_response)
+            if "error" not in result:
+                ocr_cache.store_text(ocr_text, result)
+
+        if "error" not in result:
+            ocr_cache.store_image(digest, result)
         return result
     except Exception as e:
         return {"error": str(e)}
 
 
-
-# GRADIO INTERFACE
-iface = gr.Interface(
-    fn=process_image,
-    inputs=gr.Image(type="pil", label="Upload Image"),
-    outputs=gr.JSON(label="Result"),
-    title="Gemini OCR + Translate + Grammar Check",
-    description="Upload an image containing text (Indonesian or English), and get translation + grammar analysis."
-)
-
-if __name__ == "__main__":
-    iface.launch(server_name="0.0.0.0", share=True)
+# STREAMING PROCESS FUNCTION
+def _result_events(result):
+    """Event untuk hasil yang sudah lengkap (dari cache)."""
+    if "translation" in result:
+        yield "translation", {"translation": result["translation"]}
+    for item in result.get("sentence_analysis", []):
+        yield "sentence", item
+
+
+def stream_process_image(image):
+    """
+    Versi streaming dari process_image. Menghasilkan (event, data) begitu tiap
+    tahap selesai:
+    - "ocr":         {"text": ...} setelah EasyOCR selesai
+    - "translation": {"translation": ...} begitu field translation lengkap
+    - "sentence":    tiap item sentence_analysis begitu lengkap
+    - "result":      hasil akhir (sama dengan process_image)
+    Exception diteruskan ke pemanggil.
+    """
+    img_array = preprocess_image(image)
+
+    digest = ocr_cache.image_digest(img_array)
+    cached = ocr_cache.lookup_image(digest)
+    if cached is not None:
+        yield from _result_events(cached)
+        yield "result", cached
+        return
+
+    ocr_text = extract_text(img_array)
+    yield "ocr", {"text": ocr_text}
+
+    result = ocr_cache.lookup_text(ocr_text)
+    if result is not None:
+        yield from _result_events(result)
+    else:
+        parser = JsonStreamParser()
+        for chunk in query_gemini_stream(build_prompt(ocr_text)):
+            for kind, key, value in parser.feed(chunk):
+                if kind == "field" and key == "translation":
+                    yield "translation", {"translation": value}
+                elif kind == "item" and key == "sentence_analysis":
+                    yield "sentence", value
+        result = parse_model_output(parser.text.strip())
+        if "error" not in result:
+            ocr_cache.store_text(ocr_text, result)
+
+    if "error" not in result:
+        ocr_cache.store_image(digest, result)
+    yield "result", result
@@ -0,0 +1,99 @@
+"""
+Two-layer result cache for the OCR translate pipeline.
+
+1. Image layer: keyed on a SHA-256 of the preprocessed (normalised) image. Only
+   a byte-identical page, e.g. the same photo uploaded again, skips EasyOCR and
+   Gemini. Near-duplicates are not matched here. Perceptual hashes put
+   different text pages with the same layout a few bits apart, which would
+   hand one user another user's OCR text.
+2. Text layer: keyed on the normalised OCR text. A near-duplicate photo is
+   OCR'd again, and its result is only reused when the text it reads is the
+   same, so the Gemini call is skipped.
+
+Both layers use build_cache, so they can be shared between processes
+(sqlite/redis). Only successful results are stored. Hit rates are reported on
+/api/metrics.
+"""
+import hashlib
+import json
+import re
+
+import numpy as np
+
+from app.ai_models import llm_client
+from app.utils.cache import build_cache
+from app.utils.metrics import register_stats
+from config import Config
+
+PROMPT_VERSION = 1
+
+
+# ===== IMAGE LAYER =====
+def image_digest(image_array: np.ndarray):
+    """SHA-256 of the preprocessed image (shape, dtype and pixels)."""
+    array = np.ascontiguousarray(image_array)
+    digest = hashlib.sha256(f"{array.shape}|{array.dtype}|".encode("utf-8"))
+    digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+# ===== TEXT LAYER =====
+def normalize_ocr_text(text):
+    """Case and whitespace differences between two reads of the same page do not matter."""
+    return re.sub(r"\s+", " ", text or "").strip().lower()
+
+
+def text_cache_key(ocr_text):
+    payload = json.dumps([PROMPT_VERSION, normalize_ocr_text(ocr_text), llm_client.DEFAULT_MODEL])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+_image_cache = build_cache(
+    "ocr_image",
+    backend=Config.OCR_CACHE_BACKEND,
+    ttl=Config.OCR_CACHE_TTL,
+    max_entries=Config.OCR_IMAGE_INDEX_SIZE
+)
+_text_cache = build_cache(
+    "ocr_text",
+    backend=Config.OCR_CACHE_BACKEND,
+    ttl=Config.OCR_CACHE_TTL
+)
+
+
+def lookup_image(digest):
+    if not Config.OCR_CACHE_ENABLED:
+        return None
+    return _image_cache.get(digest)
+
+
+def store_image(digest, result):
+    if Config.OCR_CACHE_ENABLED:
+        _image_cache.set(digest, result)
+
+
+def lookup_text(ocr_text):
+    if not Config.OCR_CACHE_ENABLED:
+        return None
+    return _text_cache.get(text_cache_key(ocr_text))
+
+
+def store_text(ocr_text, result):
+    if Config.OCR_CACHE_ENABLED:
+        _text_cache.set(text_cache_key(ocr_text), result)
+
+
+def clear():
+    _image_cache.clear()
+    _text_cache.clear()
+
+
+def stats():
+    return {
+        'enabled': Config.OCR_CACHE_ENABLED,
+        'image': _image_cache.stats(),
+        'text': _text_cache.stats(),
+    }
+
+
+register_stats('ocr_cache', stats)
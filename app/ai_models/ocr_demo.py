@@ -0,0 +1,22 @@
+"""
+Gradio demo for the OCR pipeline. Optional: only this entry point needs gradio.
+
+    python -m app.ai_models.ocr_demo
+"""
+import gradio as gr
+
+from app.ai_models.ocr import process_image
+
+
+def build_interface():
+    return gr.Interface(
+        fn=process_image,
+        inputs=gr.Image(type="pil", label="Upload Image"),
+        outputs=gr.JSON(label="Result"),
+        title="Gemini OCR + Translate + Grammar Check",
+        description="Upload an image containing text (Indonesian or English), and get translation + grammar analysis."
+    )
+
+
+if __name__ == "__main__":
+    build_interface().launch(server_name="0.0.0.0", share=True)
@@ -0,0 +1,308 @@
+"""
+OCR execution engine.
+
+EasyOCR inference is CPU-bound PyTorch work. Run inline (OCR_ENGINE=inline,
+the default) it shares the Flask process with every request thread. With
+OCR_ENGINE=pool it runs in a pool of worker processes instead:
+
+- each worker process builds and warms its own easyocr.Reader once
+- requests go through a queue; a dispatcher thread collects up to OCR_MAX_BATCH
+  images (waiting at most OCR_BATCH_WAIT_MS) and sends similarly sized images to
+  a worker as one readtext_batched() call, padded to a common size
+- at most OCR_WORKERS batches are in flight, so new images wait in the queue
+  and get batched together while every worker is busy
+
+Queue depth, batch sizes and per-stage timings are reported on /api/metrics.
+"""
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from app.utils.metrics import StageTimings, register_stats
+from config import Config
+
+# Padding may grow a batch's pixel count by at most this factor
+MAX_PADDING_RATIO = 1.5
+PAD_VALUE = 255
+
+
+# ===== WORKER PROCESS =====
+_worker_reader = None
+
+
+def _init_worker(languages, torch_threads):
+    """Process initializer: build this worker's Reader once."""
+    global _worker_reader
+    import easyocr
+    import torch
+
+    if torch_threads:
+        torch.set_num_threads(torch_threads)
+    _worker_reader = easyocr.Reader(languages, gpu=False, verbose=False)
+    # A first tiny pass loads the detector/recogniser weights into memory
+    _worker_reader.readtext(np.full((32, 32), PAD_VALUE, dtype=np.uint8), detail=0)
+
+
+def pad_to_common_size(images):
+    """Pad every image (bottom/right, white) to the largest height and width in the batch."""
+    color = any(image.ndim == 3 for image in images)
+    height = max(image.shape[0] for image in images)
+    width = max(image.shape[1] for image in images)
+
+    padded = []
+    for image in images:
+        if color and image.ndim == 2:
+            image = np.stack([image] * 3, axis=-1)
+        pad = [(0, height - image.shape[0]), (0, width - image.shape[1])]
+        if image.ndim == 3:
+            pad.append((0, 0))
+        padded.append(np.pad(image, pad, mode='constant', constant_values=PAD_VALUE))
+    return padded
+
+
+def _run_batch(images):
+    """Runs in a worker process. Returns (texts per image, stage timings)."""
+    timings = {}
+    start = time.perf_counter()
+    if len(images) == 1:
+        results = [_worker_reader.readtext(images[0], detail=0)]
+    else:
+        padded = pad_to_common_size(images)
+        timings['pad'] = time.perf_counter() - start
+        start = time.perf_counter()
+        results = _worker_reader.readtext_batched(padded, detail=0)
+    timings['inference'] = time.perf_counter() - start
+    return results, timings
+
+
+def _ping():
+    return os.getpid()
+
+
+# ===== BATCHING =====
+def group_for_batching(images, max_padding_ratio=MAX_PADDING_RATIO):
+    """
+    Split a list of images into batches of indexes whose common padded size
+    wastes little work. Images are grouped in size order.
+    """
+    order = sorted(range(len(images)), key=lambda i: images[i].shape[:2])
+    groups = []
+    current, max_h, max_w, area = [], 0, 0, 0
+    for i in order:
+        h, w = images[i].shape[:2]
+        new_h, new_w = max(max_h, h), max(max_w, w)
+        if current and new_h * new_w * (len(current) + 1) > max_padding_ratio * (area + h * w):
+            groups.append(current)
+            current, new_h, new_w, area = [], h, w, 0
+        current.append(i)
+        max_h, max_w, area = new_h, new_w, area + h * w
+    if current:
+        groups.append(current)
+    return groups
+
+
+class OCREngine:
+    """Queue + micro-batching dispatcher in front of a pool of OCR workers."""
+
+    def __init__(self, workers, max_batch, batch_wait, executor_factory=None, batch_fn=_run_batch):
+        self.workers = workers
+        self.max_batch = max(1, max_batch)
+        self.batch_wait = batch_wait
+        self._executor_factory = executor_factory or self._default_executor
+        self._batch_fn = batch_fn
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._slots = threading.Semaphore(workers)
+        self._in_flight = 0
+        self._counts_lock = threading.Lock()
+        self.images = 0
+        self.batches = 0
+        self.errors = 0
+        self.timings = StageTimings()
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name='ocr-dispatcher', daemon=True)
+        self._dispatcher.start()
+
+    def _default_executor(self):
+        torch_threads = Config.OCR_TORCH_THREADS or max(1, (os.cpu_count() or 1) // self.workers)
+        from app.ai_models.registry import OCR_LANGUAGES
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(OCR_LANGUAGES, torch_threads)
+        )
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = self._executor_factory()
+            return self._executor
+
+    def warm_up(self):
+        """Start every worker process (each builds its Reader) and wait for them."""
+        executor = self._get_executor()
+        pids = {f.result() for f in [executor.submit(_ping) for _ in range(self.workers)]}
+        return sorted(pids)
+
+    def submit(self, image):
+        """Queue one image; the Future resolves to the list of detected strings."""
+        if not isinstance(image, np.ndarray) or image.ndim not in (2, 3):
+            raise ValueError("OCR input must be a 2D or 3D numpy array")
+        future = Future()
+        self._queue.put((image, future, time.perf_counter()))
+        return future
+
+    def readtext(self, image, timeout=None):
+        return self.submit(image).result(timeout=timeout)
+
+    # ----- dispatcher -----
+    def _collect(self):
+        """Block for one request, then gather more until the batch is full or the wait expires."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.batch_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _dispatch_loop(self):
+        while True:
+            # Wait for a free worker first: requests keep queueing meanwhile and
+            # are picked up together in the next batch
+            self._slots.acquire()
+            batch = self._collect()
+            groups = group_for_batching([image for image, _, _ in batch])
+            for n, group in enumerate(groups):
+                if n:
+                    self._slots.acquire()
+                self._send([batch[i] for i in group])
+
+    def _send(self, requests):
+        dispatched = time.perf_counter()
+        for _, _, queued_at in requests:
+            self.timings.record('queue_wait', dispatched - queued_at)
+
+        with self._counts_lock:
+            self._in_flight += 1
+            self.batches += 1
+            self.images += len(requests)
+
+        try:
+            task = self._get_executor().submit(self._batch_fn, [image for image, _, _ in requests])
+        except Exception as e:
+            self._finish(requests, dispatched, None, e)
+            return
+        task.add_done_callback(lambda t: self._finish(requests, dispatched, t, None))
+
+    def _finish(self, requests, dispatched, task, error):
+        try:
+            if error is None:
+                error = task.exception()
+            if error is None:
+                results, timings = task.result()
+                for stage, seconds in timings.items():
+                    self.timings.record(stage, seconds)
+                self.timings.record('batch_total', time.perf_counter() - dispatched)
+                for (_, future, queued_at), result in zip(requests, results):
+                    self.timings.record('request_total', time.perf_counter() - queued_at)
+                    future.set_result(result)
+                return
+
+            print(f"OCR batch of {len(requests)} failed: {error}")
+            with self._counts_lock:
+                self.errors += 1
+            if isinstance(error, BrokenProcessPool):
+                # A worker died (e.g. out of memory); start a fresh pool for the next batch
+                with self._executor_lock:
+                    self._executor = None
+            for _, future, _ in requests:
+                future.set_exception(error)
+        finally:
+            with self._counts_lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self):
+        with self._counts_lock:
+            images, batches, errors, in_flight = self.images, self.batches, self.errors, self._in_flight
+        return {
+            'workers': self.workers,
+            'max_batch': self.max_batch,
+            'queue_depth': self._queue.qsize(),
+            'in_flight_batches': in_flight,
+            'images': images,
+            'batches': batches,
+            'avg_batch_size': round(images / batches, 2) if batches else None,
+            'errors': errors,
+            'timings_seconds': self.timings.snapshot(),
+        }
+
+
+# ===== PROCESS-WIDE ENGINE =====
+_engine = None
+_engine_lock = threading.Lock()
+_inline_timings = StageTimings()
+
+
+def get_engine():
+    """Shared pool engine, created (not yet warmed) on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = OCREngine(
+                    workers=Config.OCR_WORKERS,
+                    max_batch=Config.OCR_MAX_BATCH,
+                    batch_wait=Config.OCR_BATCH_WAIT_MS / 1000
+                )
+                atexit.register(_engine.shutdown)
+                threading.Thread(target=_warm_up_engine, name='ocr-warm-up', daemon=True).start()
+    return _engine
+
+
+def _warm_up_engine():
+    try:
+        pids = _engine.warm_up()
+        print(f"OCR worker pool ready ({len(pids)} processes)")
+    except Exception as e:
+        print(f"OCR worker pool warm-up failed: {e}")
+
+
+def readtext(image, detail=0):
+    """readtext(detail=0) through the configured engine (inline or pool)."""
+    if Config.OCR_ENGINE == 'pool':
+        if detail != 0:
+            raise ValueError("The OCR worker pool only supports detail=0")
+        return get_engine().readtext(image, timeout=Config.OCR_TIMEOUT)
+
+    from app.ai_models.registry import get_ocr_reader
+    start = time.perf_counter()
+    result = get_ocr_reader().readtext(image, detail=detail)
+    _inline_timings.record('inference', time.perf_counter() - start)
+    return result
+
+
+def stats():
+    if _engine is not None:
+        return dict(_engine.stats(), engine='pool')
+    return {'engine': Config.OCR_ENGINE, 'timings_seconds': _inline_timings.snapshot()}
+
+
+register_stats('ocr_engine', stats)
@@ -0,0 +1,232 @@
+"""
+Process-wide registry for the heavy AI models (LanguageTool, SentenceTransformer,
+Alysa RandomForest, EasyOCR reader).
+
+Models are loaded lazily on first use, exactly once per process, and shared by
+every caller (examiner.py, alysa.py, train.py, ocr.py). Their libraries are only
+imported by the loaders, so importing this module is cheap. Loading is guarded by a
+per-model lock so concurrent requests never load the same model twice.
+"""
+import gc
+import os
+import sys
+import threading
+import time
+
+from app.utils.metrics import register_stats
+
+EMBEDDER_NAME = "all-MiniLM-L6-v2"
+LANGUAGE_TOOL_LANG = "en-US"
+OCR_LANGUAGES = ['id', 'en']
+EXAMINER_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "Alysa", "model.pkl"
+)
+
+
+# ===== LOADERS =====
+def _load_language_tool():
+    import language_tool_python
+    return language_tool_python.LanguageTool(LANGUAGE_TOOL_LANG)
+
+
+def _close_language_tool(tool):
+    tool.close()
+
+
+def _load_embedder():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDER_NAME)
+
+
+def _load_examiner_model():
+    import joblib
+    return joblib.load(EXAMINER_MODEL_PATH)
+
+
+def _load_ocr_reader():
+    import easyocr
+    return easyocr.Reader(OCR_LANGUAGES)
+
+
+# ===== MEMORY ACCOUNTING =====
+def _rss_bytes():
+    """Current resident set size of this process (Linux only, else None)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _parameter_bytes(model):
+    """Size of torch parameters held by the model, if it has any."""
+    parameters = getattr(model, "parameters", None)
+    if not callable(parameters):
+        return None
+    try:
+        return sum(p.numel() * p.element_size() for p in parameters())
+    except Exception:
+        return None
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._loaders = {}
+        self._closers = {}
+        self._locks = {}
+        self._models = {}
+        self._info = {}
+        self._warm_up_state = {"status": "disabled"}
+
+    def register(self, name, loader, closer=None):
+        """Declare how a model is loaded (and optionally released)."""
+        self._loaders[name] = loader
+        self._closers[name] = closer
+        self._locks[name] = threading.Lock()
+
+    def names(self):
+        return list(self._loaders)
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def get(self, name):
+        """Return the shared instance, loading it on first use."""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model: {name}")
+
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            model = self._models.get(name)
+            if model is not None:
+                return model
+
+            print(f"Loading model '{name}'...")
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            model = self._loaders[name]()
+            load_seconds = time.perf_counter() - start
+            rss_after = _rss_bytes()
+
+            self._info[name] = {
+                "load_seconds": round(load_seconds, 3),
+                "loaded_at": time.time(),
+                "rss_delta_bytes": (
+                    rss_after - rss_before
+                    if rss_before is not None and rss_after is not None
+                    else None
+                ),
+                "parameter_bytes": _parameter_bytes(model),
+            }
+            self._models[name] = model
+            print(f"Model '{name}' loaded in {load_seconds:.2f}s")
+            return model
+
+    def warm_up(self, names=None):
+        """Eagerly load the given models (default: all). Returns per-model errors."""
+        errors = {}
+        for name in names or self.names():
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Failed to warm up model '{name}': {e}")
+                errors[name] = str(e)
+        return errors
+
+    def unload(self, name=None):
+        """
+        Release one model (or all of them) so memory can be reclaimed.
+        Returns the names that were released; unknown names are reported, not raised.
+        """
+        if name and name not in self._loaders:
+            print(f"Cannot unload unknown model '{name}'. Known models: {', '.join(self.names())}")
+            return []
+
+        names = [name] if name else list(self._models)
+        released = []
+        for n in names:
+            with self._locks[n]:
+                model = self._models.pop(n, None)
+                self._info.pop(n, None)
+            if model is None:
+                continue
+            released.append(n)
+            closer = self._closers.get(n)
+            if closer:
+                try:
+                    closer(model)
+                except Exception as e:
+                    print(f"Error closing model '{n}': {e}")
+            del model
+
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        return released
+
+    def start_background_warm_up(self, names=None):
+        """Load models in a daemon thread so the API can serve requests meanwhile."""
+        names = list(names or self.names())
+        self._warm_up_state = {"status": "running", "models": names, "errors": {}}
+
+        def run():
+            errors = self.warm_up(names)
+            self._warm_up_state = {"status": "done", "models": names, "errors": errors}
+
+        thread = threading.Thread(target=run, name="model-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def warm_up_state(self):
+        return self._warm_up_state
+
+    def stats(self):
+        return {
+            "process_rss_bytes": _rss_bytes(),
+            "warm_up": self.warm_up_state(),
+            "models": {
+                name: dict(self._info[name], loaded=True) if name in self._models
+                else {"loaded": False}
+                for name in self.names()
+            },
+        }
+
+
+registry = ModelRegistry()
+registry.register("language_tool", _load_language_tool, _close_language_tool)
+registry.register("embedder", _load_embedder)
+registry.register("examiner_model", _load_examiner_model)
+registry.register("ocr_reader", _load_ocr_reader)
+
+register_stats("models", registry.stats)
+
+
+# ===== SHORTCUTS =====
+def get_language_tool():
+    return registry.get("language_tool")
+
+
+def get_embedder():
+    return registry.get("embedder")
+
+
+def get_examiner_model():
+    return registry.get("examiner_model")
+
+
+def get_ocr_reader():
+    return registry.get("ocr_reader")
+
+
+def warm_up(names=None):
+    return registry.warm_up(names)
+
+
+def unload(name=None):
+    return registry.unload(name)
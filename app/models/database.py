@@ -60,6 +60,8 @@ class QuizQuestion(db.Model):
 
 class UserLessonProgress(db.Model):
     __tablename__ = 'user_lesson_progress'
+    # One row per (user, lesson); writes go through app/models/upsert.py
+    __table_args__ = (db.Index('uq_user_lesson_progress_user_lesson', 'user_id', 'lesson_id', unique=True),)
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
@@ -81,6 +83,7 @@ class TestQuestion(db.Model):
 
 class UserAttempt(db.Model):
     __tablename__ = 'user_attempts'
+    __table_args__ = (db.Index('ix_user_attempts_user_created', 'user_id', 'created_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
@@ -93,22 +96,24 @@ class UserAttempt(db.Model):
     user_input = db.Column(db.Text, nullable=False)
     ai_feedback = db.Column(db.Text, nullable=False)
     score = db.Column(db.Float, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.now)
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)  # keyset pagination key
 
 class TestSession(db.Model):
     __tablename__ = 'test_sessions'
+    __table_args__ = (db.Index('ix_test_sessions_user_started', 'user_id', 'started_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     total_score = db.Column(db.Float, nullable=False)
     ai_feedback = db.Column(db.Text, nullable=False)
-    started_at = db.Column(db.DateTime, default=datetime.now)
+    started_at = db.Column(db.DateTime, default=datetime.now, nullable=False)  # keyset pagination key
     finished_at = db.Column(db.DateTime)
     
     test_answers = db.relationship('TestAnswer', backref='test_session', lazy=True, cascade="all, delete-orphan")
 
 class TestAnswer(db.Model):
     __tablename__ = 'test_answers'
+    __table_args__ = (db.Index('ix_test_answers_session', 'test_session_id'),)
     
     id = db.Column(db.Integer, primary_key=True)
     test_session_id = db.Column(db.Integer, db.ForeignKey('test_sessions.id', ondelete='CASCADE'), nullable=False)
@@ -122,17 +127,53 @@ class TestAnswer(db.Model):
 
 class OCRTranslation(db.Model):
     __tablename__ = 'ocr_translations'
+    __table_args__ = (db.Index('ix_ocr_translations_user_created', 'user_id', 'created_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     original_text = db.Column(db.Text, nullable=False)
     translated_and_explained = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # keyset pagination key
 
 class UserFeedback(db.Model):
     __tablename__ = 'user_feedback'
+    __table_args__ = (db.Index('ix_user_feedback_created', 'created_at'),)
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     feedback_text = db.Column(db.Text, nullable=False)
     sentiment = db.Column(db.String(50))
     created_at = db.Column(db.DateTime, default=datetime.now)
+
+class Job(db.Model):
+    """Background AI evaluation job (see app/utils/jobs.py)."""
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    kind = db.Column(db.String(50), nullable=False)  # 'test_submit', 'practice_submit', 'ocr_translate'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, done, failed
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    result = db.Column(db.Text)  # JSON response body
+    status_code = db.Column(db.Integer)
+    error = db.Column(db.Text)
+    callback_url = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)  # refreshed while a worker runs the job
+    finished_at = db.Column(db.DateTime)
+
+class StatCounter(db.Model):
+    """Precomputed row counts for the admin dashboard (see app/utils/stat_counters.py)."""
+    __tablename__ = 'stat_counters'
+
+    name = db.Column(db.String(64), primary_key=True)  # 'users', 'feedback', 'sentiment:Positive', ...
+    value = db.Column(db.Integer, nullable=False, default=0)  # compacted base; add pending deltas
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class StatCounterDelta(db.Model):
+    """Append-only counter increments, folded into stat_counters by compaction."""
+    __tablename__ = 'stat_counter_deltas'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    name = db.Column(db.String(64), nullable=False, index=True)
+    delta = db.Column(db.Integer, nullable=False)
@@ -0,0 +1,123 @@
+"""
+Schema migrations that db.create_all() does not cover.
+
+create_all() only creates missing tables; it never touches tables that already
+exist. ensure_columns() adds nullable columns declared on the models that an
+existing table lacks, and ensure_indexes() adds any index declared on the models
+(via index=True or __table_args__) that an existing SQLite / MySQL database does
+not have yet. backfill_timestamps() fills NULLs in the columns keyset pagination
+sorts on, which older tables allowed.
+Before a unique index can be added, existing duplicates have to go, hence
+dedupe_lesson_progress(). Everything here is idempotent and safe to run on
+every deploy (see update_schema.py).
+"""
+from datetime import datetime
+
+from sqlalchemy import func, inspect, text
+
+from app.models.database import OCRTranslation, TestSession, UserAttempt, UserLessonProgress, db
+
+# Keyset pagination compares (timestamp, id), which a NULL timestamp breaks:
+# (column, column to copy into NULL rows, or None for "now")
+KEYSET_TIMESTAMPS = [
+    (TestSession.__table__.c.started_at, TestSession.__table__.c.finished_at),
+    (UserAttempt.__table__.c.created_at, None),
+    (OCRTranslation.__table__.c.created_at, None),
+]
+
+
+def missing_indexes(engine):
+    """Indexes declared on the models but absent from the database, as Index objects."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue  # create_all() will create it together with its indexes
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in table.indexes if index.name not in existing)
+    return missing
+
+
+def missing_columns(engine):
+    """Nullable model columns absent from existing tables, as Column objects."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        missing.extend(column for column in table.columns
+                       if column.name not in existing and column.nullable and not column.primary_key)
+    return missing
+
+
+def ensure_columns(engine):
+    """Add the missing nullable columns; returns 'table.column' names."""
+    added = []
+    for column in missing_columns(engine):
+        column_type = column.type.compile(dialect=engine.dialect)
+        print(f"Adding column {column.name} to {column.table.name}...")
+        with engine.begin() as conn:
+            conn.execute(text(f'ALTER TABLE {column.table.name} ADD COLUMN {column.name} {column_type}'))
+        added.append(f'{column.table.name}.{column.name}')
+    return added
+
+
+def dedupe_lesson_progress(session):
+    """
+    Collapse duplicate (user_id, lesson_id) progress rows so the unique index can
+    be built: keep the oldest row, completed if any duplicate was, with the
+    latest access time. Returns the number of rows deleted.
+    """
+    groups = session.query(UserLessonProgress.user_id, UserLessonProgress.lesson_id)\
+        .group_by(UserLessonProgress.user_id, UserLessonProgress.lesson_id)\
+        .having(func.count(UserLessonProgress.id) > 1).all()
+
+    deleted = 0
+    for user_id, lesson_id in groups:
+        rows = UserLessonProgress.query.filter_by(user_id=user_id, lesson_id=lesson_id)\
+            .order_by(UserLessonProgress.id).all()
+        keep = rows[0]
+        keep.is_completed = any(row.is_completed for row in rows)
+        accessed = [row.last_accessed_at for row in rows if row.last_accessed_at]
+        keep.last_accessed_at = max(accessed) if accessed else None
+        for row in rows[1:]:
+            session.delete(row)
+            deleted += 1
+    session.commit()
+    return deleted
+
+
+def backfill_timestamps(engine):
+    """
+    Fill NULL keyset timestamps and, on MySQL, make the columns NOT NULL.
+    (SQLite cannot alter a column; tables it creates now are NOT NULL.)
+    Returns {'table.column': rows filled}.
+    """
+    existing_tables = set(inspect(engine).get_table_names())
+    now = datetime.now()
+    filled = {}
+    for column, fallback in KEYSET_TIMESTAMPS:
+        table = column.table
+        if table.name not in existing_tables:
+            continue
+        # Bound through the DateTime type so SQLite stores the same text format as the ORM
+        value = now if fallback is None else func.coalesce(fallback, now)
+        with engine.begin() as conn:
+            result = conn.execute(table.update().where(column.is_(None)).values({column.name: value}))
+            if engine.dialect.name in ('mysql', 'mariadb'):
+                conn.execute(text(f'ALTER TABLE {table.name} MODIFY {column.name} DATETIME NOT NULL'))
+        filled[f'{table.name}.{column.name}'] = result.rowcount
+    return filled
+
+
+def ensure_indexes(engine):
+    """Create the missing indexes; returns their names."""
+    created = []
+    for index in missing_indexes(engine):
+        print(f"Creating index {index.name} on {index.table.name}...")
+        index.create(bind=engine)
+        created.append(index.name)
+    return created
@@ -0,0 +1,55 @@
+"""
+Atomic INSERT-or-UPDATE keyed on a unique index, in one statement:
+
+- SQLite / PostgreSQL: INSERT ... ON CONFLICT (...) DO UPDATE
+- MySQL / MariaDB:     INSERT ... ON DUPLICATE KEY UPDATE
+
+Unlike SELECT-then-INSERT, two concurrent requests cannot both insert. Other
+dialects fall back to a per-row SELECT + INSERT/UPDATE inside the caller's
+transaction. Core statements bypass ORM events, so the caller commits.
+"""
+from app.models.database import db
+
+
+def upsert(model, rows, index_elements, update_columns):
+    """
+    Insert `rows` (list of column dicts) into model's table; on a conflict on
+    `index_elements` overwrite `update_columns` with the incoming values.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+    elif dialect in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table)
+        stmt = stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in update_columns})
+    else:
+        _upsert_generic(model, rows, index_elements, update_columns)
+        return
+
+    # executemany: the statement is compiled once and cached, instead of a
+    # fresh multi-row VALUES statement per batch size
+    db.session.execute(stmt, rows)
+
+
+def _upsert_generic(model, rows, index_elements, update_columns):
+    for row in rows:
+        existing = model.query.filter_by(**{key: row[key] for key in index_elements}).first()
+        if existing is None:
+            db.session.add(model(**row))
+        else:
+            for column in update_columns:
+                setattr(existing, column, row[column])
+    db.session.flush()
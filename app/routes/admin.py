@@ -1,6 +1,7 @@
 from datetime import datetime
 from sqlalchemy import or_
-from app.models.database import db, User, Lesson, LessonSection, Quiz, QuizQuestion, TestQuestion, TestSession, UserAttempt, UserFeedback
+from app.models.database import db, User, Lesson, LessonSection, Quiz, QuizQuestion, TestQuestion, TestSession, UserFeedback
+from app.utils import content_cache, question_sampler, stat_counters
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 from functools import wraps
 import os
@@ -22,33 +23,25 @@ def login_required(f):
 @admin_bp.route('/')
 @login_required
 def dashboard():
-    stats = {
-        'users': User.query.count(),
-        'lessons': Lesson.query.count(),
-        'quizzes': Quiz.query.count(),
-        'tests': TestQuestion.query.count(),
-        'sessions': TestSession.query.count(),
-        'attempts': UserAttempt.query.count(),
-        'feedback': UserFeedback.query.count(),
-    }
+    # Precomputed counters instead of COUNT(*) / GROUP BY on every page load
+    counters = stat_counters.read_counters()
+    stats = {name: counters.get(name, 0) for name in stat_counters.COUNTED_MODELS}
     
     recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
     recent_sessions = TestSession.query.order_by(TestSession.started_at.desc()).limit(5).all()
     
     # Sentiment stats for dashboard chart
-    from sqlalchemy import func
-    counts = db.session.query(UserFeedback.sentiment, func.count(UserFeedback.id)).group_by(UserFeedback.sentiment).all()
+    label_map = stat_counters.sentiment_counts(counters)
     
     sentiment_order = ['Positive', 'Negative', 'Neutral']
-    label_map = {c[0]: c[1] for c in counts if c[0]}
     
     sentiment_labels = [s for s in sentiment_order if s in label_map]
     sentiment_data = [label_map[s] for s in sentiment_order if s in label_map]
     
-    for c in counts:
-        if c[0] and c[0] not in sentiment_order:
-            sentiment_labels.append(c[0])
-            sentiment_data.append(c[1])
+    for label, count in label_map.items():
+        if label not in sentiment_order:
+            sentiment_labels.append(label)
+            sentiment_data.append(count)
     
     return render_template('admin/dashboard.html', 
                          stats=stats, 
@@ -160,6 +153,7 @@ def create_lesson():
                 )
                 db.session.add(new_lesson)
                 db.session.commit()
+                content_cache.invalidate()
                 flash('Lesson created successfully', 'success')
                 return redirect(url_for('admin.learning'))
             except Exception as e:
@@ -181,6 +175,7 @@ def edit_lesson(lesson_id):
         
         try:
             db.session.commit()
+            content_cache.invalidate()
             flash('Lesson updated successfully', 'success')
             return redirect(url_for('admin.learning'))
         except Exception as e:
@@ -196,6 +191,7 @@ def delete_lesson(lesson_id):
     try:
         db.session.delete(lesson)
         db.session.commit()
+        content_cache.invalidate()
         flash('Lesson deleted successfully', 'success')
     except Exception as e:
         db.session.rollback()
@@ -225,6 +221,7 @@ def create_section(lesson_id):
         )
         db.session.add(new_section)
         db.session.commit()
+        content_cache.invalidate()
         flash('Section created successfully', 'success')
     except Exception as e:
         db.session.rollback()
@@ -243,6 +240,7 @@ def edit_section(section_id):
     
     try:
         db.session.commit()
+        content_cache.invalidate()
         flash('Section updated successfully', 'success')
     except Exception as e:
         db.session.rollback()
@@ -258,6 +256,7 @@ def delete_section(section_id):
     try:
         db.session.delete(section)
         db.session.commit()
+        content_cache.invalidate()
         flash('Section deleted successfully', 'success')
     except Exception as e:
         db.session.rollback()
@@ -296,6 +295,7 @@ def create_quiz():
                 new_quiz = Quiz(id=quiz_id, title=title)
                 db.session.add(new_quiz)
                 db.session.commit()
+                content_cache.invalidate()
                 flash('Quiz created successfully', 'success')
                 return redirect(url_for('admin.quiz'))
             except Exception as e:
@@ -312,6 +312,7 @@ def edit_quiz(quiz_id):
         quiz.title = request.form.get('title')
         try:
             db.session.commit()
+            content_cache.invalidate()
             flash('Quiz updated successfully', 'success')
             return redirect(url_for('admin.quiz'))
         except Exception as e:
@@ -327,6 +328,7 @@ def delete_quiz(quiz_id):
     try:
         db.session.delete(quiz)
         db.session.commit()
+        content_cache.invalidate()
         flash('Quiz deleted successfully', 'success')
     except Exception as e:
         db.session.rollback()
@@ -367,6 +369,7 @@ def create_question(quiz_id):
         )
         db.session.add(new_question)
         db.session.commit()
+        content_cache.invalidate()
         flash('Question added successfully', 'success')
     except Exception as e:
         db.session.rollback()
@@ -390,6 +393,7 @@ def edit_question(question_id):
     question.correct_option_index = int(correct_option_index) if correct_option_index is not None else 0
     try:
         db.session.commit()
+        content_cache.invalidate()
         flash('Question updated successfully', 'success')
     except Exception as e:
         db.session.rollback()
@@ -404,6 +408,7 @@ def delete_question(question_id):
     try:
         db.session.delete(question)
         db.session.commit()
+        content_cache.invalidate()
         flash('Question deleted successfully', 'success')
     except Exception as e:
         db.session.rollback()
@@ -454,6 +459,7 @@ def create_test_question():
             )
             db.session.add(new_q)
             db.session.commit()
+            question_sampler.invalidate()
             flash('Test question created successfully', 'success')
             return redirect(url_for('admin.tests'))
         except Exception as e:
@@ -476,6 +482,7 @@ def edit_test_question(question_id):
         question.keywords = json.dumps(keywords)
         try:
             db.session.commit()
+            question_sampler.invalidate()
             flash('Test question updated successfully', 'success')
             return redirect(url_for('admin.tests'))
         except Exception as e:
@@ -495,6 +502,7 @@ def delete_test_question(question_id):
     try:
         db.session.delete(question)
         db.session.commit()
+        question_sampler.invalidate()
         flash('Test question deleted successfully', 'success')
     except Exception as e:
         db.session.rollback()
@@ -1,27 +1,48 @@
+import threading
+
 from flask import Blueprint, request, jsonify
-from gradio_client import Client
 from flask_jwt_extended import jwt_required
 
 chatbot_bp = Blueprint('chatbot', __name__)
 
-try:
-    print("Initializing Gradio Client for Chatbot...")
-    client = Client("alifiashasa/rag-chatbot-alysa")
-    print("Gradio Client Initialized.")
-except Exception as e:
-    print(f"Failed to initialize Gradio Client: {e}")
-    client = None
+CHATBOT_SPACE = "alifiashasa/rag-chatbot-alysa"
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Connect to the chatbot Space on first use; returns None if it is unreachable."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                try:
+                    from gradio_client import Client
+                    print("Initializing Gradio Client for Chatbot...")
+                    _client = Client(CHATBOT_SPACE)
+                    print("Gradio Client Initialized.")
+                except Exception as e:
+                    print(f"Failed to initialize Gradio Client: {e}")
+    return _client
+
+
+def is_ready():
+    """True once the chatbot client is connected (does not trigger a connection)."""
+    return _client is not None
+
 
 @chatbot_bp.route('/api/chatbot/chat', methods=['POST'])
 @jwt_required()
 def chat():
-    if not client:
-        return jsonify({'error': 'Chatbot service unavailable'}), 503
-
     data = request.get_json()
     if not data or 'message' not in data:
         return jsonify({'error': 'Message is required'}), 400
 
+    client = get_client()
+    if not client:
+        return jsonify({'error': 'Chatbot service unavailable'}), 503
+
     user_message = data['message']
 
     try:
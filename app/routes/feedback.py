@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.database import db, UserFeedback, User
-from app.utils.sentiment_analyzer import analyze_sentiment
+from app.utils import sentiment_labeller
 from datetime import datetime
 
 feedback_bp = Blueprint('feedback', __name__, url_prefix='/api/feedback')
@@ -21,22 +21,21 @@ def submit_feedback():
     
     feedback_text = data['feedback_text']
     
-    # Perform sentiment analysis
-    sentiment = analyze_sentiment(feedback_text)
-    
     try:
+        # Sentiment is filled in by the background labeller
         new_feedback = UserFeedback(
             user_id=current_user.id,
             feedback_text=feedback_text,
-            sentiment=sentiment,
+            sentiment=sentiment_labeller.PENDING,
             created_at=datetime.now()
         )
         db.session.add(new_feedback)
         db.session.commit()
+        sentiment_labeller.notify()
         
         return jsonify({
             'message': 'Feedback submitted successfully',
-            'sentiment': sentiment
+            'sentiment': new_feedback.sentiment
         }), 201
     except Exception as e:
         db.session.rollback()
@@ -0,0 +1,30 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+from app.models.database import Job
+from app.utils.jobs import serialize_job
+
+jobs_bp = Blueprint('jobs', __name__)
+
+@jobs_bp.route('/api/jobs/<job_id>', methods=['GET'])
+@jwt_required(optional=True)
+def get_job(job_id):
+    """
+    Poll a background job started with "async": true.
+    Returns the job status and, once finished, the same body the synchronous
+    endpoint would have returned (under 'result').
+    """
+    try:
+        job = Job.query.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+
+        # Jobs created by a logged-in user are only visible to that user
+        identity = get_jwt_identity()
+        if job.user_id is not None and str(job.user_id) != str(identity):
+            return jsonify({'error': 'Job not found'}), 404
+
+        return jsonify(serialize_job(job)), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,7 +1,9 @@
 import json
+from datetime import datetime
 
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_jwt_extended import get_jwt_identity, jwt_required, verify_jwt_in_request
+from sqlalchemy.orm import selectinload
 
 from app.models.database import (
     Lesson,
@@ -11,53 +13,49 @@ from app.models.database import (
     UserLessonProgress,
     db,
 )
+from app.models.upsert import upsert
+from app.utils import content_cache, lesson_completion
+from app.utils.sse import sse_event, sse_response
 
 learning_bp = Blueprint('learning', __name__)
 
+MAX_SYNC_ENTRIES = 500
+
+def _optional_user_id():
+    """User id from a valid Bearer token; None when absent or invalid."""
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+        return int(identity) if identity else None
+    except Exception:
+        return None
+
 @learning_bp.route('/api/lessons', methods=['GET'])
 def get_lessons():
     """Get all lessons, optionally filtered by category and showing completion"""
     try:
         category = request.args.get('category')
-        user_id = None
-        
-        # Optionally get user_id if token is provided
-        try:
-            from flask_jwt_extended import decode_token
-            auth_header = request.headers.get('Authorization')
-            if auth_header and auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-                decoded = decode_token(token)
-                user_id = int(decoded['sub'])
-        except Exception:
-            pass
-
-        query = Lesson.query
-        if category:
-            query = query.filter(Lesson.category.ilike(category))
-
-        lessons = query.all()
-        
-        # Get completed lesson IDs for this user
-        completed_ids = set()
-        if user_id:
-            progress = UserLessonProgress.query.filter_by(
-                user_id=user_id, is_completed=True
-            ).all()
-            completed_ids = {p.lesson_id for p in progress}
-
-        lessons_data = []
-        for lesson in lessons:
-            lessons_data.append({
+        user_id = _optional_user_id()
+
+        def build():
+            query = Lesson.query
+            if category:
+                query = query.filter(Lesson.category.ilike(category))
+            return [{
                 'id': lesson.id,
                 'title': lesson.title,
                 'description': lesson.description,
                 'category': lesson.category,
-                'durationMinutes': lesson.duration_minutes,
-                'isCompleted': lesson.id in completed_ids
-            })
+                'durationMinutes': lesson.duration_minutes
+            } for lesson in query.all()]
 
-        return jsonify({'lessons': lessons_data}), 200
+        catalog = content_cache.get_catalog(f"catalog:{(category or '').lower()}", build)
+
+        # Completion comes from the cached per-user bitmap, not a progress query
+        completed = lesson_completion.completed_lessons(user_id) if user_id else set()
+
+        return content_cache.json_response(content_cache.render_catalog(catalog, completed),
+                                           modified=catalog['modified'], private=user_id is not None)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -66,28 +64,28 @@ def get_lessons():
 def get_lesson_detail(lesson_id):
     """Get full lesson details including sections"""
     try:
-        lesson = Lesson.query.get(lesson_id)
-        if not lesson:
+        def build():
+            lesson = db.session.get(Lesson, lesson_id, options=[selectinload(Lesson.sections)])
+            if not lesson:
+                return None
+            return {
+                'id': lesson.id,
+                'title': lesson.title,
+                'description': lesson.description,
+                'category': lesson.category,
+                'durationMinutes': lesson.duration_minutes,
+                'sections': [{
+                    'title': section.title,
+                    'content': section.content,
+                    'quizId': section.quiz_id
+                } for section in lesson.sections]
+            }
+
+        entry = content_cache.get_or_build(f"lesson:{lesson_id}", build)
+        if entry is None:
             return jsonify({'error': 'Lesson not found'}), 404
 
-        sections_data = []
-        for section in lesson.sections:
-            sections_data.append({
-                'title': section.title,
-                'content': section.content,
-                'quizId': section.quiz_id
-            })
-
-        lesson_data = {
-            'id': lesson.id,
-            'title': lesson.title,
-            'description': lesson.description,
-            'category': lesson.category,
-            'durationMinutes': lesson.duration_minutes,
-            'sections': sections_data
-        }
-
-        return jsonify(lesson_data), 200
+        return content_cache.json_response(entry['body'], entry['etag'], entry['modified'])
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -96,29 +94,54 @@ def get_lesson_detail(lesson_id):
 def get_quiz(quiz_id):
     """Get quiz details and questions"""
     try:
-        quiz = Quiz.query.get(quiz_id)
-        if not quiz:
+        def build():
+            quiz = db.session.get(Quiz, quiz_id, options=[selectinload(Quiz.questions)])
+            if not quiz:
+                return None
+            return {
+                'id': quiz.id,
+                'title': quiz.title,
+                'questions': [{
+                    'questionText': q.question_text,
+                    'options': json.loads(q.options) if q.options else [],
+                    'correctOptionIndex': q.correct_option_index
+                } for q in quiz.questions]
+            }
+
+        entry = content_cache.get_or_build(f"quiz:{quiz_id}", build)
+        if entry is None:
             return jsonify({'error': 'Quiz not found'}), 404
 
-        questions_data = []
-        for q in quiz.questions:
-            questions_data.append({
-                'questionText': q.question_text,
-                'options': json.loads(q.options) if q.options else [],
-                'correctOptionIndex': q.correct_option_index
-            })
-
-        quiz_data = {
-            'id': quiz.id,
-            'title': quiz.title,
-            'questions': questions_data
-        }
+        return content_cache.json_response(entry['body'], entry['etag'], entry['modified'])
 
-        return jsonify(quiz_data), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
+@learning_bp.route('/api/learning/feedback/stream', methods=['POST'])
+@jwt_required()
+def stream_learning_feedback():
+    """
+    Tutor feedback for a single sentence, streamed as Server-Sent Events.
+    Body: {"text": "..."}
+    Events: status, title, feedback_id, feedback_en, corrected_text (each as
+    soon as it is generated), then done with the complete feedback object.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        text = (data.get('text') or '').strip()
+        if not text:
+            return jsonify({'error': 'Missing text'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+    def generate():
+        from app.ai_models.gemini import stream_toefl_feedback
+
+        for event, payload in stream_toefl_feedback(text, mode="learning"):
+            yield sse_event('done' if event == 'result' else event, payload)
+
+    return sse_response(generate())
+
 @learning_bp.route('/api/learning/progress', methods=['POST'])
 @jwt_required()
 def update_progress():
@@ -132,24 +155,64 @@ def update_progress():
         if not lesson_id:
             return jsonify({'error': 'Missing lesson_id'}), 400
 
-        progress = UserLessonProgress.query.filter_by(
-            user_id=user_id, lesson_id=lesson_id
-        ).first()
+        _save_progress(user_id, {lesson_id: bool(is_completed)})
 
-        if progress:
-            progress.is_completed = is_completed
-            progress.last_accessed_at = db.func.now()
-        else:
-            progress = UserLessonProgress(
-                user_id=user_id,
-                lesson_id=lesson_id,
-                is_completed=is_completed
-            )
-            db.session.add(progress)
+        return jsonify({'message': 'Progress updated'}), 200
 
-        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
 
-        return jsonify({'message': 'Progress updated'}), 200
+@learning_bp.route('/api/learning/progress/sync', methods=['POST'])
+@jwt_required()
+def sync_progress():
+    """
+    Flush progress recorded offline in one request.
+    Body: {"progress": [{"lesson_id": "...", "is_completed": true}, ...]}
+    Later entries for the same lesson win. Unknown lesson ids are skipped and
+    reported back.
+    """
+    try:
+        user_id = int(get_jwt_identity())
+        data = request.get_json(silent=True) or {}
+        entries = data.get('progress')
+
+        if not isinstance(entries, list):
+            return jsonify({'error': 'progress must be a list'}), 400
+        if len(entries) > MAX_SYNC_ENTRIES:
+            return jsonify({'error': f'At most {MAX_SYNC_ENTRIES} entries per sync'}), 400
+
+        latest = {}
+        for entry in entries:
+            if not isinstance(entry, dict) or not entry.get('lesson_id'):
+                return jsonify({'error': 'Each entry needs a lesson_id'}), 400
+            latest[str(entry['lesson_id'])] = bool(entry.get('is_completed', True))
+
+        known = {lesson_id for (lesson_id,) in
+                 db.session.query(Lesson.id).filter(Lesson.id.in_(latest)).all()} if latest else set()
+        skipped = [lesson_id for lesson_id in latest if lesson_id not in known]
+
+        _save_progress(user_id, {lesson_id: is_completed for lesson_id, is_completed in latest.items()
+                                 if lesson_id in known})
+
+        return jsonify({'message': 'Progress synced', 'synced': len(known), 'skipped': skipped}), 200
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
+
+def _save_progress(user_id, changes):
+    """
+    Upsert {lesson_id: is_completed} for one user in a single statement, commit,
+    and mirror the change into the cached completion bitmap.
+    """
+    now = datetime.now()
+    upsert(
+        UserLessonProgress,
+        [{'user_id': user_id, 'lesson_id': lesson_id, 'is_completed': is_completed, 'last_accessed_at': now}
+         for lesson_id, is_completed in changes.items()],
+        index_elements=['user_id', 'lesson_id'],
+        update_columns=['is_completed', 'last_accessed_at']
+    )
+    db.session.commit()
+    lesson_completion.record(user_id, changes)
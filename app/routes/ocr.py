@@ -1,25 +1,31 @@
 import json
+import os
+import uuid
 
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from PIL import Image
+from sqlalchemy import func
+from sqlalchemy.orm import defer
 
-from app.ai_models.ocr import process_image
 from app.models.database import OCRTranslation, db
+from app.utils.jobs import check_callback_url, enqueue_response, register_handler, wants_async
+from app.utils.pagination import keyset_page, offset_page, page_args, page_info
+from app.utils.sse import sse_event, sse_response
+from config import Config
 
 ocr_bp = Blueprint('ocr', __name__)
 
 @ocr_bp.route('/api/ocr/translate', methods=['POST'])
 @jwt_required(optional=True)
 def ocr_translate():
+    """
+    OCR + translate an uploaded image.
+    Send async=1 (query or form field) to get a job id back immediately and
+    poll /api/jobs/<id> for the result.
+    """
     try:
-        # Get user_id if authenticated, otherwise None
-        identity = get_jwt_identity()
-        print(f"OCR Request incoming. Identity: {identity}")
-        try:
-            user_id = int(identity) if identity else None
-        except:
-            user_id = None
+        user_id = _optional_user_id()
 
         if 'image' not in request.files:
             return jsonify({'error': 'No image file provided'}), 400
@@ -28,60 +34,178 @@ def ocr_translate():
         if file.filename == '':
             return jsonify({'error': 'No image file selected'}), 400
 
+        if wants_async():
+            callback_url = request.form.get('callback_url')
+            if callback_url:
+                try:
+                    check_callback_url(callback_url)
+                except ValueError as e:
+                    return jsonify({'error': f'Invalid callback_url: {e}'}), 400
+
+            # Keep the upload on disk until a worker picks the job up
+            os.makedirs(Config.JOB_UPLOAD_DIR, exist_ok=True)
+            image_path = os.path.join(Config.JOB_UPLOAD_DIR, uuid.uuid4().hex)
+            file.save(image_path)
+            return enqueue_response('ocr_translate', {'user_id': user_id, 'image_path': image_path},
+                                    user_id=user_id, callback_url=callback_url)
+
         # Process image
         image = Image.open(file.stream)
-        result = process_image(image)
-
-        if 'error' in result:
-            return jsonify({'error': result['error']}), 400
-
-        # Save OCR result to database only if user is authenticated
-        record_id = None
-        if user_id:
-            ocr_record = OCRTranslation(
-                user_id=user_id,
-                original_text=result.get('detected_language', '') + ': ' + str(result),
-                translated_and_explained=json.dumps(result)
-            )
-            db.session.add(ocr_record)
-            db.session.commit()
-            record_id = ocr_record.id
-
-        return jsonify({
-            'message': 'OCR translation completed',
-            'result': result,
-            'record_id': record_id
-        }), 200
+        body, status = translate_image(image, user_id)
+        return jsonify(body), status
 
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def translate_image(image, user_id):
+    """Run the OCR pipeline and store the result. Returns (response body, status code)."""
+    # Imported here so the OCR stack (EasyOCR, gradio) is only loaded when needed
+    from app.ai_models.ocr import process_image
+
+    result = process_image(image)
+
+    if 'error' in result:
+        return {'error': result['error']}, 400
+
+    return {
+        'message': 'OCR translation completed',
+        'result': result,
+        'record_id': _save_translation(user_id, result)
+    }, 200
+
+
+def _optional_user_id():
+    """User id if a valid token was sent, otherwise None"""
+    identity = get_jwt_identity()
+    print(f"OCR Request incoming. Identity: {identity}")
+    try:
+        return int(identity) if identity else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _save_translation(user_id, result):
+    """Save OCR result to database only if user is authenticated. Returns the record id."""
+    if not user_id:
+        return None
+    ocr_record = OCRTranslation(
+        user_id=user_id,
+        original_text=result.get('detected_language', '') + ': ' + str(result),
+        translated_and_explained=json.dumps(result)
+    )
+    db.session.add(ocr_record)
+    db.session.commit()
+    return ocr_record.id
+
+
+def _run_translate_job(payload):
+    image_path = payload['image_path']
+    try:
+        with Image.open(image_path) as image:
+            image.load()
+            return translate_image(image, payload['user_id'])
+    finally:
+        if os.path.exists(image_path):
+            os.remove(image_path)
+
+
+register_handler('ocr_translate', _run_translate_job)
+
+
+@ocr_bp.route('/api/ocr/translate/stream', methods=['POST'])
+@jwt_required(optional=True)
+def ocr_translate_stream():
+    """
+    Streaming variant of /api/ocr/translate (Server-Sent Events).
+    Events, in order:
+    - ocr:         {"text": ...} as soon as EasyOCR finishes
+    - translation: {"translation": ...} as soon as Gemini has written it
+    - sentence:    one sentence_analysis item at a time
+    - done:        {"message", "result", "record_id"} (same as the JSON endpoint)
+    - error:       {"error": ...} instead of done if the pipeline fails
+    """
+    try:
+        user_id = _optional_user_id()
+
+        if 'image' not in request.files:
+            return jsonify({'error': 'No image file provided'}), 400
+
+        file = request.files['image']
+        if file.filename == '':
+            return jsonify({'error': 'No image file selected'}), 400
+
+        image = Image.open(file.stream)
+        image.load()
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    def generate():
+        from app.ai_models.ocr import stream_process_image
+
+        try:
+            for event, data in stream_process_image(image):
+                if event != 'result':
+                    yield sse_event(event, data)
+                    continue
+                if 'error' in data:
+                    yield sse_event('error', {'error': data['error']})
+                    return
+                yield sse_event('done', {
+                    'message': 'OCR translation completed',
+                    'result': data,
+                    'record_id': _save_translation(user_id, data)
+                })
+        except Exception as e:
+            print(f"Streaming OCR failed: {e}")
+            yield sse_event('error', {'error': str(e)})
+
+    return sse_response(generate())
+
+
 @ocr_bp.route('/api/user/ocr-history', methods=['GET'])
 @jwt_required()
 def get_ocr_history():
     """
-    Get OCR translation history for the authenticated user
+    Get OCR translation history for the authenticated user, newest first
     Query params:
-    - page: page number (default: 1)
-    - per_page: items per page (default: 20, max: 100)
+    - limit / per_page: items per page (default: 20, max: 100)
+    - cursor: pagination.next_cursor from the previous page
+    - page: legacy page number; served with the old total_pages / total_items
+      (one COUNT(*), only on this path)
     """
     try:
         user_id = int(get_jwt_identity())
-
-        # Get pagination parameters
-        page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 20, type=int), 100)
-
-        # Query OCR translations for this user, ordered by most recent first
-        pagination = OCRTranslation.query.filter_by(user_id=user_id)\
-            .order_by(OCRTranslation.created_at.desc())\
-            .paginate(page=page, per_page=per_page, error_out=False)
+        limit, cursor = page_args()
+
+        query = OCRTranslation.query.filter_by(user_id=user_id)\
+            .options(defer(OCRTranslation.original_text))
+
+        if 'page' in request.args:
+            page = max(request.args.get('page', 1, type=int), 1)
+            records, has_next = offset_page(query, OCRTranslation.created_at, OCRTranslation.id, limit, page)
+            total = query.with_entities(func.count(OCRTranslation.id)).scalar()
+            pagination = {
+                'page': page,
+                'per_page': limit,
+                'total_pages': -(-total // limit),
+                'total_items': total,
+                'has_next': has_next,
+                'has_prev': page > 1,
+            }
+        else:
+            try:
+                records, next_cursor = keyset_page(query, OCRTranslation.created_at, OCRTranslation.id,
+                                                   limit, cursor)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            pagination = page_info(limit, next_cursor)
 
         # Format the results
         history = []
-        for record in pagination.items:
+        for record in records:
             try:
                 # Parse the JSON result
                 result_data = json.loads(record.translated_and_explained)
@@ -97,17 +221,7 @@ def get_ocr_history():
                 # If JSON parsing fails, skip this record
                 continue
 
-        return jsonify({
-            'history': history,
-            'pagination': {
-                'page': pagination.page,
-                'per_page': pagination.per_page,
-                'total_pages': pagination.pages,
-                'total_items': pagination.total,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev,
-            }
-        }), 200
+        return jsonify({'history': history, 'pagination': pagination}), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
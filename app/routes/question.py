@@ -3,6 +3,7 @@ import json
 from flask import Blueprint, jsonify, request
 
 from app.models.database import Lesson, LessonSection, Quiz, QuizQuestion, db
+from app.utils import content_cache
 
 question_bp = Blueprint('question', __name__)
 
@@ -173,6 +174,7 @@ def seed_content():
             db.session.add(s)
 
         db.session.commit()
+        content_cache.invalidate()
         return jsonify({'message': 'Database seeded with mock content successfully!'}), 200
 
     except Exception as e:
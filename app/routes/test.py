@@ -1,88 +1,114 @@
 import json
+import random
 from datetime import datetime
 
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 
 from app.models.database import TestAnswer, TestQuestion, TestSession, db
+from app.utils import question_sampler, test_blueprints
+from app.utils.jobs import enqueue_response, register_handler, wants_async
+from config import Config
 
 test_bp = Blueprint('test', __name__)
 
+
+def _to_int(value):
+    """Question IDs may arrive as ints or numeric strings from the client."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
 @test_bp.route('/api/test/start', methods=['POST'])
 @jwt_required()
 def start_test_session():
     """
-    Start a TOEFL iBT test session with exactly 6 tasks (4 speaking + 2 writing).
-    Returns all 6 questions in the proper TOEFL iBT order.
+    Start a full test session assembled from a test blueprint.
+    Body: {"blueprint": "ielts"} (optional, default TEST_BLUEPRINT) and
+    "avoid_recent" (default true). Returns one entry per task, in blueprint order.
     """
     try:
         user_id = int(get_jwt_identity())
         data = request.get_json() or {}
 
-        # TOEFL iBT requires exactly 6 tasks in specific order
-        # Get all test questions from database (should be exactly 6)
-        all_questions = TestQuestion.query.order_by(TestQuestion.id).all()
-
-        if len(all_questions) != 6:
-            return jsonify({
-                'error': f'TOEFL iBT test requires exactly 6 questions. Found {len(all_questions)} questions in database.'
-            }), 500
-
-        # Validate that we have the correct TOEFL iBT structure
-        expected_structure = [
-            {'section': 'speaking', 'task_type': 'independent'},   # Task 1
-            {'section': 'speaking', 'task_type': 'integrated'},    # Task 2
-            {'section': 'speaking', 'task_type': 'integrated'},    # Task 3
-            {'section': 'speaking', 'task_type': 'integrated'},    # Task 4
-            {'section': 'writing', 'task_type': 'integrated'},     # Task 5
-            {'section': 'writing', 'task_type': 'independent'}     # Task 6
-        ]
-
-        # Validate question structure
-        for i, (question, expected) in enumerate(zip(all_questions, expected_structure)):
-            if question.section != expected['section'] or question.task_type != expected['task_type']:
-                return jsonify({
-                    'error': f'Question {i+1}: Expected {expected["section"]} {expected["task_type"]}, got {question.section} {question.task_type}'
-                }), 500
-
-        # Create new test session
+        try:
+            blueprint = test_blueprints.get_blueprint(data.get('blueprint'))
+        except KeyError as e:
+            return jsonify({'error': e.args[0]}), 400
+
+        avoid = set()
+        if data.get('avoid_recent', True):
+            avoid = question_sampler.recent_question_ids(user_id, Config.PRACTICE_RECENT_SESSIONS)
+
+        # The sampler index may still hold questions deleted since it was built:
+        # if any picked row is gone, rebuild the index and draw again once
+        for _ in range(2):
+            try:
+                tasks = test_blueprints.assemble(blueprint, avoid=avoid)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 500
+
+            question_ids = [qid for task in tasks for qid in task['question_ids']]
+            questions = {q.id: q for q in question_sampler.fetch(question_ids)}
+            if len(questions) == len(set(question_ids)):
+                break
+            question_sampler.invalidate()
+        else:
+            return jsonify({'error': 'The question bank changed while the test was being assembled. Please try again.'}), 503
+
+        # Format tasks for response. question_id/prompt/keywords describe the task's
+        # first question; 'questions' lists all of them for multi-question tasks.
+        tasks_data = []
+        for task in tasks:
+            task_questions = [{
+                'question_id': q.id,
+                'prompt': q.prompt,
+                'keywords': json.loads(q.keywords) if q.keywords else []
+            } for q in (questions[qid] for qid in task['question_ids'])]
+            tasks_data.append({
+                'task_id': task['task_id'],
+                'section': task['section'],
+                'task_type': task['task_type'],
+                **task_questions[0],
+                'questions': task_questions
+            })
+
+        # Create new test session; the assigned tasks are kept so submit can validate against them
         test_session = TestSession(
             user_id=user_id,
             total_score=0.0,
-            ai_feedback='TOEFL iBT test in progress'
+            ai_feedback=json.dumps({
+                'overall_feedback': f"{blueprint['title']} test in progress",
+                'blueprint': blueprint['name'],
+                'tasks': tasks
+            })
         )
 
         db.session.add(test_session)
         db.session.commit()
 
-        # Format questions for response with task_id
-        questions_data = []
-        for i, q in enumerate(all_questions):
-            questions_data.append({
-                'task_id': i + 1,  # TOEFL iBT task numbers 1-6
-                'question_id': q.id,
-                'section': q.section,
-                'task_type': q.task_type,
-                'prompt': q.prompt,
-                'keywords': json.loads(q.keywords) if q.keywords else []
-            })
+        speaking_tasks = sum(1 for task in tasks if task['section'].lower() == 'speaking')
+        writing_tasks = sum(1 for task in tasks if task['section'].lower() == 'writing')
 
         return jsonify({
-            'message': 'TOEFL iBT test session started',
+            'message': f"{blueprint['title']} test session started",
             'session_id': test_session.id,
             'test_info': {
-                'test_type': 'TOEFL iBT Writing & Speaking',
-                'total_tasks': 6,
+                'blueprint': blueprint['name'],
+                'test_type': blueprint['title'],
+                'total_tasks': len(tasks),
                 'task_breakdown': {
-                    'speaking_tasks': 4,
-                    'writing_tasks': 2
+                    'speaking_tasks': speaking_tasks,
+                    'writing_tasks': writing_tasks
                 },
-                'time_limit_minutes': 60,
-                'scoring_scale': '0-5 points per task'
+                'time_limit_minutes': blueprint['time_limit_minutes'],
+                'scoring_scale': blueprint['scoring_scale']
             },
-            'tasks': questions_data,
+            'tasks': tasks_data,
             'instructions': [
-                'Complete all 6 tasks for a full TOEFL iBT evaluation',
+                f"Complete all {len(tasks)} tasks for a full {blueprint['title']} evaluation",
                 'Each task will be evaluated individually',
                 'Speaking tasks: Focus on fluency, clarity, and content development',
                 'Writing tasks: Focus on organization, grammar, and idea development',
@@ -97,207 +123,260 @@ def start_test_session():
 @jwt_required()
 def submit_test_answers():
     """
-    Submit TOEFL iBT test answers for evaluation.
-    Expects exactly 6 tasks: 4 speaking + 2 writing tasks.
-    Each task is evaluated individually using TOEFL iBT rubrics.
+    Submit full test answers for evaluation.
+    Expects one entry per task of the session's blueprint, in order.
+    Each task is evaluated individually.
+    Send "async": true to get a job id back immediately and poll /api/jobs/<id>.
     """
     try:
         user_id = int(get_jwt_identity())
         data = request.get_json()
 
-        if not data or not data.get('session_id') or not data.get('task_answers'):
-            return jsonify({'error': 'Missing session_id or task_answers'}), 400
+        if wants_async(data):
+            return enqueue_response('test_submit', {'user_id': user_id, 'data': data},
+                                    user_id=user_id, callback_url=(data or {}).get('callback_url'))
 
-        # Find test session
-        session = TestSession.query.filter_by(id=data['session_id'], user_id=user_id).first()
-        if not session:
-            return jsonify({'error': 'Test session not found'}), 404
+        body, status = evaluate_test_submission(user_id, data)
+        return jsonify(body), status
 
-        task_answers = data.get('task_answers', [])
-
-        # Validate that we have exactly 6 tasks for a complete TOEFL iBT test
-        if len(task_answers) != 6:
-            return jsonify({
-                'error': f'TOEFL iBT test requires exactly 6 tasks (4 speaking + 2 writing). Received {len(task_answers)} tasks.'
-            }), 400
-
-        # Import AI feedback function here to avoid circular imports
-        from app.ai_models.gemini import ai_toefl_feedback as gemini_feedback
-
-        total_score = 0
-        task_count = 0
-        detailed_feedback = []
-
-        # Define expected TOEFL iBT task structure
-        expected_tasks = [
-            {'task_id': 1, 'section': 'speaking', 'task_type': 'independent'},
-            {'task_id': 2, 'section': 'speaking', 'task_type': 'integrated'},
-            {'task_id': 3, 'section': 'speaking', 'task_type': 'integrated'},
-            {'task_id': 4, 'section': 'speaking', 'task_type': 'integrated'},
-            {'task_id': 5, 'section': 'writing', 'task_type': 'integrated'},
-            {'task_id': 6, 'section': 'writing', 'task_type': 'independent'}
-        ]
-
-        # Process each task individually
-        for i, task_data in enumerate(task_answers):
-            task_id = task_data.get('task_id')
-            task_type = task_data.get('task_type')
-            section = task_data.get('section')
-            answers = task_data.get('answers', [])
-
-            # Validate task structure
-            if not task_id or not task_type or not section:
-                return jsonify({
-                    'error': f'Task {i+1}: Missing required fields (task_id, task_type, section)'
-                }), 400
-
-            if not answers:
-                return jsonify({
-                    'error': f'Task {task_id}: No answers provided. Each task must have at least one answer.'
-                }), 400
-
-            # Validate against expected task structure
-            expected = expected_tasks[i] if i < len(expected_tasks) else None
-            if expected and (task_id != expected['task_id'] or
-                           section != expected['section'] or
-                           task_type != expected['task_type']):
-                return jsonify({
-                    'error': f'Task {task_id}: Invalid task structure. Expected task_id={expected["task_id"]}, section={expected["section"]}, task_type={expected["task_type"]}'
-                }), 400
-
-            # Collect question IDs and user inputs for this specific task
-            question_ids = []
-            user_inputs = []
-            combined_text = ""
-
-            for answer_item in answers:
-                question_id = answer_item.get('question_id')
-                answer_text = answer_item.get('answer', '').strip()
-
-                if question_id and answer_text:
-                    question_ids.append(question_id)
-                    user_inputs.append({
-                        'q_id': question_id,
-                        'answer': answer_text
-                    })
-                    combined_text += answer_text + " "
-
-            if not question_ids:
-                return jsonify({
-                    'error': f'Task {task_id}: No valid answers found. Each answer must have question_id and non-empty answer text.'
-                }), 400
-
-            # Evaluate this task individually using test mode
-            task_text = combined_text.strip()
-            feedback_result = gemini_feedback(task_text, mode="test")
-            task_score = feedback_result.get('score', 0)
-
-            # Validate score is within expected range (IELTS 0-9)
-            if not isinstance(task_score, (int, float)) or task_score < 0 or task_score > 9:
-                task_score = 0  # Default to 0 if invalid score
-            
-            # Ensure score is rounded to nearest 0.5 for IELTS standard
-            task_score = round(float(task_score) * 2) / 2
-
-            total_score += task_score
-            task_count += 1
-
-            # Save individual test answer record
-            test_answer = TestAnswer(
-                test_session_id=session.id,
-                section=section,
-                task_type=task_type,
-                combined_question_ids=json.dumps(question_ids),
-                user_inputs=json.dumps(user_inputs),
-                ai_feedback=json.dumps(feedback_result),
-                score=task_score
-            )
-            db.session.add(test_answer)
-
-            # Add to detailed feedback
-            detailed_feedback.append({
-                'task_id': task_id,
-                'task_type': task_type,
-                'section': section,
-                'score': task_score,
-                'feedback': feedback_result.get('feedback', []),
-                'suggested_correction': feedback_result.get('suggested_correction', ''),
-                'evaluation': feedback_result.get('evaluation', {}),
-                'pro_tips': feedback_result.get('pro_tips', []),
-                'reference_answer': feedback_result.get('reference_answer', ''),
-                'question_count': len(question_ids)
-            })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        # Calculate overall score (average of all 6 tasks)
-        overall_score = total_score / task_count if task_count > 0 else 0
-
-        # TOEFL iBT performance level descriptors (strict format)
-        # IELTS performance level descriptors (Bands 0-9)
-        if overall_score >= 8.5:
-            performance_level = "Expert User (Band 9)"
-        elif overall_score >= 7.5:
-            performance_level = "Very Good User (Band 8)"
-        elif overall_score >= 6.5:
-            performance_level = "Good User (Band 7)"
-        elif overall_score >= 5.5:
-            performance_level = "Competent User (Band 6)"
-        elif overall_score >= 4.5:
-            performance_level = "Modest User (Band 5)"
-        elif overall_score >= 3.5:
-            performance_level = "Limited User (Band 4)"
-        elif overall_score >= 2.5:
-            performance_level = "Extremely Limited User (Band 3)"
-        elif overall_score >= 1.5:
-            performance_level = "Intermittent User (Band 2)"
-        elif overall_score >= 0.5:
-            performance_level = "Non User (Band 1)"
-        else:
-            performance_level = "Did not attempt (Band 0)"
 
-        # Generate overall feedback
-        overall_feedback = f"IELTS Test Evaluation - Overall Score: {overall_score:.1f}/9.0 - Performance Level: {performance_level}"
+def _session_tasks(session):
+    """
+    (blueprint name, tasks) assigned when the session started. Sessions started
+    before blueprints existed were always the 6-task TOEFL iBT layout.
+    """
+    try:
+        started = json.loads(session.ai_feedback or '{}')
+    except json.JSONDecodeError:
+        started = {}
+    if isinstance(started, dict) and started.get('tasks'):
+        return started.get('blueprint'), started['tasks']
+    legacy = test_blueprints.normalise('toefl_ibt', test_blueprints.BUILTIN_BLUEPRINTS['toefl_ibt'])
+    return legacy['name'], legacy['slots']
+
+
+def evaluate_test_submission(user_id, data):
+    """Evaluate a full test submission. Returns (response body, status code)."""
+    if not data or not data.get('session_id') or not data.get('task_answers'):
+        return {'error': 'Missing session_id or task_answers'}, 400
+
+    # Find test session
+    session = TestSession.query.filter_by(id=data['session_id'], user_id=user_id).first()
+    if not session:
+        return {'error': 'Test session not found'}, 404
+
+    task_answers = data.get('task_answers', [])
+    blueprint_name, expected_tasks = _session_tasks(session)
+
+    # Validate that every task of the session's blueprint is answered
+    if len(task_answers) != len(expected_tasks):
+        return {
+            'error': f'This test requires exactly {len(expected_tasks)} tasks. Received {len(task_answers)} tasks.'
+        }, 400
+
+    # Import AI feedback function here to avoid circular imports
+    from app.ai_models.gemini import evaluate_many as gemini_evaluate_many
+
+    total_score = 0
+    task_count = 0
+    detailed_feedback = []
+
+    # Validate every task and collect its text before evaluating anything
+    tasks = []
+    for i, task_data in enumerate(task_answers):
+        task_id = task_data.get('task_id')
+        task_type = task_data.get('task_type')
+        section = task_data.get('section')
+        answers = task_data.get('answers', [])
+
+        # Validate task structure
+        if not task_id or not task_type or not section:
+            return {
+                'error': f'Task {i+1}: Missing required fields (task_id, task_type, section)'
+            }, 400
+
+        if not answers:
+            return {
+                'error': f'Task {task_id}: No answers provided. Each task must have at least one answer.'
+            }, 400
+
+        # Validate against the blueprint's task structure (sections/types are case-insensitive)
+        expected = expected_tasks[i]
+        if (task_id != expected['task_id'] or
+                str(section).lower() != expected['section'].lower() or
+                str(task_type).lower() != expected['task_type'].lower()):
+            return {
+                'error': f'Task {task_id}: Invalid task structure. Expected task_id={expected["task_id"]}, section={expected["section"]}, task_type={expected["task_type"]}'
+            }, 400
+
+        # Answers must be to the questions assigned to this task (legacy sessions
+        # did not record them)
+        assigned = expected.get('question_ids')
+        if assigned is not None:
+            unknown = [a.get('question_id') for a in answers if _to_int(a.get('question_id')) not in assigned]
+            if unknown:
+                return {
+                    'error': f'Task {task_id}: Question(s) {unknown} were not assigned to this task in this session.'
+                }, 400
+
+        # Collect question IDs and user inputs for this specific task
+        question_ids = []
+        user_inputs = []
+        combined_text = ""
+
+        for answer_item in answers:
+            question_id = answer_item.get('question_id')
+            answer_text = answer_item.get('answer', '').strip()
+
+            if question_id and answer_text:
+                question_ids.append(question_id)
+                user_inputs.append({
+                    'q_id': question_id,
+                    'answer': answer_text
+                })
+                combined_text += answer_text + " "
+
+        if not question_ids:
+            return {
+                'error': f'Task {task_id}: No valid answers found. Each answer must have question_id and non-empty answer text.'
+            }, 400
+
+        tasks.append({
+            'task_id': task_id,
+            'task_type': task_type,
+            'section': section,
+            'question_ids': question_ids,
+            'user_inputs': user_inputs,
+            'text': combined_text.strip()
+        })
 
-        # Update test session
-        session.total_score = overall_score
-        session.ai_feedback = json.dumps({
-            'overall_feedback': overall_feedback,
-            'detailed_feedback': detailed_feedback
+    # Evaluate all tasks concurrently using test mode (results keep task order)
+    feedback_results = gemini_evaluate_many([task['text'] for task in tasks], mode="test")
+
+    for task, feedback_result in zip(tasks, feedback_results):
+        task_score = feedback_result.get('score', 0)
+
+        # Validate score is within expected range (IELTS 0-9)
+        if not isinstance(task_score, (int, float)) or task_score < 0 or task_score > 9:
+            task_score = 0  # Default to 0 if invalid score
+        
+        # Ensure score is rounded to nearest 0.5 for IELTS standard
+        task_score = round(float(task_score) * 2) / 2
+
+        total_score += task_score
+        task_count += 1
+
+        # Save individual test answer record
+        test_answer = TestAnswer(
+            test_session_id=session.id,
+            section=task['section'],
+            task_type=task['task_type'],
+            combined_question_ids=json.dumps(task['question_ids']),
+            user_inputs=json.dumps(task['user_inputs']),
+            ai_feedback=json.dumps(feedback_result),
+            score=task_score
+        )
+        db.session.add(test_answer)
+
+        # Add to detailed feedback
+        detailed_feedback.append({
+            'task_id': task['task_id'],
+            'task_type': task['task_type'],
+            'section': task['section'],
+            'score': task_score,
+            'feedback': feedback_result.get('feedback', []),
+            'suggested_correction': feedback_result.get('suggested_correction', ''),
+            'evaluation': feedback_result.get('evaluation', {}),
+            'pro_tips': feedback_result.get('pro_tips', []),
+            'reference_answer': feedback_result.get('reference_answer', ''),
+            'question_count': len(task['question_ids'])
         })
-        session.finished_at = datetime.utcnow()
 
-        db.session.commit()
+    # Calculate overall score (average of all tasks)
+    overall_score = total_score / task_count if task_count > 0 else 0
+
+    # TOEFL iBT performance level descriptors (strict format)
+    # IELTS performance level descriptors (Bands 0-9)
+    if overall_score >= 8.5:
+        performance_level = "Expert User (Band 9)"
+    elif overall_score >= 7.5:
+        performance_level = "Very Good User (Band 8)"
+    elif overall_score >= 6.5:
+        performance_level = "Good User (Band 7)"
+    elif overall_score >= 5.5:
+        performance_level = "Competent User (Band 6)"
+    elif overall_score >= 4.5:
+        performance_level = "Modest User (Band 5)"
+    elif overall_score >= 3.5:
+        performance_level = "Limited User (Band 4)"
+    elif overall_score >= 2.5:
+        performance_level = "Extremely Limited User (Band 3)"
+    elif overall_score >= 1.5:
+        performance_level = "Intermittent User (Band 2)"
+    elif overall_score >= 0.5:
+        performance_level = "Non User (Band 1)"
+    else:
+        performance_level = "Did not attempt (Band 0)"
+
+    # Generate overall feedback
+    overall_feedback = f"IELTS Test Evaluation - Overall Score: {overall_score:.1f}/9.0 - Performance Level: {performance_level}"
+
+    # Update test session; the assigned tasks are kept for any later resubmission
+    session.total_score = overall_score
+    session.ai_feedback = json.dumps({
+        'overall_feedback': overall_feedback,
+        'detailed_feedback': detailed_feedback,
+        'blueprint': blueprint_name,
+        'tasks': expected_tasks
+    })
+    session.finished_at = datetime.utcnow()
+
+    db.session.commit()
+
+    # Return strict format response
+    return {
+        'message': 'TOEFL iBT Test Evaluation Completed',
+        'test_results': {
+            'overall_score': round(overall_score, 1),
+            'performance_level': performance_level,
+            'total_tasks_evaluated': task_count,
+            'test_type': 'IELTS Writing & Speaking'
+        },
+        'evaluation_summary': {
+            'overall_feedback': overall_feedback,
+            'detailed_task_feedback': detailed_feedback
+        },
+        'scoring_criteria': {
+            'scale': '0-9 Band Score per task',
+            'focus_areas': [
+                'Grammar accuracy',
+                'Idea development',
+                'Coherence and organization',
+                'Lexical range',
+                'Task completion'
+            ]
+        },
+        'session_info': {
+            'session_id': session.id,
+            'completed_at': session.finished_at.isoformat() if session.finished_at else None
+        }
+    }, 200
 
-        # Return strict format response
-        return jsonify({
-            'message': 'TOEFL iBT Test Evaluation Completed',
-            'test_results': {
-                'overall_score': round(overall_score, 1),
-                'performance_level': performance_level,
-                'total_tasks_evaluated': 6,
-                'test_type': 'IELTS Writing & Speaking'
-            },
-            'evaluation_summary': {
-                'overall_feedback': overall_feedback,
-                'detailed_task_feedback': detailed_feedback
-            },
-            'scoring_criteria': {
-                'scale': '0-9 Band Score per task',
-                'focus_areas': [
-                    'Grammar accuracy',
-                    'Idea development',
-                    'Coherence and organization',
-                    'Lexical range',
-                    'Task completion'
-                ]
-            },
-            'session_info': {
-                'session_id': session.id,
-                'completed_at': session.finished_at.isoformat() if session.finished_at else None
-            }
-        }), 200
 
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+def _pick_practice_ids(avoid):
+    """5 Speaking + 5 Writing question ids, or any 10 on a bank without those sections."""
+    chosen = question_sampler.sample_ids('speaking', 5, avoid=avoid) + \
+        question_sampler.sample_ids('writing', 5, avoid=avoid)
+
+    # Ensure we have enough questions (handling dev env with few questions)
+    if not chosen:
+        # Fallback if DB is small: just get what we have
+        chosen = question_sampler.sample_ids(None, 10, avoid=avoid)
+    return chosen
+
 
 @test_bp.route('/api/test/practice/start', methods=['POST'])
 @jwt_required()
@@ -308,20 +387,27 @@ def start_practice_test():
     try:
         user_id = int(get_jwt_identity())
         
-        # 1. Fetch random questions
-        # We need 5 Speaking and 5 Writing
-        speaking_questions = TestQuestion.query.filter(TestQuestion.section.ilike('speaking')).order_by(db.func.random()).limit(5).all()
-        writing_questions = TestQuestion.query.filter(TestQuestion.section.ilike('writing')).order_by(db.func.random()).limit(5).all()
-        
-        # Combine and shuffle
-        import random
-        all_questions = speaking_questions + writing_questions
-        random.shuffle(all_questions)
-        
-        # Ensure we have enough questions (handling dev env with few questions)
-        if not all_questions:
-             # Fallback if DB is small: just get what we have
-             all_questions = TestQuestion.query.order_by(db.func.random()).limit(10).all()
+        data = request.get_json(silent=True) or {}
+
+        # 1. Pick random questions: 5 Speaking and 5 Writing, preferring ones
+        # the user has not seen in their last few sessions
+        avoid = set()
+        if data.get('avoid_recent', True):
+            avoid = question_sampler.recent_question_ids(user_id, Config.PRACTICE_RECENT_SESSIONS)
+
+        # As in start_test_session: if the index handed out deleted questions,
+        # rebuild it and draw again once
+        for _ in range(2):
+            chosen = _pick_practice_ids(avoid)
+
+            # Combine and shuffle, then load the rows in one query
+            random.shuffle(chosen)
+            all_questions = question_sampler.fetch(chosen)
+            if len(all_questions) == len(chosen):
+                break
+            question_sampler.invalidate()
+        else:
+            return jsonify({'error': 'The question bank changed while the test was being assembled. Please try again.'}), 503
 
         # Create new test session (Practice Mode)
         test_session = TestSession(
@@ -357,120 +443,150 @@ def start_practice_test():
 def submit_practice_test():
     """
     Submit Practice Test answers.
-    Submit Practice Test answers.
     Expects list of answers. Evaluates each using Gemini or Alysa model.
+    Send "async": true to get a job id back immediately and poll /api/jobs/<id>.
     """
     try:
         user_id = int(get_jwt_identity())
         data = request.get_json()
 
-        if not data or not data.get('session_id') or not data.get('answers'):
-             return jsonify({'error': 'Missing session_id or answers'}), 400
+        if wants_async(data):
+            return enqueue_response('practice_submit', {'user_id': user_id, 'data': data},
+                                    user_id=user_id, callback_url=(data or {}).get('callback_url'))
 
-        session_id = data.get('session_id')
-        answers = data.get('answers') # List of {question_id, answer, section}
-        model_type = data.get('model', 'gemini').lower() # Default to gemini
+        body, status = evaluate_practice_submission(user_id, data)
+        return jsonify(body), status
 
-        # Find test session
-        session = TestSession.query.filter_by(id=session_id, user_id=user_id).first()
-        if not session:
-            return jsonify({'error': 'Test session not found'}), 404
+    except Exception as e:
+        print(f"Error in practice submit: {e}")
+        return jsonify({'error': str(e)}), 500
 
-        # Import AI feedback modules
-        from app.ai_models.gemini import ai_toefl_feedback as gemini_feedback
-        from app.ai_models.Alysa.examiner import evaluate as alysa_evaluate
 
-        total_score = 0
-        evaluated_count = 0
-        detailed_feedback_list = []
+def evaluate_practice_submission(user_id, data):
+    """Evaluate a practice test submission. Returns (response body, status code)."""
+    if not data or not data.get('session_id') or not data.get('answers'):
+         return {'error': 'Missing session_id or answers'}, 400
+
+    session_id = data.get('session_id')
+    answers = data.get('answers') # List of {question_id, answer, section}
+    model_type = data.get('model', 'gemini').lower() # Default to gemini
+
+    # Find test session
+    session = TestSession.query.filter_by(id=session_id, user_id=user_id).first()
+    if not session:
+        return {'error': 'Test session not found'}, 404
+
+    # Import AI feedback modules
+    from app.ai_models.gemini import evaluate_many as gemini_evaluate_many
+    from app.ai_models.Alysa.examiner import evaluate_batch as alysa_evaluate_batch
+
+    # Resolve every referenced question with a single query
+    question_ids = {_to_int(ans.get('question_id')) for ans in answers}
+    question_ids.discard(None)
+    questions = {}
+    if question_ids:
+        questions = {
+            q.id: q for q in TestQuestion.query.filter(TestQuestion.id.in_(question_ids)).all()
+        }
+
+    # Collect the answers that need an AI evaluation
+    to_evaluate = []  # (answer index, question, user_text)
+    for i, ans in enumerate(answers):
+        user_text = ans.get('answer', '').strip()
+        question = questions.get(_to_int(ans.get('question_id')))
+        if user_text and question:
+            to_evaluate.append((i, question, user_text))
+
+    # Evaluate Based on Model Selection
+    if model_type == 'alysa':
+        # Use Alysa Model: one batched pass over all answers
+        results = alysa_evaluate_batch(
+            [(question.prompt, user_text) for _, question, user_text in to_evaluate]
+        )
+    else:
+        # Default: Gemini Model (Test Mode) -> Only needs Answer, evaluated concurrently
+        results = gemini_evaluate_many([user_text for _, _, user_text in to_evaluate], mode="test")
+    evaluated = {item[0]: result for item, result in zip(to_evaluate, results)}
+
+    total_score = 0
+    evaluated_count = 0
+    detailed_feedback_list = []
+    
+    # Process each answer
+    for i, ans in enumerate(answers):
+        q_id = ans.get('question_id')
+        user_text = ans.get('answer', '').strip()
+        section = ans.get('section', 'General')
         
-        # Process each answer
-        for ans in answers:
-            q_id = ans.get('question_id')
-            user_text = ans.get('answer', '').strip()
-            section = ans.get('section', 'General')
-            
-            if not user_text:
-                detailed_feedback_list.append({
-                    'question_id': q_id,
-                    'user_answer': '',
-                    'score': 0,
-                    'feedback': ['No answer provided.']
-                })
-                continue
-
-            # Evaluate Based on Model Selection
-            feedback_result = {}
-            score = 0
-            question_text = ""
-
-            question = TestQuestion.query.get(q_id)
-            if question:
-                question_text = question.prompt
-                if model_type == 'alysa':
-                    # Use Alysa Model
-                    feedback_result = alysa_evaluate(question.prompt, user_text)
-                else:
-                    # Default: Gemini Model (Test Mode) -> Only needs Answer
-                    feedback_result = gemini_feedback(user_text, mode="test")
-            else:
-                feedback_result = {
-                    'score': 0,
-                    'feedback': ["Error: Question not found."]
-                }
-            
-            score = feedback_result.get('score', 0)
-            # Ensure score is rounded to nearest 0.5 for IELTS standard
-            score = round(float(score) * 2) / 2
-            
-            total_score += score
-            evaluated_count += 1
-            
-            # Save simple record (could be improved with TestAnswer model relation if needed strictly)
-            test_answer = TestAnswer(
-                test_session_id=session.id,
-                section=section,
-                task_type=f'Practice ({model_type.upper()})', 
-                combined_question_ids=json.dumps([q_id]),
-                user_inputs=json.dumps([{'q_id': q_id, 'answer': user_text}]),
-                ai_feedback=json.dumps(feedback_result),
-                score=score
-            )
-            db.session.add(test_answer)
-
+        if not user_text:
             detailed_feedback_list.append({
                 'question_id': q_id,
-                'question_text': question_text,
-                'user_answer': user_text,
-                'score': score,
-                'feedback': feedback_result.get('feedback', []),
-                'suggested_correction': feedback_result.get('suggested_correction', ''),
-                'evaluation': feedback_result.get('evaluation', {}),
-                'pro_tips': feedback_result.get('pro_tips', []),
-                'reference_answer': feedback_result.get('reference_answer', '')
+                'user_answer': '',
+                'score': 0,
+                'feedback': ['No answer provided.']
             })
+            continue
 
-        # Finalize Session
-        # Calculate overall score (0-100) based on 10 tasks * band 9 max = 90 total possible
-        # Formula: (total_score / 90) * 100
-        avg_score = (total_score / 90.0) * 100 if evaluated_count > 0 else 0
-        avg_score = round(avg_score, 1)
+        question = questions.get(_to_int(q_id))
+        if question:
+            question_text = question.prompt
+            feedback_result = evaluated[i]
+        else:
+            question_text = ""
+            feedback_result = {
+                'score': 0,
+                'feedback': ["Error: Question not found."]
+            }
         
-        session.total_score = avg_score
-        session.finished_at = datetime.utcnow()
-        session.ai_feedback = json.dumps({'detailed_feedback': detailed_feedback_list})
+        score = feedback_result.get('score', 0)
+        # Ensure score is rounded to nearest 0.5 for IELTS standard
+        score = round(float(score) * 2) / 2
         
-        db.session.commit()
+        total_score += score
+        evaluated_count += 1
+        
+        # Save simple record (could be improved with TestAnswer model relation if needed strictly)
+        test_answer = TestAnswer(
+            test_session_id=session.id,
+            section=section,
+            task_type=f'Practice ({model_type.upper()})', 
+            combined_question_ids=json.dumps([q_id]),
+            user_inputs=json.dumps([{'q_id': q_id, 'answer': user_text}]),
+            ai_feedback=json.dumps(feedback_result),
+            score=score
+        )
+        db.session.add(test_answer)
+
+        detailed_feedback_list.append({
+            'question_id': q_id,
+            'question_text': question_text,
+            'user_answer': user_text,
+            'score': score,
+            'feedback': feedback_result.get('feedback', []),
+            'suggested_correction': feedback_result.get('suggested_correction', ''),
+            'evaluation': feedback_result.get('evaluation', {}),
+            'pro_tips': feedback_result.get('pro_tips', []),
+            'reference_answer': feedback_result.get('reference_answer', '')
+        })
 
-        return jsonify({
-            'message': 'Practice test evaluated',
-            'overall_score': round(avg_score, 1),
-            'results': detailed_feedback_list
-        }), 200
+    # Finalize Session
+    # Calculate overall score (0-100) based on 10 tasks * band 9 max = 90 total possible
+    # Formula: (total_score / 90) * 100
+    avg_score = (total_score / 90.0) * 100 if evaluated_count > 0 else 0
+    avg_score = round(avg_score, 1)
+    
+    session.total_score = avg_score
+    session.finished_at = datetime.utcnow()
+    session.ai_feedback = json.dumps({'detailed_feedback': detailed_feedback_list})
+    
+    db.session.commit()
+
+    return {
+        'message': 'Practice test evaluated',
+        'overall_score': round(avg_score, 1),
+        'results': detailed_feedback_list
+    }, 200
 
-    except Exception as e:
-        print(f"Error in practice submit: {e}")
-        return jsonify({'error': str(e)}), 500
 
 @test_bp.route('/api/test/session/<int:session_id>', methods=['GET'])
 @jwt_required()
@@ -533,3 +649,8 @@ def get_test_session_details(session_id):
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+# Background evaluation (/api/jobs)
+register_handler('test_submit', lambda p: evaluate_test_submission(p['user_id'], p['data']))
+register_handler('practice_submit', lambda p: evaluate_practice_submission(p['user_id'], p['data']))
@@ -2,7 +2,9 @@ import json
 from datetime import datetime
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
-from app.models.database import db, User, OCRTranslation, TestAnswer, TestSession, UserAttempt
+from sqlalchemy.orm import defer, selectinload
+from app.models.database import db, User, TestAnswer, TestSession, UserAttempt
+from app.utils.pagination import keyset_page, page_args, page_info
 
 user_bp = Blueprint('user', __name__)
 
@@ -84,110 +86,98 @@ def update_user_profile():
 @user_bp.route('/api/user/attempts', methods=['GET'])
 @jwt_required()
 def get_user_attempts():
+    """Paginated practice attempts, newest first: ?limit=20&cursor=<next_cursor>."""
     try:
         user_id = int(get_jwt_identity())
-        attempts = UserAttempt.query.filter_by(user_id=user_id).order_by(UserAttempt.created_at.desc()).all()
+        limit, cursor = page_args()
+
+        try:
+            attempts, next_cursor = keyset_page(UserAttempt.query.filter_by(user_id=user_id),
+                                                UserAttempt.created_at, UserAttempt.id, limit, cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         attempts_data = []
         for attempt in attempts:
-            # Get the related learning question
-            question = attempt.learning_question
             attempts_data.append({
                 'id': attempt.id,
-                'learning_question_id': attempt.learning_question_id,
-                'question_prompt': question.prompt if question else 'Question not found',
-                'question_skill_type': question.skill_type if question else 'unknown',
-                'question_level': question.level if question else 0,
+                'question_type': attempt.question_type,
+                'question_id': attempt.question_id,
                 'user_input': attempt.user_input,
                 'score': attempt.score,
-                'created_at': attempt.created_at.isoformat(),
-                'feedback': json.loads(attempt.ai_feedback) if attempt.ai_feedback else {}
+                'created_at': attempt.created_at.isoformat() if attempt.created_at else None,
+                'feedback': _load_json(attempt.ai_feedback, {}, lambda raw: {'message': str(raw)})
             })
 
-        return jsonify({'attempts': attempts_data}), 200
+        return jsonify({'attempts': attempts_data, 'pagination': page_info(limit, next_cursor)}), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _load_json(raw, default, on_error):
+    """json.loads that tolerates legacy plain-text values."""
+    if not raw:
+        return default
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return on_error(raw)
+
+def _serialize_answer(answer, summary):
+    data = {
+        'id': answer.id,
+        'section': answer.section,
+        'task_type': answer.task_type,
+        'score': answer.score,
+        'created_at': answer.created_at.isoformat()
+    }
+    if not summary:
+        data['question_ids'] = _load_json(answer.combined_question_ids, [], lambda raw: [])
+        data['user_inputs'] = _load_json(answer.user_inputs, [], lambda raw: [])
+        data['feedback'] = _load_json(answer.ai_feedback, {}, lambda raw: {'message': str(raw)})
+    return data
+
 @user_bp.route('/api/user/test-sessions', methods=['GET'])
 @jwt_required()
 def get_user_test_sessions():
+    """
+    Paginated test history, newest first: ?limit=20&cursor=<next_cursor>.
+    ?summary=1 returns scores only and skips the feedback / user_inputs blobs.
+    Sessions and their answers are loaded in two queries regardless of page size.
+    """
     try:
         user_id = int(get_jwt_identity())
-        sessions = TestSession.query.filter_by(user_id=user_id).order_by(TestSession.started_at.desc()).all()
+        limit, cursor = page_args()
+        summary = request.args.get('summary', '').lower() in ('1', 'true', 'yes')
+
+        answers = selectinload(TestSession.test_answers)
+        query = TestSession.query.filter_by(user_id=user_id)
+        if summary:
+            answers = answers.load_only(TestAnswer.id, TestAnswer.test_session_id, TestAnswer.section,
+                                        TestAnswer.task_type, TestAnswer.score, TestAnswer.created_at)
+            query = query.options(defer(TestSession.ai_feedback))
+        query = query.options(answers)
+
+        try:
+            sessions, next_cursor = keyset_page(query, TestSession.started_at, TestSession.id, limit, cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         sessions_data = []
         for session in sessions:
-            # Get related test answers
-            test_answers = TestAnswer.query.filter_by(test_session_id=session.id).all()
-
-            test_answers_data = []
-            for answer in test_answers:
-                # Safe load JSON for answers
-                try:
-                    display_q_ids = json.loads(answer.combined_question_ids) if answer.combined_question_ids else []
-                except json.JSONDecodeError:
-                    display_q_ids = []
-                
-                try:
-                    display_inputs = json.loads(answer.user_inputs) if answer.user_inputs else []
-                except json.JSONDecodeError:
-                    display_inputs = []
-                
-                try:
-                    display_feedback = json.loads(answer.ai_feedback) if answer.ai_feedback else {}
-                except json.JSONDecodeError:
-                    display_feedback = {'message': str(answer.ai_feedback)}
-
-                test_answers_data.append({
-                    'id': answer.id,
-                    'section': answer.section,
-                    'task_type': answer.task_type,
-                    'score': answer.score,
-                    'question_ids': display_q_ids,
-                    'user_inputs': display_inputs,
-                    'feedback': display_feedback,
-                    'created_at': answer.created_at.isoformat()
-                })
-
-            # Safe load session feedback
-            try:
-                session_feedback = json.loads(session.ai_feedback) if session.ai_feedback else {}
-            except json.JSONDecodeError:
-                # Handle plain string case (e.g. "Test in progress")
-                session_feedback = {'overall_feedback': str(session.ai_feedback)}
-
-            sessions_data.append({
+            data = {
                 'id': session.id,
                 'total_score': session.total_score,
                 'started_at': session.started_at.isoformat() if session.started_at else datetime.now().isoformat(), # Handle missing started_at if any
                 'finished_at': session.finished_at.isoformat() if session.finished_at else None,
-                'feedback': session_feedback,
-                'test_answers': test_answers_data
-            })
-
-        return jsonify({'test_sessions': sessions_data}), 200
-
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@user_bp.route('/api/user/ocr-history', methods=['GET'])
-@jwt_required()
-def get_user_ocr_history():
-    try:
-        user_id = int(get_jwt_identity())
-        ocr_records = OCRTranslation.query.filter_by(user_id=user_id).order_by(OCRTranslation.created_at.desc()).all()
-
-        ocr_data = []
-        for record in ocr_records:
-            ocr_data.append({
-                'id': record.id,
-                'original_text': record.original_text,
-                'result': json.loads(record.translated_and_explained) if record.translated_and_explained else {},
-                'created_at': record.created_at.isoformat()
-            })
+                'test_answers': [_serialize_answer(answer, summary) for answer in session.test_answers]
+            }
+            if not summary:
+                # Handle plain string case (e.g. "Test in progress")
+                data['feedback'] = _load_json(session.ai_feedback, {}, lambda raw: {'overall_feedback': str(raw)})
+            sessions_data.append(data)
 
-        return jsonify({'ocr_history': ocr_data}), 200
+        return jsonify({'test_sessions': sessions_data, 'pagination': page_info(limit, next_cursor)}), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
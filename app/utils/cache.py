@@ -0,0 +1,246 @@
+"""
+Small key/value cache with pluggable backends and hit/miss counters.
+
+Backends:
+- memory: in-process LRU (default, per worker process)
+- sqlite: file-backed, shared by every process on the host
+- redis:  any Redis-compatible server (requires the `redis` package)
+- none:   disables caching
+
+Version keys and other state that every worker must agree on go through
+build_shared_cache(), which never uses a per-process backend.
+
+Values must be JSON-serialisable. They are stored serialised in every backend,
+so callers always get a fresh copy they are free to mutate.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.utils.metrics import register_stats
+from config import Config
+
+SHARED_BACKENDS = ('sqlite', 'redis')
+
+
+class MemoryBackend:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self, prefix=''):
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+    def size(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] < time.time():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            return row[0]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self, prefix=''):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key LIKE ?", (prefix + '%',))
+
+    def size(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class RedisBackend:
+    def __init__(self, url):
+        import redis
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(key)
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self._client.set(key, value, ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self._client.delete(key)
+
+    def clear(self, prefix=''):
+        for key in self._client.scan_iter(match=prefix + '*'):
+            self._client.delete(key)
+
+    def size(self):
+        return None
+
+
+class Cache:
+    """Namespaced cache over a backend, with hit/miss accounting."""
+
+    def __init__(self, namespace, backend, backend_name, ttl=None):
+        self.namespace = namespace
+        self.backend = backend
+        self.backend_name = backend_name
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.errors = 0
+
+    def _key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def get(self, key):
+        if self.backend is None:
+            return None
+        try:
+            raw = self.backend.get(self._key(key))
+        except Exception as e:
+            print(f"Cache '{self.namespace}' get failed: {e}")
+            self.errors += 1
+            raw = None
+
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(self._key(key), json.dumps(value), ttl or self.ttl)
+            self.sets += 1
+        except Exception as e:
+            print(f"Cache '{self.namespace}' set failed: {e}")
+            self.errors += 1
+
+    def delete(self, key):
+        if self.backend is not None:
+            self.backend.delete(self._key(key))
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear(self._key(''))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        size = None
+        if self.backend is not None:
+            try:
+                size = self.backend.size()
+            except Exception:
+                pass
+        return {
+            'backend': self.backend_name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'sets': self.sets,
+            'errors': self.errors,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'size': size,
+        }
+
+
+def _make_backend(name, max_entries):
+    if name == 'memory':
+        return MemoryBackend(max_entries=max_entries)
+    if name == 'sqlite':
+        return SQLiteBackend(Config.CACHE_SQLITE_PATH)
+    if name == 'redis':
+        return RedisBackend(Config.CACHE_REDIS_URL)
+    if name in ('none', '', None):
+        return None
+    raise ValueError(f"Unknown cache backend: {name}")
+
+
+def build_cache(namespace, backend=None, ttl=None, max_entries=None):
+    """
+    Create a cache for a subsystem and expose its counters under
+    /api/metrics as "cache.<namespace>".
+    """
+    backend_name = (backend or Config.CACHE_BACKEND).lower()
+    try:
+        store = _make_backend(backend_name, max_entries or Config.CACHE_MAX_ENTRIES)
+    except Exception as e:
+        # A missing redis package or unwritable path must not take the API down
+        print(f"Cache '{namespace}': backend '{backend_name}' unavailable ({e}), using memory")
+        backend_name = 'memory'
+        store = MemoryBackend(max_entries=max_entries or Config.CACHE_MAX_ENTRIES)
+
+    cache = Cache(namespace, store, backend_name, ttl=ttl)
+    register_stats(f"cache.{namespace}", cache.stats)
+    return cache
+
+
+def build_shared_cache(namespace, backend=None, ttl=None):
+    """
+    A cache seen by every worker process, for state they must agree on
+    (content versions, per-user bitmaps). A per-process backend (memory, none)
+    is replaced by sqlite, which is shared by every process on the host.
+    """
+    backend_name = (backend or Config.CACHE_BACKEND).lower()
+    if backend_name not in SHARED_BACKENDS:
+        backend_name = 'sqlite'
+    return build_cache(namespace, backend=backend_name, ttl=ttl)
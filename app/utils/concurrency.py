@@ -0,0 +1,100 @@
+"""
+Bounded fan-out for independent, I/O-bound calls (mostly LLM round trips).
+
+All callers share one worker pool, so the number of in-flight AI calls per
+process is capped no matter how many requests arrive at once.
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import Config
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Shared worker pool, created on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.AI_MAX_CONCURRENCY,
+                    thread_name_prefix='ai-worker'
+                )
+    return _executor
+
+
+def map_bounded(fn, items, timeout=None, fallback=None, deadline=None):
+    """
+    Run fn(item) for every item on the shared pool and return the results in
+    input order.
+
+    timeout:  seconds a single call may run once it has started.
+    deadline: seconds the whole batch may take from submission, including time
+              spent queued behind other callers' work. Calls not finished by
+              then (running or still queued) time out.
+    fallback: fallback(item, exc) builds the result for a call that raised or
+              timed out. Without it the exception is re-raised.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    started = {}
+
+    def run(index):
+        started[index] = time.monotonic()
+        return fn(items[index])
+
+    executor = get_executor()
+    batch_end = time.monotonic() + deadline if deadline is not None else None
+    futures = {executor.submit(run, i): i for i in range(len(items))}
+    results = [None] * len(items)
+    pending = set(futures)
+
+    def resolve(future, exc):
+        index = futures[future]
+        if fallback is None:
+            raise exc
+        results[index] = fallback(items[index], exc)
+
+    while pending:
+        now = time.monotonic()
+        wake_at = []
+
+        if batch_end is not None:
+            if now >= batch_end:
+                # Whatever is left missed the batch deadline; queued calls never start
+                for future in list(pending):
+                    pending.discard(future)
+                    future.cancel()
+                    resolve(future, TimeoutError(f'Batch deadline of {deadline:.0f}s exceeded'))
+                break
+            wake_at.append(batch_end)
+
+        if timeout is not None:
+            # Give up on calls that have been running longer than the timeout
+            for future in list(pending):
+                start = started.get(futures[future])
+                if start is not None and now - start >= timeout and not future.done():
+                    pending.discard(future)
+                    future.cancel()
+                    resolve(future, TimeoutError(f'Timed out after {timeout:.0f}s'))
+            if not pending:
+                break
+
+            running = [started[futures[f]] for f in pending if futures[f] in started]
+            wake_at.append(min(running) + timeout if running else now + timeout)
+
+        wait_for = max(0.01, min(wake_at) - now) if wake_at else None
+        done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                resolve(future, e)
+
+    return results
@@ -0,0 +1,117 @@
+"""
+Read-through cache for learning content: the lesson catalog, lesson detail
+and quiz endpoints.
+
+Entries hold the response body already serialised to JSON, plus its ETag, so
+a hit costs no query and no json.dumps. Every key carries the current content
+version. invalidate() (called by the admin CRUD handlers and the importer)
+bumps the version, and every older entry then simply stops being read and ages
+out of the backend.
+
+The catalog is per user (isCompleted), so it is cached as one pre-serialised
+fragment per lesson. The user's completion flag is spliced in at response time.
+
+The version lives in a shared cache (sqlite, or redis when
+CONTENT_CACHE_BACKEND is redis), so an edit made through one worker or a
+script invalidates every worker at once. The entries themselves may stay in
+per-process memory: they are only read under the current version. With
+several hosts, use redis.
+"""
+import hashlib
+import json
+import time
+import uuid
+from email.utils import formatdate
+
+from flask import Response, request
+
+from app.utils.cache import build_cache, build_shared_cache
+from config import Config
+
+_cache = build_cache("content", backend=Config.CONTENT_CACHE_BACKEND, ttl=Config.CONTENT_CACHE_TTL)
+_versions = build_shared_cache("content_version", backend=Config.CONTENT_CACHE_BACKEND,
+                               ttl=Config.CONTENT_CACHE_TTL)
+
+
+def dumps(data):
+    return json.dumps(data, separators=(',', ':'), sort_keys=True)
+
+
+def etag_for(body):
+    return hashlib.sha1(body.encode('utf-8')).hexdigest()[:20]
+
+
+# ===== VERSIONING =====
+def current_version():
+    """{'id': ..., 'modified': unix time} of the current content version."""
+    version = _versions.get('version')
+    if version is None:
+        version = invalidate()
+    return version
+
+
+def invalidate():
+    """Start a new content version; call after committing any content change."""
+    version = {'id': uuid.uuid4().hex[:12], 'modified': time.time()}
+    _versions.set('version', version)
+    return version
+
+
+# ===== READ-THROUGH =====
+def get_or_build(key, build):
+    """
+    Cached {'body', 'etag', 'modified'} for `key` under the current version.
+    build() returns the JSON-serialisable payload, or None for "not found"
+    (which is not cached).
+    """
+    version = current_version()
+    versioned_key = f"{version['id']}:{key}"
+    entry = _cache.get(versioned_key)
+    if entry is None:
+        data = build()
+        if data is None:
+            return None
+        body = dumps(data)
+        entry = {'body': body, 'etag': etag_for(body), 'modified': version['modified']}
+        _cache.set(versioned_key, entry)
+    return entry
+
+
+def get_catalog(key, build):
+    """
+    Cached catalog {'items': [[lesson_id, fragment], ...], 'modified'}. Each
+    fragment is one lesson's JSON object without its closing brace, ready for
+    render_catalog() to append the per-user isCompleted flag.
+    build() returns the list of lesson dicts (each with an 'id').
+    """
+    version = current_version()
+    versioned_key = f"{version['id']}:{key}"
+    entry = _cache.get(versioned_key)
+    if entry is None:
+        items = [[lesson['id'], dumps(lesson)[:-1]] for lesson in build()]
+        entry = {'items': items, 'modified': version['modified']}
+        _cache.set(versioned_key, entry)
+    return entry
+
+
+def render_catalog(entry, completed_ids):
+    lessons = ','.join(
+        f'{fragment},"isCompleted":{"true" if lesson_id in completed_ids else "false"}}}'
+        for lesson_id, fragment in entry['items']
+    )
+    return '{"lessons":[' + lessons + ']}'
+
+
+def json_response(body, etag=None, modified=None, private=False):
+    """
+    200 with the pre-serialised body, or 304 when the client's If-None-Match /
+    If-Modified-Since still matches. Personalised responses are marked private
+    and carry no Last-Modified (the content version says nothing about them).
+    """
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag or etag_for(body))
+    if modified is not None and not private:
+        response.headers['Last-Modified'] = formatdate(modified, usegmt=True)
+    response.headers['Cache-Control'] = ('private, ' if private else '') + 'no-cache'
+    return response.make_conditional(request)
+
@@ -0,0 +1,261 @@
+"""
+Bulk loader for learning content and the test question bank
+(bank-materi-and-soal/alysa_*.csv, or .parquet with the same columns).
+
+Rows are streamed (never the whole file in memory), validated, and written
+with one multi-row upsert per batch (app/models/upsert.py), committing per
+batch. Re-importing a file updates rows in place by id. Driven by
+import_content.py at the repository root.
+"""
+import csv
+import json
+import os
+import time
+from datetime import datetime
+
+from app.models.database import Lesson, LessonSection, Quiz, QuizQuestion, TestQuestion, db
+from app.models.upsert import upsert
+
+NULLS = {'', 'NULL', 'null', 'None'}
+
+
+# ===== FIELD PARSERS =====
+def _value(row, field, required=False):
+    value = row.get(field)
+    value = value.strip() if isinstance(value, str) else value
+    if value is None or value in NULLS:
+        if required:
+            raise ValueError(f"missing {field}")
+        return None
+    return value
+
+
+def _int(row, field, required=False):
+    value = _value(row, field, required)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} is not an integer: {value!r}")
+
+
+def _datetime(row, field):
+    value = _value(row, field)
+    if value is None or isinstance(value, datetime):
+        return value
+    for fmt in ('%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{field} is not a date: {value!r}")
+
+
+# ===== ROW CONVERTERS (CSV row -> column dict) =====
+def lesson_row(row):
+    return {
+        'id': _value(row, 'id', required=True),
+        'title': _value(row, 'title', required=True),
+        'description': _value(row, 'description'),
+        'category': _value(row, 'category'),
+        'duration_minutes': _int(row, 'duration_minutes') or 0,
+        'created_at': _datetime(row, 'created_at') or datetime.now(),
+    }
+
+
+def quiz_row(row):
+    return {'id': _value(row, 'id', required=True), 'title': _value(row, 'title', required=True)}
+
+
+def section_row(row):
+    return {
+        'id': _int(row, 'id', required=True),
+        'lesson_id': _value(row, 'lesson_id', required=True),
+        'title': _value(row, 'title', required=True),
+        'content': _value(row, 'content') or '',
+        'quiz_id': _value(row, 'quiz_id'),
+    }
+
+
+def quiz_question_row(row):
+    raw_options = _value(row, 'options', required=True)
+    try:
+        options = json.loads(raw_options) if isinstance(raw_options, str) else list(raw_options)
+    except ValueError:
+        raise ValueError(f"options is not a JSON list: {raw_options[:40]!r}")
+    if not isinstance(options, list) or len(options) < 2:
+        raise ValueError("options needs at least two choices")
+
+    correct = _int(row, 'correct_option_index', required=True)
+    if not 0 <= correct < len(options):
+        raise ValueError(f"correct_option_index {correct} out of range for {len(options)} options")
+    return {
+        'id': _int(row, 'id', required=True),
+        'quiz_id': _value(row, 'quiz_id', required=True),
+        'question_text': _value(row, 'question_text', required=True),
+        'options': json.dumps(options),
+        'correct_option_index': correct,
+    }
+
+
+def test_question_row(row):
+    # Stored like the admin form does: a JSON list of keywords
+    keywords = _value(row, 'keywords')
+    if keywords is not None and not keywords.startswith('['):
+        keywords = json.dumps([k.strip() for k in keywords.split(',') if k.strip()])
+    return {
+        'id': _int(row, 'id', required=True),
+        'section': _value(row, 'section', required=True),
+        'task_type': _value(row, 'task_type', required=True),
+        'prompt': _value(row, 'prompt', required=True),
+        'reference_answer': _value(row, 'reference_answer'),
+        'keywords': keywords,
+        'created_at': _datetime(row, 'created_at') or datetime.now(),
+    }
+
+
+class Dataset:
+    def __init__(self, name, model, convert, references=None):
+        self.name = name
+        self.model = model
+        self.convert = convert
+        self.references = references or {}  # column -> parent dataset name
+
+    @property
+    def update_columns(self):
+        return [c.name for c in self.model.__table__.columns if c.name != 'id']
+
+
+# Parents before children so foreign keys resolve
+DATASETS = [
+    Dataset('lessons', Lesson, lesson_row),
+    Dataset('quizzes', Quiz, quiz_row),
+    Dataset('lesson_sections', LessonSection, section_row, {'lesson_id': 'lessons', 'quiz_id': 'quizzes'}),
+    Dataset('quiz_questions', QuizQuestion, quiz_question_row, {'quiz_id': 'quizzes'}),
+    Dataset('test_questions', TestQuestion, test_question_row),
+]
+DATASETS_BY_NAME = {dataset.name: dataset for dataset in DATASETS}
+
+
+# ===== READING =====
+def find_file(directory, name, prefix='alysa_'):
+    for ext in ('.csv', '.parquet'):
+        path = os.path.join(directory, f"{prefix}{name}{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def iter_rows(path):
+    """Yield (line_number, dict) without loading the file into memory."""
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Reading Parquet needs the 'pyarrow' package")
+        line = 1
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=10000):
+            for row in batch.to_pylist():
+                line += 1
+                yield line, {k: (str(v) if isinstance(v, (int, float)) else v) for k, v in row.items()}
+        return
+
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+
+
+# ===== LOADING =====
+class ImportReport:
+    def __init__(self, name, path, dry_run=False):
+        self.name = name
+        self.path = path
+        self.dry_run = dry_run
+        self.rows = 0
+        self.written = 0
+        self.would_write = 0  # dry run: valid rows that a real run would upsert
+        self.errors = []
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        written = f"{self.would_write} would be written" if self.dry_run else f"{self.written} written"
+        return (f"{self.name}: {self.rows} rows, {written}, {len(self.errors)} invalid "
+                f"in {self.seconds:.2f}s ({self.rows_per_second:,.0f} rows/s)")
+
+
+def _existing_ids(model):
+    return {row_id for (row_id,) in db.session.query(model.id).all()}
+
+
+def import_dataset(dataset, path, known_ids, batch_size=1000, dry_run=False):
+    """
+    Stream, validate and upsert one file. known_ids maps dataset name -> ids that
+    foreign keys may point at; this dataset's ids are added to it.
+    """
+    report = ImportReport(dataset.name, path, dry_run=dry_run)
+    ids = known_ids.setdefault(dataset.name, set())
+    batch = {}
+    start = time.perf_counter()
+
+    def flush():
+        if dry_run:
+            report.would_write += len(batch)
+        elif batch:
+            upsert(dataset.model, list(batch.values()), ['id'], dataset.update_columns)
+            db.session.commit()
+            report.written += len(batch)
+        batch.clear()
+
+    for line, raw in iter_rows(path):
+        report.rows += 1
+        try:
+            row = dataset.convert(raw)
+            for column, parent in dataset.references.items():
+                if row[column] is not None and row[column] not in known_ids.get(parent, ()):
+                    raise ValueError(f"{column} {row[column]!r} does not exist")
+        except ValueError as e:
+            report.errors.append((line, str(e)))
+            continue
+
+        ids.add(row['id'])
+        batch[row['id']] = row  # a repeated id in one batch keeps the last row
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def import_directory(directory, names=None, batch_size=1000, dry_run=False):
+    """Import every dataset file found in `directory` (or just `names`). Returns reports."""
+    selected = [d for d in DATASETS if (not names or d.name in names) and find_file(directory, d.name)]
+
+    # Foreign keys may point at rows already in the database or imported in this run
+    known_ids = {}
+    for parent in {parent for d in selected for parent in d.references.values()}:
+        known_ids[parent] = _existing_ids(DATASETS_BY_NAME[parent].model)
+
+    reports = [import_dataset(d, find_file(directory, d.name), known_ids, batch_size, dry_run)
+               for d in selected]
+
+    if not dry_run and any(r.written for r in reports):
+        _after_import()
+    return reports
+
+
+def _after_import():
+    # Core upserts bypass the ORM events that keep caches and counters current
+    from app.utils import content_cache, question_sampler, stat_counters
+    content_cache.invalidate()
+    question_sampler.invalidate()
+    stat_counters.reconcile()
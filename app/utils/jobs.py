@@ -0,0 +1,352 @@
+"""
+Background job queue for long-running AI evaluations.
+
+Routes enqueue work and return a job id straight away; worker threads run the
+job inside an app context and store the result on the `jobs` table. Clients
+poll GET /api/jobs/<id> or pass a `callback_url` to be notified.
+
+Jobs live in the application database, so no external broker is needed:
+- new jobs are handed to this process's workers through an in-memory queue
+- workers also poll the table, which picks up jobs left behind by a restart or
+  enqueued by another process
+- a job is claimed with a conditional UPDATE, so it runs exactly once
+- while a job runs, its process refreshes heartbeat_at; only jobs whose
+  heartbeat stopped (the worker or its process died) are requeued
+
+Callback URLs must resolve to public addresses (or match
+JOB_CALLBACK_ALLOWED_HOSTS). The POST goes to the vetted address and
+redirects are not followed, so a callback cannot reach internal services.
+"""
+import http.client
+import ipaddress
+import json
+import queue
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from flask import jsonify, request
+
+from app.models.database import Job, db
+from app.utils.metrics import register_stats
+from config import Config
+
+_app = None
+_handlers = {}
+_queue = queue.Queue()
+_workers = []
+_workers_lock = threading.Lock()
+_running = set()  # ids of jobs this process is running, kept alive by the heartbeat
+
+
+def init_app(app):
+    """Remember the app so worker threads can push an app context."""
+    global _app
+    _app = app
+
+
+def register_handler(kind, handler):
+    """
+    handler(payload) -> (body, status_code). The body is stored as the job
+    result, exactly as the synchronous endpoint would have returned it.
+    """
+    _handlers[kind] = handler
+
+
+def wants_async(data=None):
+    """True when the client asked for background processing (?async=1 or "async": true)."""
+    flag = request.args.get('async') or request.form.get('async')
+    if flag is None and isinstance(data, dict):
+        flag = data.get('async')
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+
+# ==========================================
+# Enqueue & status
+# ==========================================
+
+def enqueue(kind, payload, user_id=None, callback_url=None):
+    if kind not in _handlers:
+        raise ValueError(f"No job handler registered for '{kind}'")
+    if callback_url:
+        check_callback_url(callback_url)
+
+    job = Job(
+        id=uuid.uuid4().hex,
+        kind=kind,
+        user_id=user_id,
+        status='queued',
+        payload=json.dumps(payload),
+        callback_url=callback_url
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    _ensure_workers()
+    _queue.put(job.id)
+    return job
+
+
+def enqueue_response(kind, payload, user_id=None, callback_url=None):
+    """Enqueue a job and build the 202 response returned by async endpoints."""
+    if callback_url:
+        try:
+            check_callback_url(callback_url)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid callback_url: {e}'}), 400
+    job = enqueue(kind, payload, user_id=user_id, callback_url=callback_url)
+    return jsonify({
+        'message': 'Job queued',
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/jobs/{job.id}'
+    }), 202
+
+
+def serialize_job(job):
+    try:
+        result = json.loads(job.result) if job.result else None
+    except json.JSONDecodeError:
+        result = {'message': job.result}
+
+    return {
+        'job_id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'status_code': job.status_code,
+        'result': result,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+# ==========================================
+# Workers
+# ==========================================
+
+def _ensure_workers():
+    if _workers or Config.JOB_WORKERS <= 0:
+        return
+    with _workers_lock:
+        if _workers:
+            return
+        for i in range(Config.JOB_WORKERS):
+            worker = threading.Thread(target=_worker_loop, name=f'job-worker-{i}', daemon=True)
+            worker.start()
+            _workers.append(worker)
+        threading.Thread(target=_heartbeat_loop, name='job-heartbeat', daemon=True).start()
+        print(f"Started {len(_workers)} job workers")
+
+
+def start_workers():
+    """Start workers eagerly; the server does this at boot so queued jobs survive a restart."""
+    _ensure_workers()
+
+
+def _heartbeat_loop():
+    while True:
+        time.sleep(Config.JOB_HEARTBEAT_SECONDS)
+        running = list(_running)
+        if not running:
+            continue
+        with _app.app_context():
+            try:
+                Job.query.filter(Job.id.in_(running), Job.status == 'running')\
+                    .update({'heartbeat_at': datetime.utcnow()}, synchronize_session=False)
+                db.session.commit()
+            except Exception as e:
+                print(f"Job heartbeat error: {e}")
+            finally:
+                db.session.remove()
+
+
+def _worker_loop():
+    while True:
+        try:
+            job_id = _queue.get(timeout=Config.JOB_POLL_SECONDS)
+        except queue.Empty:
+            job_id = None
+
+        with _app.app_context():
+            try:
+                if job_id:
+                    run_job(job_id)
+                else:
+                    _poll_database()
+            except Exception as e:
+                print(f"Job worker error: {e}")
+            finally:
+                db.session.remove()
+
+
+def _poll_database():
+    """Pick up queued jobs this process was not told about, and abandoned running ones."""
+    requeue_abandoned()
+
+    queued = Job.query.with_entities(Job.id).filter_by(status='queued')\
+        .order_by(Job.created_at).limit(Config.JOB_WORKERS).all()
+    for (job_id,) in queued:
+        run_job(job_id)
+
+
+def requeue_abandoned():
+    """
+    Requeue running jobs with no heartbeat for JOB_STALE_SECONDS: their worker
+    or process is gone. Jobs that are still running keep heartbeating and are
+    left alone. Returns the number of jobs requeued.
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=Config.JOB_STALE_SECONDS)
+    last_seen = db.func.coalesce(Job.heartbeat_at, Job.started_at)
+    requeued = Job.query.filter(Job.status == 'running', last_seen < stale_before)\
+        .update({'status': 'queued'}, synchronize_session=False)
+    db.session.commit()
+    return requeued
+
+
+def run_job(job_id):
+    # Claim the job; another worker (or process) may have taken it already
+    now = datetime.utcnow()
+    claimed = Job.query.filter_by(id=job_id, status='queued')\
+        .update({'status': 'running', 'started_at': now, 'heartbeat_at': now}, synchronize_session=False)
+    db.session.commit()
+    if not claimed:
+        return
+
+    _running.add(job_id)
+    try:
+        _execute(job_id)
+    finally:
+        _running.discard(job_id)
+
+
+def _execute(job_id):
+    job = Job.query.get(job_id)
+    handler = _handlers.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f"No job handler registered for '{job.kind}'")
+        body, status_code = handler(json.loads(job.payload))
+        job.result = json.dumps(body)
+        job.status_code = status_code
+        job.status = 'done' if status_code < 400 else 'failed'
+    except Exception as e:
+        print(f"Job {job_id} ({job.kind}) failed: {e}")
+        db.session.rollback()
+        job = Job.query.get(job_id)
+        job.result = json.dumps({'error': str(e)})
+        job.status_code = 500
+        job.status = 'failed'
+        job.error = str(e)
+
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+    if job.callback_url:
+        _send_callback(job)
+
+
+# ==========================================
+# Callbacks
+# ==========================================
+
+def _allowed_hosts():
+    return {h.strip().lower() for h in (Config.JOB_CALLBACK_ALLOWED_HOSTS or '').split(',') if h.strip()}
+
+
+def _public_address(address):
+    ip = ipaddress.ip_address(address)
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def check_callback_url(url):
+    """
+    Validate a client-supplied callback URL and return (scheme, host, port, path, ip)
+    to connect to. Raises ValueError for anything but http(s) to a public address.
+    With JOB_CALLBACK_ALLOWED_HOSTS set, only those hosts are accepted (and they
+    may be internal).
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https'):
+        raise ValueError('only http and https callbacks are supported')
+    if not parts.hostname or parts.username or parts.password:
+        raise ValueError('callback URL needs a host and no credentials')
+    try:
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+    except ValueError:
+        raise ValueError('invalid port')
+
+    host = parts.hostname.lower()
+    allowed = _allowed_hosts()
+    if allowed and host not in allowed:
+        raise ValueError(f"host '{host}' is not in JOB_CALLBACK_ALLOWED_HOSTS")
+
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)}
+    except socket.gaierror as e:
+        raise ValueError(f"cannot resolve '{host}': {e}")
+    # Every address must pass, or DNS round-robin could still hand out an internal one
+    if not allowed and not all(_public_address(a.split('%')[0]) for a in addresses):
+        raise ValueError(f"'{host}' resolves to a private, loopback or link-local address")
+
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    return parts.scheme, host, port, path, sorted(addresses)[0]
+
+
+class _PinnedHTTPConnection(http.client.HTTPConnection):
+    """Connects to an already vetted IP while keeping the Host header."""
+
+    def __init__(self, host, port, ip, **kwargs):
+        super().__init__(host, port, **kwargs)
+        self._ip = ip
+
+    def connect(self):
+        self.sock = socket.create_connection((self._ip, self.port), self.timeout)
+
+
+class _PinnedHTTPSConnection(http.client.HTTPSConnection):
+    """HTTPS to a vetted IP; the certificate is still checked against the host name."""
+
+    def __init__(self, host, port, ip, **kwargs):
+        super().__init__(host, port, **kwargs)
+        self._ip = ip
+
+    def connect(self):
+        sock = socket.create_connection((self._ip, self.port), self.timeout)
+        self.sock = self._context.wrap_socket(sock, server_hostname=self.host)
+
+
+def _send_callback(job):
+    """POST the finished job to the client's webhook. Failures are only logged."""
+    try:
+        # Re-checked at send time: DNS may have changed since the job was queued
+        scheme, host, port, path, ip = check_callback_url(job.callback_url)
+        connection_class = _PinnedHTTPSConnection if scheme == 'https' else _PinnedHTTPConnection
+        conn = connection_class(host, port, ip, timeout=Config.JOB_CALLBACK_TIMEOUT)
+        try:
+            conn.request('POST', path, body=json.dumps(serialize_job(job)).encode('utf-8'),
+                         headers={'Content-Type': 'application/json'})
+            conn.getresponse().read()  # redirects are deliberately not followed
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"Job {job.id}: callback to {job.callback_url} failed: {e}")
+
+
+def stats():
+    return {
+        'workers': len(_workers),
+        'queue_depth': _queue.qsize(),
+        'handlers': sorted(_handlers),
+    }
+
+
+register_stats('jobs', stats)
@@ -0,0 +1,133 @@
+"""
+Incremental parser for a JSON object that arrives in chunks (LLM streaming).
+
+Feed it text as it arrives; it reports every top-level field as soon as its
+value is complete, and every element of a top-level array as soon as that
+element is complete - long before the closing brace arrives:
+
+    parser = JsonStreamParser()
+    for chunk in stream:
+        for kind, key, value in parser.feed(chunk):
+            ...  # ('field', 'title', 'Mantap!') / ('item', 'sentence_analysis', {...})
+
+Text before the opening brace (e.g. a ```json fence) and after the closing
+brace is ignored. Values that fail to parse are skipped; callers should still
+parse the complete text at the end for the authoritative result.
+"""
+import json
+
+
+class JsonStreamParser:
+    def __init__(self):
+        self.text = ''
+        self.fields = {}
+        self.done = False
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._reset_field()
+
+    def _reset_field(self):
+        self._key = None
+        self._key_start = None
+        self._expect_value = False
+        self._value_start = None
+        self._array = False
+        self._expect_item = False
+        self._item_start = None
+
+    def feed(self, chunk):
+        """Consume more text; returns the (kind, key, value) events it completed."""
+        self.text += chunk
+        events = []
+        while self._pos < len(self.text) and not self.done:
+            self._step(self.text[self._pos], self._pos, events)
+            self._pos += 1
+        return events
+
+    def _step(self, ch, i, events):
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif ch == '\\':
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                if self._depth == 1 and self._key is None and self._key_start is not None:
+                    self._key = self._loads(self._key_start, i + 1)
+            return
+
+        if not self._started:
+            if ch == '{':
+                self._started = True
+                self._depth = 1
+            return
+
+        if ch.isspace():
+            return
+
+        # First character of a field value / array element
+        if self._depth == 1 and self._expect_value:
+            self._expect_value = False
+            self._value_start = i
+            self._array = ch == '['
+        elif self._array and self._depth == 2 and self._expect_item and ch != ']':
+            self._expect_item = False
+            self._item_start = i
+
+        if ch == '"':
+            self._in_string = True
+            if self._depth == 1 and self._key is None:
+                self._key_start = i
+        elif ch == ':':
+            if self._depth == 1:
+                self._expect_value = True
+        elif ch == ',':
+            if self._depth == 1:
+                self._emit_field(i, events)
+            elif self._array and self._depth == 2:
+                self._emit_item(i, events)
+                self._expect_item = True
+        elif ch in '{[':
+            self._depth += 1
+            if self._array and self._depth == 2:
+                self._expect_item = True
+        elif ch in '}]':
+            if self._depth == 1:
+                self._emit_field(i, events)
+                self._depth = 0
+                self.done = True
+                return
+            if self._array and self._depth == 2:
+                self._emit_item(i, events)
+            self._depth -= 1
+
+    def _loads(self, start, end):
+        try:
+            return json.loads(self.text[start:end])
+        except ValueError:
+            return None
+
+    def _emit_item(self, end, events):
+        if self._item_start is None:
+            return
+        raw = self.text[self._item_start:end].strip()
+        self._item_start = None
+        try:
+            events.append(('item', self._key, json.loads(raw)))
+        except ValueError:
+            pass
+
+    def _emit_field(self, end, events):
+        key, start = self._key, self._value_start
+        self._reset_field()
+        if key is None or start is None:
+            return
+        try:
+            value = json.loads(self.text[start:end].strip())
+        except ValueError:
+            return
+        self.fields[key] = value
+        events.append(('field', key, value))
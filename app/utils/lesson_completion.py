@@ -0,0 +1,96 @@
+"""
+Per-user lesson completion as a bitmap, so /api/lessons needs no progress query.
+
+Every content version (see content_cache) has a lesson index: all lesson ids in
+id order, each given a bit position. A user's completed lessons are one integer
+with those bits set, cached as a hex string (a few bytes per user).
+
+- Read: the bitmap is built from UserLessonProgress on first use, then cached.
+- Write: update_progress / sync flip the bits in place after committing.
+- A content edit starts a new version, so bitmaps are rebuilt against the new
+  index. Entries also expire with CONTENT_CACHE_TTL, which bounds the damage if
+  two workers race on the same user's bitmap.
+
+Bitmaps live in a shared cache (sqlite, or redis when CONTENT_CACHE_BACKEND is
+redis), never in per-process memory. Otherwise a worker that did not handle
+the progress update would keep serving the old isCompleted.
+"""
+import threading
+
+from app.models.database import Lesson, UserLessonProgress, db
+from app.utils import content_cache
+from app.utils.cache import build_shared_cache
+from config import Config
+
+_cache = build_shared_cache("lesson_completion", backend=Config.CONTENT_CACHE_BACKEND, ttl=Config.CONTENT_CACHE_TTL)
+_lock = threading.Lock()
+_index_memo = (None, {})
+
+
+class CompletedLessons:
+    """Set-like view of a bitmap: supports `lesson_id in completed`."""
+
+    def __init__(self, bits, index):
+        self.bits = bits
+        self.index = index
+
+    def __contains__(self, lesson_id):
+        bit = self.index.get(lesson_id)
+        return bit is not None and (self.bits >> bit) & 1 == 1
+
+
+def lesson_index(version_id):
+    """{lesson_id: bit position} for a content version."""
+    global _index_memo
+    if _index_memo[0] == version_id:
+        return _index_memo[1]
+
+    ids = _cache.get(f"{version_id}:index")
+    if ids is None:
+        ids = [lesson_id for (lesson_id,) in db.session.query(Lesson.id).order_by(Lesson.id).all()]
+        _cache.set(f"{version_id}:index", ids)
+    index = {lesson_id: bit for bit, lesson_id in enumerate(ids)}
+    _index_memo = (version_id, index)
+    return index
+
+
+def _bits_from_db(user_id, index):
+    bits = 0
+    for (lesson_id,) in db.session.query(UserLessonProgress.lesson_id)\
+            .filter_by(user_id=user_id, is_completed=True).all():
+        if lesson_id in index:
+            bits |= 1 << index[lesson_id]
+    return bits
+
+
+def completed_lessons(user_id):
+    version_id = content_cache.current_version()['id']
+    index = lesson_index(version_id)
+    key = f"{version_id}:user:{user_id}"
+
+    raw = _cache.get(key)
+    if raw is None:
+        bits = _bits_from_db(user_id, index)
+        _cache.set(key, format(bits, 'x'))
+    else:
+        bits = int(raw, 16)
+    return CompletedLessons(bits, index)
+
+
+def record(user_id, changes):
+    """Apply committed progress changes ({lesson_id: is_completed}) to the cached bitmap."""
+    version_id = content_cache.current_version()['id']
+    index = lesson_index(version_id)
+    key = f"{version_id}:user:{user_id}"
+
+    with _lock:
+        raw = _cache.get(key)
+        if raw is None:
+            return  # built from the database on the next read
+        bits = int(raw, 16)
+        for lesson_id, is_completed in changes.items():
+            bit = index.get(lesson_id)
+            if bit is None:
+                continue
+            bits = bits | (1 << bit) if is_completed else bits & ~(1 << bit)
+        _cache.set(key, format(bits, 'x'))
@@ -0,0 +1,60 @@
+"""
+Lightweight in-process metrics registry.
+
+Subsystems register a zero-argument function returning a JSON-serialisable
+dict; `/api/metrics` calls every provider and returns the combined snapshot.
+"""
+import threading
+from collections import deque
+
+_providers = {}
+_lock = threading.Lock()
+
+
+def register_stats(name, provider):
+    """Register (or replace) the stats provider for a subsystem."""
+    with _lock:
+        _providers[name] = provider
+
+
+def snapshot():
+    """Collect stats from every registered provider."""
+    with _lock:
+        providers = dict(_providers)
+
+    result = {}
+    for name, provider in providers.items():
+        try:
+            result[name] = provider()
+        except Exception as e:
+            result[name] = {'error': str(e)}
+    return result
+
+
+class StageTimings:
+    """Rolling window of durations per stage, summarised as avg/p50/p95."""
+
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._window = window
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self._samples.setdefault(stage, deque(maxlen=self._window)).append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items()}
+
+        def pct(values, p):
+            return round(values[min(len(values) - 1, int(p * len(values)))], 4)
+
+        return {
+            stage: {
+                'avg': round(sum(values) / len(values), 4),
+                'p50': pct(values, 0.50),
+                'p95': pct(values, 0.95),
+            }
+            for stage, values in samples.items() if values
+        }
@@ -0,0 +1,84 @@
+"""
+Keyset (cursor) pagination for history endpoints.
+
+Pages are ordered newest first on (timestamp column, id) and each page is
+fetched with `WHERE (ts, id) < (cursor_ts, cursor_id) ORDER BY ts DESC, id DESC
+LIMIT n`. There is no OFFSET scan and no COUNT(*), so page 50 costs the same as
+page 1. The cursor handed to clients is an opaque URL-safe token.
+
+The timestamp column must be NOT NULL: a NULL cannot be compared with the
+cursor, so such rows would be skipped or repeated. Ours are declared NOT NULL
+and migrations.backfill_timestamps() fills NULLs left in older databases.
+"""
+import base64
+import json
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def encode_cursor(timestamp, row_id):
+    payload = json.dumps([timestamp.isoformat() if timestamp else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns (timestamp, id). Raises ValueError for anything we did not issue."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return (datetime.fromisoformat(timestamp) if timestamp else None), int(row_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def page_args(default_limit=DEFAULT_LIMIT):
+    """
+    (limit, cursor) from the query string; limit is clamped to 1..MAX_LIMIT.
+    `per_page` is accepted as an alias of `limit` for older clients.
+    """
+    limit = request.args.get('limit', request.args.get('per_page', default_limit, type=int), type=int)
+    return max(1, min(limit, MAX_LIMIT)), request.args.get('cursor') or None
+
+
+def keyset_page(query, ts_column, id_column, limit, cursor=None):
+    """
+    Fetch one page, newest first. Returns (rows, next_cursor); next_cursor is
+    None on the last page. One query, limit + 1 rows.
+    """
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            ts_column < ts,
+            and_(ts_column == ts, id_column < row_id)
+        ))
+
+    rows = query.order_by(ts_column.desc(), id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, ts_column.key), getattr(last, id_column.key))
+
+
+def offset_page(query, ts_column, id_column, limit, page):
+    """
+    Legacy ?page=N support: same ordering, OFFSET based, but still no COUNT(*).
+    Returns (rows, has_next).
+    """
+    rows = query.order_by(ts_column.desc(), id_column.desc())\
+        .offset((page - 1) * limit).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+
+def page_info(limit, next_cursor):
+    return {
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+    }
@@ -0,0 +1,111 @@
+"""
+Random test-question selection without ORDER BY RANDOM().
+
+An in-memory index holds every TestQuestion id grouped by (section, task_type),
+lower-cased, plus one list per section (section, None) and one for the whole
+bank (None, None), all built together. Picking k questions is a random.sample over those ids, with no
+table scan or sort, and the chosen rows are then fetched with one IN query.
+
+The index is rebuilt (one narrow SELECT id, section, task_type) whenever the
+question bank version changes. invalidate() is called by the admin test
+question handlers and the content importer. The version lives in a shared cache
+(sqlite, or redis when CONTENT_CACHE_BACKEND is redis), so an edit in one
+worker refreshes all of them. It also expires after CONTENT_CACHE_TTL.
+"""
+import json
+import random
+import threading
+import uuid
+
+from app.models.database import TestAnswer, TestQuestion, TestSession, db
+from app.utils.cache import build_shared_cache
+from config import Config
+
+_versions = build_shared_cache("question_sampler", backend=Config.CONTENT_CACHE_BACKEND,
+                               ttl=Config.CONTENT_CACHE_TTL)
+_lock = threading.Lock()
+_index = (None, {})  # (version, {(section | None, task_type | None): [ids]})
+
+
+def _key(value):
+    return (value or '').strip().lower()
+
+
+def invalidate():
+    """Mark the question bank as changed; call after committing question edits."""
+    version = uuid.uuid4().hex[:12]
+    _versions.set('version', version)
+    return version
+
+
+def question_index():
+    """
+    {(section, task_type): [question ids]}, rebuilt when the bank version changes.
+    task_type None holds the whole section and (None, None) the whole bank.
+    """
+    global _index
+    version = _versions.get('version') or invalidate()
+    if _index[0] == version:
+        return _index[1]
+
+    with _lock:
+        if _index[0] != version:
+            index = {}
+            for question_id, section, task_type in db.session.query(
+                    TestQuestion.id, TestQuestion.section, TestQuestion.task_type).all():
+                section = _key(section)
+                for key in ((section, _key(task_type)), (section, None), (None, None)):
+                    index.setdefault(key, []).append(question_id)
+            _index = (version, index)
+    return _index[1]
+
+
+def question_ids(section=None, task_type=None):
+    """
+    Ids for a section (and optionally task type); everything when section is None.
+    Returns the index's own list (do not modify it).
+    """
+    section = None if section is None else _key(section)
+    task_type = None if section is None or task_type is None else _key(task_type)
+    return question_index().get((section, task_type), [])
+
+
+def sample_ids(section=None, k=1, task_type=None, avoid=()):
+    """
+    Draw up to k distinct ids. Ids in `avoid` (e.g. recently seen) are only used
+    when there are not enough other questions. Cost is O(k + len(avoid)), not
+    O(bank size).
+    """
+    pool = question_ids(section, task_type)
+    draw = random.sample(pool, min(len(pool), k + len(avoid)))
+    fresh = [qid for qid in draw if qid not in avoid]
+    if len(fresh) >= k:
+        return fresh[:k]
+    return fresh + [qid for qid in draw if qid in avoid][:k - len(fresh)]
+
+
+def fetch(ids):
+    """TestQuestion rows for ids, in the same order, with a single IN query."""
+    if not ids:
+        return []
+    rows = {q.id: q for q in TestQuestion.query.filter(TestQuestion.id.in_(ids)).all()}
+    return [rows[qid] for qid in ids if qid in rows]
+
+
+def recent_question_ids(user_id, sessions=3):
+    """Question ids the user answered in their last `sessions` test sessions."""
+    if not sessions:
+        return set()
+    session_ids = [sid for (sid,) in db.session.query(TestSession.id).filter_by(user_id=user_id)
+                   .order_by(TestSession.started_at.desc(), TestSession.id.desc()).limit(sessions).all()]
+    if not session_ids:
+        return set()
+
+    seen = set()
+    for (raw,) in db.session.query(TestAnswer.combined_question_ids)\
+            .filter(TestAnswer.test_session_id.in_(session_ids)).all():
+        try:
+            seen.update(int(qid) for qid in json.loads(raw or '[]'))
+        except (TypeError, ValueError):
+            continue
+    return seen
@@ -1,20 +1,234 @@
-from gradio_client import Client
+"""
+Sentiment labelling for user feedback (Positive / Negative / Neutral).
+
+Backends:
+- remote: the Hugging Face Space SENTIMENT_SPACE through one persistent gradio
+  Client. It connects lazily, and each call is bounded by SENTIMENT_TIMEOUT. On
+  failure the client is dropped and the Space is skipped for
+  SENTIMENT_RETRY_SECONDS. After that a health check (the client handshake)
+  must succeed before any text is sent to it again.
+- local: an on-box classifier. This is a joblib model (pipeline with
+  predict([text])) if SENTIMENT_LOCAL_MODEL_PATH is set, otherwise a small
+  English/Indonesian lexicon.
+
+SENTIMENT_BACKEND=remote (default) uses the Space and falls back to the local
+backend; SENTIMENT_BACKEND=local never calls the Space. Latency per backend and
+fallback counts are reported on /api/metrics.
+"""
+import re
+import threading
+import time
+
+from app.utils.metrics import StageTimings, register_stats
+from config import Config
+
+SENTIMENT_SPACE = "ahmdsaif/alysa-sentiment"
+
+
+# ===== LOCAL BACKEND =====
+POSITIVE_WORDS = {
+    # English
+    "good", "great", "love", "like", "nice", "helpful", "easy", "awesome", "amazing",
+    "excellent", "best", "happy", "useful", "fun", "cool", "perfect", "recommended",
+    "thanks", "thank", "enjoy", "clear", "fast", "smooth",
+    # Indonesian
+    "bagus", "baik", "suka", "senang", "mantap", "keren", "membantu", "mudah", "puas",
+    "terbaik", "hebat", "asyik", "seru", "jelas", "cepat", "lancar", "makasih",
+    "terima", "kasih", "bermanfaat", "rekomendasi",
+}
+NEGATIVE_WORDS = {
+    # English
+    "bad", "worst", "hate", "bug", "bugs", "slow", "error", "crash", "crashes", "broken",
+    "annoying", "useless", "hard", "difficult", "confusing", "terrible", "awful", "poor",
+    "disappointed", "boring", "lag", "laggy", "fail", "failed",
+    # Indonesian
+    "jelek", "buruk", "benci", "lambat", "lemot", "susah", "sulit", "bingung", "kecewa",
+    "rusak", "gagal", "payah", "membosankan", "ribet", "parah", "macet", "lelet",
+}
+NEGATIONS = {"not", "no", "never", "dont", "don't", "isn't", "tidak", "bukan", "gak",
+             "nggak", "ga", "enggak", "belum", "kurang", "jangan"}
+
+
+class LexiconClassifier:
+    """Word-count classifier with simple negation handling (EN + ID)."""
+
+    def predict_one(self, text):
+        score = 0
+        negate = 0
+        for token in re.findall(r"[a-z']+", (text or "").lower()):
+            if token in NEGATIONS:
+                negate = 2  # flips the next two words
+                continue
+            polarity = (token in POSITIVE_WORDS) - (token in NEGATIVE_WORDS)
+            score += -polarity if negate else polarity
+            negate = max(0, negate - 1)
+        if score > 0:
+            return "Positive"
+        if score < 0:
+            return "Negative"
+        return "Neutral"
+
+
+class JoblibClassifier:
+    """Wraps a scikit-learn style pipeline saved with joblib."""
+
+    def __init__(self, path):
+        import joblib
+        self.model = joblib.load(path)
+
+    def predict_one(self, text):
+        return str(self.model.predict([text])[0]).capitalize()
+
+
+_local = None
+_local_lock = threading.Lock()
+
+
+def get_local_classifier():
+    global _local
+    if _local is None:
+        with _local_lock:
+            if _local is None:
+                path = Config.SENTIMENT_LOCAL_MODEL_PATH
+                try:
+                    _local = JoblibClassifier(path) if path else LexiconClassifier()
+                except Exception as e:
+                    print(f"Could not load local sentiment model '{path}': {e}, using lexicon")
+                    _local = LexiconClassifier()
+    return _local
+
+
+# ===== REMOTE BACKEND =====
+class RemoteSentimentClient:
+    """One persistent gradio Client, reconnected after failures."""
+
+    def __init__(self, space):
+        self.space = space
+        self._client = None
+        self._lock = threading.Lock()
+        self._skip_until = 0
+        self.connects = 0
+        self.failures = 0
+        self.last_error = None
+
+    def available(self):
+        """False while the Space is being skipped after a failure."""
+        return time.time() >= self._skip_until
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from gradio_client import Client
+                    print(f"Connecting to sentiment Space {self.space}...")
+                    self._client = Client(self.space, verbose=False)
+                    self.connects += 1
+        return self._client
+
+    def health_check(self):
+        """
+        True when there is a live client, or the Space answers a fresh handshake.
+        A failed handshake restarts the skip window, so callers fall back at once
+        instead of waiting for a prediction to time out.
+        """
+        try:
+            self._get_client()
+            return True
+        except Exception as e:
+            self._mark_failed(e)
+            return False
+
+    def _mark_failed(self, e):
+        self.failures += 1
+        self.last_error = str(e)
+        self._client = None
+        self._skip_until = time.time() + Config.SENTIMENT_RETRY_SECONDS
+
+    def predict(self, text, timeout):
+        job = None
+        try:
+            job = self._get_client().submit(text=text, api_name="/predict_sentiment")
+            result = job.result(timeout=timeout)
+        except Exception as e:
+            if job is not None:
+                job.cancel()
+            self._mark_failed(e)
+            raise
+
+        # Result is like {'sentiment': 'positive', 'confidence': 0.9189}
+        if isinstance(result, dict) and 'sentiment' in result:
+            return result['sentiment'].capitalize()
+        return str(result)
+
+    def stats(self):
+        return {
+            'connected': self._client is not None,
+            'available': self.available(),
+            'connects': self.connects,
+            'failures': self.failures,
+            'last_error': self.last_error,
+        }
+
+
+remote = RemoteSentimentClient(SENTIMENT_SPACE)
+
+
+# ===== PUBLIC API =====
+_timings = StageTimings()
+_counts = {'calls': 0, 'remote': 0, 'local': 0, 'fallbacks': 0, 'unknown': 0}
+_counts_lock = threading.Lock()
+
+
+def _count(name):
+    with _counts_lock:
+        _counts[name] += 1
+
+
+def _classify_local(text):
+    start = time.perf_counter()
+    label = get_local_classifier().predict_one(text)
+    _timings.record('local', time.perf_counter() - start)
+    _count('local')
+    return label
+
 
 def analyze_sentiment(text):
     """
-    Analyzes the sentiment of the given text using the Hugging Face model.
+    Analyzes the sentiment of the given text: the remote Hugging Face model
+    when it is reachable, otherwise the local classifier.
     """
+    _count('calls')
+    if Config.SENTIMENT_BACKEND == 'remote':
+        if remote.available() and remote.health_check():
+            start = time.perf_counter()
+            try:
+                label = remote.predict(text, timeout=Config.SENTIMENT_TIMEOUT)
+                _timings.record('remote', time.perf_counter() - start)
+                _count('remote')
+                return label
+            except Exception as e:
+                _timings.record('remote_failed', time.perf_counter() - start)
+                print(f"Error in remote sentiment analysis: {e!r}, using local classifier")
+        _count('fallbacks')
+
     try:
-        client = Client("ahmdsaif/alysa-sentiment")
-        result = client.predict(
-            text=text,
-            api_name="/predict_sentiment"
-        )
-        # Result is like {'sentiment': 'positive', 'confidence': 0.9189}
-        if isinstance(result, dict) and 'sentiment' in result:
-            label = result['sentiment'].capitalize()
-            return label
-        return str(result)
+        return _classify_local(text)
     except Exception as e:
         print(f"Error in sentiment analysis: {e}")
+        _count('unknown')
         return "Unknown"
+
+
+def stats():
+    with _counts_lock:
+        counts = dict(_counts)
+    return dict(
+        counts,
+        backend=Config.SENTIMENT_BACKEND,
+        local_model=type(_local).__name__ if _local is not None else None,
+        remote=remote.stats(),
+        latency_seconds=_timings.snapshot(),
+    )
+
+
+register_stats('sentiment', stats)
@@ -0,0 +1,107 @@
+"""
+Background sentiment labelling for UserFeedback.
+
+POST /api/feedback stores the row with sentiment 'Pending' and calls notify().
+A single labeller thread then classifies pending rows in batches and writes
+the label back, so the request never waits for the sentiment model.
+create_app() calls start(), so rows left Pending by a restart are labelled
+right away instead of waiting for the next submission.
+
+Rows that could not be classified are left as 'Unknown'; backfill_sentiment.py
+relabels those (or any other status) on demand.
+"""
+import threading
+
+from app.models.database import UserFeedback, db
+from app.utils.concurrency import map_bounded
+from app.utils.metrics import register_stats
+from app.utils.sentiment_analyzer import analyze_sentiment
+from config import Config
+
+PENDING = 'Pending'
+UNKNOWN = 'Unknown'
+
+_app = None
+_wake = threading.Event()
+_thread = None
+_thread_lock = threading.Lock()
+_counts = {'labelled': 0, 'unknown': 0, 'batches': 0}
+
+
+def init_app(app):
+    """Remember the app so the labeller thread can push an app context."""
+    global _app
+    _app = app
+
+
+def start():
+    """Start the labeller and run one pass over existing Pending rows now."""
+    notify()
+
+
+def notify():
+    """Tell the labeller there is new work (starts it on first use)."""
+    _ensure_thread()
+    _wake.set()
+
+
+def _ensure_thread():
+    global _thread
+    if _thread is not None or _app is None:
+        return
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, name='sentiment-labeller', daemon=True)
+            _thread.start()
+
+
+def _run():
+    while True:
+        _wake.wait(timeout=Config.SENTIMENT_LABEL_INTERVAL)
+        _wake.clear()
+        with _app.app_context():
+            try:
+                # Keep going while full batches come back; a short batch means we caught up
+                while len(label_batch()) == Config.SENTIMENT_BATCH_SIZE:
+                    pass
+            except Exception as e:
+                print(f"Sentiment labeller error: {e}")
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+
+def label_batch(status=PENDING, batch_size=None, after_id=0):
+    """
+    Classify up to batch_size rows whose sentiment is `status` (oldest first,
+    id > after_id) and save the labels. Returns [(id, label)] for the processed rows.
+    """
+    batch_size = batch_size or Config.SENTIMENT_BATCH_SIZE
+    rows = UserFeedback.query.filter(UserFeedback.sentiment == status, UserFeedback.id > after_id)\
+        .order_by(UserFeedback.id).limit(batch_size).all()
+    if not rows:
+        return []
+
+    labels = map_bounded(
+        analyze_sentiment,
+        [row.feedback_text for row in rows],
+        timeout=Config.SENTIMENT_TIMEOUT * 2,
+        deadline=Config.SENTIMENT_TIMEOUT * 4,
+        fallback=lambda text, e: UNKNOWN
+    )
+    labelled = [(row.id, label or UNKNOWN) for row, label in zip(rows, labels)]
+    for row, (_, label) in zip(rows, labelled):
+        row.sentiment = label
+    db.session.commit()
+
+    _counts['batches'] += 1
+    _counts['labelled'] += len(rows)
+    _counts['unknown'] += sum(1 for _, label in labelled if label == UNKNOWN)
+    return labelled
+
+
+def stats():
+    return dict(_counts, running=_thread is not None)
+
+
+register_stats('sentiment_labeller', stats)
@@ -0,0 +1,27 @@
+"""
+Server-Sent Events helpers for streaming endpoints.
+
+Each event is sent as
+
+    event: <name>
+    data: <json>
+
+and the response disables proxy buffering so events reach the client as soon
+as they are produced.
+"""
+import json
+
+from flask import Response, stream_with_context
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_response(events):
+    """Stream an iterable of already formatted events, keeping the request context alive."""
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
@@ -0,0 +1,325 @@
+"""
+Incrementally maintained row counts for the admin dashboard.
+
+Instead of COUNT(*) over every table (and GROUP BY over user_feedback) on each
+page load, the dashboard reads two small tables. A counter's value is its
+base row in `stat_counters` plus the sum of its pending rows in
+`stat_counter_deltas`.
+
+- On every ORM flush, inserted/deleted rows of the counted models (and
+  sentiment changes on UserFeedback) are appended as delta rows, in the same
+  transaction. Writers only INSERT, so they never queue on a shared counter row.
+- compact() folds delta rows into the base rows. It deletes a fixed set of delta
+  ids before adding their sum, so two compactors cannot count the same deltas.
+- reconcile() recomputes every counter from the real tables. The counts and the
+  stored values are read in one statement (one snapshot). The difference is
+  applied to the base row with a compare-and-set on the base value, so
+  increments committed meanwhile are kept, and a concurrent compact() or
+  reconcile() makes this one skip instead of double-correcting. It runs when a
+  counter is missing, soon after a bulk statement on a counted table (bulk
+  writes skip the flush events), and otherwise at most every
+  STAT_RECONCILE_SECONDS. It corrects drift from ON DELETE CASCADE and manual SQL.
+"""
+import threading
+import time
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.exc import IntegrityError
+
+from app.models.database import (
+    Lesson,
+    Quiz,
+    StatCounter,
+    StatCounterDelta,
+    TestQuestion,
+    TestSession,
+    User,
+    UserAttempt,
+    UserFeedback,
+    db,
+)
+from config import Config
+
+COUNTED_MODELS = {
+    'users': User,
+    'lessons': Lesson,
+    'quizzes': Quiz,
+    'tests': TestQuestion,
+    'sessions': TestSession,
+    'attempts': UserAttempt,
+    'feedback': UserFeedback,
+}
+_NAME_BY_MODEL = {model: name for name, model in COUNTED_MODELS.items()}
+_COUNTED_TABLES = {model.__table__.name for model in COUNTED_MODELS.values()}
+SENTIMENT_PREFIX = 'sentiment:'
+# Always reported (at 0 if unused)
+SENTIMENT_LABELS = ('Pending', 'Positive', 'Negative', 'Neutral', 'Unknown')
+COMPACT_BATCH = 5000
+
+_last_reconcile = 0
+_last_compact = 0
+_reconcile_lock = threading.Lock()
+_compact_lock = threading.Lock()
+
+
+# ==========================================
+# Incremental updates
+# ==========================================
+
+def _sentiment_name(value):
+    return SENTIMENT_PREFIX + value if value else None
+
+
+def _collect_deltas(session):
+    deltas = Counter()
+    for obj in session.new:
+        name = _NAME_BY_MODEL.get(type(obj))
+        if name:
+            deltas[name] += 1
+        if isinstance(obj, UserFeedback) and obj.sentiment:
+            deltas[_sentiment_name(obj.sentiment)] += 1
+
+    for obj in session.deleted:
+        name = _NAME_BY_MODEL.get(type(obj))
+        if name:
+            deltas[name] -= 1
+        if isinstance(obj, UserFeedback):
+            # The stored value, not an unflushed edit (loads it if expired)
+            history = inspect(obj).attrs.sentiment.history
+            original = history.deleted[0] if history.deleted else obj.sentiment
+            if original:
+                deltas[_sentiment_name(original)] -= 1
+
+    for obj in session.dirty:
+        if isinstance(obj, UserFeedback) and obj not in session.deleted:
+            history = inspect(obj).attrs.sentiment.history
+            if history.has_changes():
+                for old in history.deleted:
+                    if old:
+                        deltas[_sentiment_name(old)] -= 1
+                for new in history.added:
+                    if new:
+                        deltas[_sentiment_name(new)] += 1
+
+    return {name: delta for name, delta in deltas.items() if delta}
+
+
+@event.listens_for(UserFeedback.sentiment, 'set', active_history=True)
+def _track_old_sentiment(target, value, oldvalue, initiator):
+    """active_history makes SQLAlchemy load the previous sentiment even when expired."""
+
+
+@event.listens_for(db.session, 'before_flush')
+def _apply_deltas(session, flush_context, instances):
+    deltas = _collect_deltas(session)
+    if deltas:
+        session.connection().execute(
+            StatCounterDelta.__table__.insert(),
+            [{'name': name, 'delta': delta} for name, delta in deltas.items()]
+        )
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _watch_bulk_writes(orm_execute_state):
+    """Bulk INSERT/UPDATE/DELETE skip the flush events; have the next read reconcile."""
+    state = orm_execute_state
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    table = getattr(state.statement, 'table', None)
+    if getattr(table, 'name', None) in _COUNTED_TABLES:
+        _mark_stale()
+
+
+def _mark_stale():
+    global _last_reconcile
+    _last_reconcile = 0
+
+
+# ==========================================
+# Reconcile, compact & read
+# ==========================================
+
+def _actual_count(name):
+    if name.startswith(SENTIMENT_PREFIX):
+        label = name[len(SENTIMENT_PREFIX):]
+        return select(func.count(UserFeedback.id)).where(UserFeedback.sentiment == label)
+    model = COUNTED_MODELS[name]
+    return select(func.count()).select_from(model)
+
+
+def _base_value(name):
+    return select(StatCounter.value).where(StatCounter.name == name)
+
+
+def _pending_sum(name):
+    return select(func.coalesce(func.sum(StatCounterDelta.delta), 0)).where(StatCounterDelta.name == name)
+
+
+def counter_names():
+    """Every counter to reconcile, including stored ones for labels no row uses any more."""
+    names = {SENTIMENT_PREFIX + label for label in SENTIMENT_LABELS}
+    names.update(SENTIMENT_PREFIX + label for (label,) in db.session.query(UserFeedback.sentiment).distinct()
+                 if label)
+    names.update(name for (name,) in db.session.query(StatCounter.name) if name.startswith(SENTIMENT_PREFIX))
+    return list(COUNTED_MODELS) + sorted(names)
+
+
+def snapshot(names):
+    """
+    {name: (actual count, base value or None, pending delta sum)} from a single
+    SELECT, so all numbers come from the same snapshot of the database.
+    """
+    columns = []
+    for name in names:
+        columns += [
+            _actual_count(name).scalar_subquery(),
+            _base_value(name).scalar_subquery(),
+            _pending_sum(name).scalar_subquery(),
+        ]
+    row = db.session.execute(select(*columns)).one()
+    return {name: tuple(row[3 * i:3 * i + 3]) for i, name in enumerate(names)}
+
+
+def _ensure_base_rows(names):
+    existing = {name for (name,) in db.session.query(StatCounter.name).filter(StatCounter.name.in_(names))}
+    for name in names:
+        if name in existing:
+            continue
+        try:
+            db.session.add(StatCounter(name=name, value=0))
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # created by another process meanwhile
+
+
+def apply_corrections(snap):
+    """
+    Move each counter to its snapshot count: base += (actual - base - pending),
+    only where the base still holds the value seen in the snapshot. Returns the
+    names whose correction was skipped because the base changed.
+    """
+    table = StatCounter.__table__
+    skipped = []
+    for name, (actual, base, pending) in snap.items():
+        correction = actual - (base or 0) - pending
+        if not correction:
+            continue
+        result = db.session.execute(
+            table.update()
+            .where(table.c.name == name, table.c.value == (base or 0))
+            .values(value=table.c.value + correction)
+        )
+        if result.rowcount == 0:
+            skipped.append(name)
+    db.session.commit()
+    return skipped
+
+
+def reconcile():
+    """
+    Bring every counter in line with the real tables without overwriting
+    concurrent increments. Returns the counts from the snapshot.
+    """
+    global _last_reconcile
+    with _reconcile_lock:
+        names = counter_names()
+        _ensure_base_rows(names)
+        snap = snapshot(names)
+        skipped = apply_corrections(snap)
+        if skipped:
+            print(f"Stat counters changed during reconcile, retrying later: {', '.join(skipped)}")
+        else:
+            _last_reconcile = time.time()
+        return {name: actual for name, (actual, _, _) in snap.items()}
+
+
+def compact(limit=COMPACT_BATCH):
+    """Fold up to `limit` delta rows into the base rows. Returns the number folded."""
+    global _last_compact
+    with _compact_lock:
+        rows = db.session.query(StatCounterDelta.id, StatCounterDelta.name, StatCounterDelta.delta)\
+            .order_by(StatCounterDelta.id).limit(limit).all()
+        _last_compact = time.time()
+        if not rows:
+            return 0
+
+        sums = Counter()
+        for _, name, delta in rows:
+            sums[name] += delta
+        _ensure_base_rows(list(sums))
+
+        # Delete first: if another compactor already took some of these rows, back off
+        ids = [row_id for row_id, _, _ in rows]
+        deleted = StatCounterDelta.query.filter(StatCounterDelta.id.in_(ids)).delete(synchronize_session=False)
+        if deleted != len(ids):
+            db.session.rollback()
+            return 0
+
+        table = StatCounter.__table__
+        for name, total in sums.items():
+            if total:
+                db.session.execute(table.update().where(table.c.name == name)
+                                   .values(value=table.c.value + total))
+        db.session.commit()
+        return len(ids)
+
+
+def current_values():
+    """Base plus pending deltas for every counter, in two small queries."""
+    values = {c.name: c.value for c in StatCounter.query.all()}
+    pending = db.session.query(StatCounterDelta.name, func.sum(StatCounterDelta.delta))\
+        .group_by(StatCounterDelta.name).all()
+    for name, total in pending:
+        values[name] = values.get(name, 0) + int(total or 0)
+    return values
+
+
+def _maintain_in_background(app, do_compact, do_reconcile):
+    def run():
+        with app.app_context():
+            try:
+                if do_compact:
+                    compact()
+                if do_reconcile:
+                    reconcile()
+            except Exception as e:
+                print(f"Stat counter maintenance failed: {e}")
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+    threading.Thread(target=run, name='stat-reconcile', daemon=True).start()
+
+
+def read_counters():
+    """
+    All counters (base + pending deltas). Reconciles synchronously only when a
+    counter has never been computed; otherwise compaction and reconciliation
+    run in the background when due and the current values are served.
+    """
+    global _last_reconcile, _last_compact
+    counters = current_values()
+    if any(name not in counters for name in COUNTED_MODELS):
+        return reconcile()
+
+    now = time.time()
+    do_reconcile = now - _last_reconcile > Config.STAT_RECONCILE_SECONDS
+    do_compact = now - _last_compact > Config.STAT_COMPACT_SECONDS
+    if do_reconcile or do_compact:
+        # One background run at a time
+        if do_reconcile:
+            _last_reconcile = now
+        if do_compact:
+            _last_compact = now
+        _maintain_in_background(current_app._get_current_object(), do_compact, do_reconcile)
+    return counters
+
+
+def sentiment_counts(counters):
+    return {
+        name[len(SENTIMENT_PREFIX):]: value
+        for name, value in counters.items()
+        if name.startswith(SENTIMENT_PREFIX) and value
+    }
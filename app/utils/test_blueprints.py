@@ -0,0 +1,153 @@
+"""
+Test blueprints: which tasks a full test consists of.
+
+A blueprint is an ordered list of slots. Each slot is one task of the test,
+given by (section, task_type, count), where count is the number of questions
+in that task. Questions are drawn per slot from question_sampler's in-memory
+index. Assembly costs O(total questions in the test) whatever the bank size,
+plus one IN query for the rows.
+
+Built-ins:
+- ielts (default): Speaking Part 1 (3 questions), Speaking Part 2, Writing
+  Task 2, matching the bank-materi-and-soal question bank
+- toefl_ibt: the original 6 tasks, 4 speaking + 2 writing. Needs a bank with
+  independent/integrated task types, which the imported bank does not have
+
+TEST_BLUEPRINTS (inline JSON or a path to a JSON file) adds blueprints or
+replaces built-ins by name:
+
+    {"ielts_short": {"title": "IELTS Speaking", "slots": [
+        {"section": "Speaking", "task_type": "Part 1", "count": 2}]}}
+
+Blueprints are parsed and validated once per process.
+"""
+import json
+import os
+
+from app.utils import question_sampler
+from config import Config
+
+BUILTIN_BLUEPRINTS = {
+    'toefl_ibt': {
+        'title': 'TOEFL iBT Writing & Speaking',
+        'time_limit_minutes': 60,
+        'scoring_scale': '0-5 points per task',
+        'slots': [
+            {'section': 'speaking', 'task_type': 'independent'},   # Task 1
+            {'section': 'speaking', 'task_type': 'integrated'},    # Task 2
+            {'section': 'speaking', 'task_type': 'integrated'},    # Task 3
+            {'section': 'speaking', 'task_type': 'integrated'},    # Task 4
+            {'section': 'writing', 'task_type': 'integrated'},     # Task 5
+            {'section': 'writing', 'task_type': 'independent'},    # Task 6
+        ],
+    },
+    'ielts': {
+        'title': 'IELTS Writing & Speaking',
+        'time_limit_minutes': 75,
+        'scoring_scale': '0-9 band score per task',
+        'slots': [
+            {'section': 'Speaking', 'task_type': 'Part 1', 'count': 3},
+            {'section': 'Speaking', 'task_type': 'Part 2'},
+            {'section': 'Writing', 'task_type': 'Task 2'},
+        ],
+    },
+}
+
+_blueprints = None
+
+
+def normalise(name, spec):
+    """Validate a blueprint spec and number its slots as task_id 1..n."""
+    slots = spec.get('slots')
+    if not isinstance(slots, list) or not slots:
+        raise ValueError(f"Blueprint '{name}' needs a non-empty 'slots' list")
+
+    normalised = []
+    for i, slot in enumerate(slots):
+        if not slot.get('section') or not slot.get('task_type'):
+            raise ValueError(f"Blueprint '{name}' slot {i + 1}: section and task_type are required")
+        count = slot.get('count', 1)
+        if not isinstance(count, int) or count < 1:
+            raise ValueError(f"Blueprint '{name}' slot {i + 1}: count must be a positive integer")
+        normalised.append({
+            'task_id': i + 1,
+            'section': slot['section'],
+            'task_type': slot['task_type'],
+            'count': count,
+        })
+
+    return {
+        'name': name,
+        'title': spec.get('title', name),
+        'time_limit_minutes': spec.get('time_limit_minutes', 60),
+        'scoring_scale': spec.get('scoring_scale', '0-9 band score per task'),
+        'slots': normalised,
+    }
+
+
+def _overrides():
+    raw = Config.TEST_BLUEPRINTS
+    if not raw:
+        return {}
+    if os.path.exists(raw):
+        with open(raw) as f:
+            return json.load(f)
+    return json.loads(raw)
+
+
+def load_blueprints():
+    specs = dict(BUILTIN_BLUEPRINTS)
+    try:
+        specs.update(_overrides())
+    except Exception as e:
+        print(f"Ignoring TEST_BLUEPRINTS: {e}")
+    blueprints = {}
+    for name, spec in specs.items():
+        try:
+            blueprints[name] = normalise(name, spec)
+        except ValueError as e:
+            print(f"Ignoring test blueprint: {e}")
+    return blueprints
+
+
+def get_blueprint(name=None):
+    """Blueprint by name (default TEST_BLUEPRINT). Raises KeyError for unknown names."""
+    global _blueprints
+    if _blueprints is None:
+        _blueprints = load_blueprints()
+    name = name or Config.TEST_BLUEPRINT
+    if name not in _blueprints:
+        raise KeyError(f"Unknown test blueprint '{name}'. Available: {', '.join(sorted(_blueprints))}")
+    return _blueprints[name]
+
+
+def assemble(blueprint, avoid=()):
+    """
+    Pick questions for every slot. Returns the blueprint's tasks, each with its
+    'question_ids'. Slots that share (section, task_type) draw from one sample, so
+    no question appears twice. Raises ValueError when the bank is too small.
+    """
+    needed = {}
+    for slot in blueprint['slots']:
+        key = (slot['section'].lower(), slot['task_type'].lower())
+        needed[key] = needed.get(key, 0) + slot['count']
+
+    drawn = {}
+    for (section, task_type), count in needed.items():
+        ids = question_sampler.sample_ids(section, count, task_type=task_type, avoid=avoid)
+        if len(ids) < count:
+            raise ValueError(f"Test '{blueprint['name']}' needs {count} {section} {task_type} "
+                             f"question(s). Found {len(ids)} in the question bank.")
+        drawn[(section, task_type)] = ids
+
+    tasks = []
+    for slot in blueprint['slots']:
+        pool = drawn[(slot['section'].lower(), slot['task_type'].lower())]
+        question_ids, pool[:slot['count']] = pool[:slot['count']], []
+        tasks.append({
+            'task_id': slot['task_id'],
+            'section': slot['section'],
+            'task_type': slot['task_type'],
+            'question_ids': question_ids,
+        })
+    return tasks
@@ -0,0 +1,50 @@
+"""
+Relabel UserFeedback rows whose sentiment is stuck (default: 'Unknown').
+
+    python backfill_sentiment.py                  # relabel 'Unknown' rows
+    python backfill_sentiment.py --status Pending # rows left behind by a restart
+    python backfill_sentiment.py --dry-run        # only count them
+"""
+import argparse
+import os
+import sys
+
+# Add parent directory to sys.path to import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from app import create_app
+from app.models.database import UserFeedback
+from app.utils.sentiment_labeller import UNKNOWN, label_batch
+
+
+def backfill(status, batch_size, dry_run):
+    total = UserFeedback.query.filter_by(sentiment=status).count()
+    print(f"{total} feedback rows with sentiment '{status}'")
+    if dry_run or not total:
+        return
+
+    done = 0
+    still_unknown = 0
+    after_id = 0
+    while True:
+        rows = label_batch(status=status, batch_size=batch_size, after_id=after_id)
+        if not rows:
+            break
+        after_id = rows[-1][0]
+        done += len(rows)
+        still_unknown += sum(1 for _, label in rows if label == UNKNOWN)
+        print(f"  {done}/{total} relabelled")
+
+    print(f"Done: {done} rows relabelled, {still_unknown} still '{UNKNOWN}'")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Relabel feedback sentiment")
+    parser.add_argument('--status', default=UNKNOWN, help="sentiment value to relabel (default: Unknown)")
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        backfill(args.status, args.batch_size, args.dry_run)
@@ -0,0 +1,59 @@
+"""
+Throughput of the bulk content importer on a synthetic question bank.
+
+Writes N test questions to alysa_test_questions.csv in a temp directory and
+imports them into a fresh SQLite database, first as a dry run (parse +
+validate only) and then for real, then a second time (all updates).
+
+    python benchmarks/content_import.py [--rows 100000] [--batch-size 1000]
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flask import Flask
+
+from app.models.database import TestQuestion, db
+from app.utils.content_import import import_directory
+
+
+def write_bank(directory, rows):
+    path = os.path.join(directory, 'alysa_test_questions.csv')
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'section', 'task_type', 'prompt', 'reference_answer', 'keywords', 'created_at'])
+        for i in range(1, rows + 1):
+            section = 'Speaking' if i % 2 else 'Writing'
+            writer.writerow([i, section, f'Part {i % 3 + 1}', f'Question {i}: describe a place you like.',
+                             'A clear answer with reasons and an example.', 'place, describe, reason',
+                             '2026-01-16 19:00'])
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_bank(tmp, args.rows)
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            for label, dry_run in (('dry run', True), ('insert', False), ('update', False)):
+                report, = import_directory(tmp, batch_size=args.batch_size, dry_run=dry_run)
+                print(f"{label:8} {report.summary()}")
+            print(f"rows in table: {TestQuestion.query.count()}")
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
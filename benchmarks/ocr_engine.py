@@ -0,0 +1,59 @@
+"""
+OCR throughput: inline reader vs. the worker-pool engine at several pool sizes.
+
+Sends --requests preprocessed synthetic images from --concurrency threads, the
+way concurrent uploads hit the API, and reports images/second.
+
+    python benchmarks/ocr_engine.py [--requests 32] [--concurrency 8] [--workers 1,2,4]
+
+Needs easyocr installed.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ai_models import ocr  # noqa: E402
+from app.ai_models.ocr_engine import OCREngine  # noqa: E402
+from app.ai_models.registry import get_ocr_reader  # noqa: E402
+from ocr_preprocess import synthetic_fixtures  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def throughput(readtext, images, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(readtext, images))
+    return len(images) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", default=",".join(str(n) for n in sorted({1, 2, os.cpu_count() or 1})))
+    args = parser.parse_args()
+
+    arrays = [ocr.preprocess_image(image) for _, image, _ in synthetic_fixtures()]
+    images = [arrays[i % len(arrays)] for i in range(args.requests)]
+    print(f"{args.requests} images, {args.concurrency} concurrent callers, {os.cpu_count()} cores")
+
+    reader = get_ocr_reader()
+    rate = throughput(lambda image: reader.readtext(image, detail=0), images, args.concurrency)
+    print(f"  {'inline':<22} {rate:>8.2f} images/s")
+
+    for workers in (int(n) for n in args.workers.split(",")):
+        engine = OCREngine(workers, Config.OCR_MAX_BATCH, Config.OCR_BATCH_WAIT_MS / 1000)
+        engine.warm_up()
+        rate = throughput(engine.readtext, images, args.concurrency)
+        stats = engine.stats()
+        engine.shutdown()
+        print(f"  {f'pool, {workers} workers':<22} {rate:>8.2f} images/s"
+              f"  (avg batch {stats['avg_batch_size']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Side-by-side import cost of the OCR pipeline module vs. the gradio demo.
+
+Each target is imported in a fresh interpreter, several times; the median import
+time and the resident memory after import are reported.
+
+    python benchmarks/ocr_import.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = [
+    ("API worker (app.ai_models.ocr)", "app.ai_models.ocr"),
+    ("Gradio demo (app.ai_models.ocr_demo)", "app.ai_models.ocr_demo"),
+]
+
+PROBE = """
+import importlib, json, resource, sys, time
+
+def rss_bytes():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+before = rss_bytes()
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(json.dumps({
+    'seconds': time.perf_counter() - start,
+    'rss_bytes': rss_bytes(),
+    'rss_delta_bytes': rss_bytes() - before,
+    'gradio_loaded': 'gradio' in sys.modules,
+}))
+"""
+
+
+def measure(module, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE, module], cwd=ROOT,
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            return {"error": out.stderr.strip().splitlines()[-1]}
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "seconds": statistics.median(s["seconds"] for s in samples),
+        "rss_bytes": statistics.median(s["rss_bytes"] for s in samples),
+        "rss_delta_bytes": statistics.median(s["rss_delta_bytes"] for s in samples),
+        "gradio_loaded": samples[0]["gradio_loaded"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'target':<40} {'import (s)':>11} {'RSS (MB)':>10} {'+RSS (MB)':>10}  gradio")
+    for label, module in TARGETS:
+        result = measure(module, args.runs)
+        if "error" in result:
+            print(f"{label:<40} failed: {result['error']}")
+            continue
+        print(f"{label:<40} {result['seconds']:>11.3f} "
+              f"{result['rss_bytes'] / 2**20:>10.1f} {result['rss_delta_bytes'] / 2**20:>10.1f}"
+              f"  {'yes' if result['gradio_loaded'] else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
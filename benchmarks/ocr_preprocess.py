@@ -0,0 +1,135 @@
+"""
+OCR latency and character accuracy with and without the preprocessing stage.
+
+Fixtures are either generated (phone-sized photos of known sentences, some with
+an EXIF rotation) or read from a directory of images, each with a same-named
+.txt file holding the expected text.
+
+    python benchmarks/ocr_preprocess.py [--fixtures DIR] [--runs 3]
+
+Needs easyocr installed; the reader is loaded once and shared by both settings.
+"""
+import argparse
+import difflib
+import io
+import os
+import statistics
+import sys
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ai_models import ocr  # noqa: E402
+from app.ai_models.registry import get_ocr_reader  # noqa: E402
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+SAMPLE_TEXTS = [
+    "Saya sedang belajar bahasa Inggris setiap pagi.",
+    "The library opens at nine o'clock on weekdays.",
+    "She has been working here since last year.",
+    "Kami akan pergi ke pasar besok siang.",
+]
+
+# Old behaviour: full-resolution RGB straight into EasyOCR
+BASELINE = dict(exif_transpose=False, max_side=0, grayscale=False, autocontrast=False, crop_text=False)
+
+
+def synthetic_fixtures():
+    """12 MP photo-like JPEGs: dark text on grey paper, every other one stored rotated."""
+    font = ImageFont.load_default(size=110)
+    fixtures = []
+    for i, text in enumerate(SAMPLE_TEXTS):
+        img = Image.new("RGB", (4000, 3000), color=(205, 200, 190))
+        draw = ImageDraw.Draw(img)
+        draw.text((300, 1200 + 150 * (i % 3)), text, fill=(40, 40, 45), font=font)
+
+        buf = io.BytesIO()
+        if i % 2:
+            # Stored sideways with an EXIF tag, like a portrait phone shot
+            img = img.transpose(Image.Transpose.ROTATE_90)
+            exif = Image.Exif()
+            exif[0x0112] = 6
+            img.save(buf, "JPEG", quality=90, exif=exif)
+        else:
+            img.save(buf, "JPEG", quality=90)
+        buf.seek(0)
+        fixtures.append((f"synthetic-{i}", Image.open(buf), text))
+    return fixtures
+
+
+def directory_fixtures(path):
+    fixtures = []
+    for name in sorted(os.listdir(path)):
+        stem, ext = os.path.splitext(name)
+        truth = os.path.join(path, stem + ".txt")
+        if ext.lower() not in IMAGE_EXTENSIONS or not os.path.exists(truth):
+            continue
+        with open(truth, encoding="utf-8") as f:
+            fixtures.append((stem, Image.open(os.path.join(path, name)), f.read().strip()))
+    return fixtures
+
+
+def char_accuracy(expected, actual):
+    normalize = lambda s: " ".join(s.lower().split())
+    return difflib.SequenceMatcher(None, normalize(expected), normalize(actual)).ratio()
+
+
+def run(fixtures, options, runs):
+    reader = get_ocr_reader()
+    rows = []
+    for name, image, expected in fixtures:
+        prep_times, ocr_times = [], []
+        for _ in range(runs):
+            start = time.perf_counter()
+            array = ocr.preprocess_image(image, **options)
+            prep_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            text = " ".join(reader.readtext(array, detail=0))
+            ocr_times.append(time.perf_counter() - start)
+        rows.append({
+            "name": name,
+            "shape": array.shape,
+            "preprocess": statistics.median(prep_times),
+            "ocr": statistics.median(ocr_times),
+            "accuracy": char_accuracy(expected, text),
+        })
+    return rows
+
+
+def report(label, rows):
+    print(f"\n{label}")
+    print(f"  {'fixture':<20} {'input':>16} {'prep (s)':>9} {'ocr (s)':>9} {'acc':>6}")
+    for r in rows:
+        shape = "x".join(str(d) for d in r["shape"])
+        print(f"  {r['name']:<20} {shape:>16} {r['preprocess']:>9.3f} {r['ocr']:>9.3f} {r['accuracy']:>6.1%}")
+    print(f"  {'median':<20} {'':>16} {statistics.median(r['preprocess'] for r in rows):>9.3f} "
+          f"{statistics.median(r['ocr'] for r in rows):>9.3f} "
+          f"{statistics.mean(r['accuracy'] for r in rows):>6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", help="directory of images with .txt ground truth")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--crop", action="store_true", help="also enable text-region cropping")
+    args = parser.parse_args()
+
+    fixtures = directory_fixtures(args.fixtures) if args.fixtures else synthetic_fixtures()
+    if not fixtures:
+        sys.exit("No fixtures found")
+
+    tuned = ocr.preprocess_options(crop_text=True) if args.crop else ocr.preprocess_options()
+    print(f"{len(fixtures)} fixtures, {args.runs} runs each")
+    print(f"preprocessing: {tuned}")
+
+    get_ocr_reader()  # load outside the timed region
+    report("before (full-resolution RGB)", run(fixtures, BASELINE, args.runs))
+    report("after (preprocessed)", run(fixtures, tuned, args.runs))
+
+
+if __name__ == "__main__":
+    main()
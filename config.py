@@ -11,3 +11,87 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     ADMIN_USERNAME = os.getenv("ADMIN_USERNAME")
     ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
+
+    # AI evaluation fan-out (shared worker pool for LLM calls)
+    AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", 6))
+    GEMINI_TASK_TIMEOUT = float(os.getenv("GEMINI_TASK_TIMEOUT", 60))
+    GEMINI_BATCH_TIMEOUT = float(os.getenv("GEMINI_BATCH_TIMEOUT", 120))  # whole fan-out, queue wait included
+
+    # OCR preprocessing before EasyOCR (OCR_MAX_SIDE=0 keeps full resolution)
+    OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", 1600))
+    OCR_EXIF_TRANSPOSE = os.getenv("OCR_EXIF_TRANSPOSE", "true").lower() == "true"
+    OCR_GRAYSCALE = os.getenv("OCR_GRAYSCALE", "true").lower() == "true"
+    OCR_AUTOCONTRAST = os.getenv("OCR_AUTOCONTRAST", "true").lower() == "true"
+    OCR_CROP_TEXT = os.getenv("OCR_CROP_TEXT", "false").lower() == "true"
+
+    # OCR execution: "inline" (reader in the web process) or "pool" (worker processes)
+    OCR_ENGINE = os.getenv("OCR_ENGINE", "inline")
+    OCR_WORKERS = int(os.getenv("OCR_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+    OCR_MAX_BATCH = int(os.getenv("OCR_MAX_BATCH", 4))
+    OCR_BATCH_WAIT_MS = float(os.getenv("OCR_BATCH_WAIT_MS", 20))
+    OCR_TORCH_THREADS = int(os.getenv("OCR_TORCH_THREADS", 0))  # 0 = cores / workers
+    OCR_TIMEOUT = float(os.getenv("OCR_TIMEOUT", 60))
+
+    # OCR result cache: exact image digest layer + normalised OCR text layer
+    OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+    OCR_IMAGE_INDEX_SIZE = int(os.getenv("OCR_IMAGE_INDEX_SIZE", 2048))  # image layer entries (memory backend)
+    OCR_CACHE_BACKEND = os.getenv("OCR_CACHE_BACKEND")  # text layer; defaults to CACHE_BACKEND
+    OCR_CACHE_TTL = int(os.getenv("OCR_CACHE_TTL", 30 * 24 * 3600))
+
+    # Feedback sentiment: "remote" (HF Space, local fallback) or "local" only
+    SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "remote")
+    SENTIMENT_TIMEOUT = float(os.getenv("SENTIMENT_TIMEOUT", 5))
+    SENTIMENT_RETRY_SECONDS = float(os.getenv("SENTIMENT_RETRY_SECONDS", 60))
+    SENTIMENT_LOCAL_MODEL_PATH = os.getenv("SENTIMENT_LOCAL_MODEL_PATH")  # joblib pipeline; lexicon if unset
+
+    # Background sentiment labelling of new feedback
+    SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", 20))
+    SENTIMENT_LABEL_INTERVAL = float(os.getenv("SENTIMENT_LABEL_INTERVAL", 30))
+    SENTIMENT_LABEL_ON_START = os.getenv("SENTIMENT_LABEL_ON_START", "true").lower() == "true"
+
+    # Admin dashboard counters: recomputed from the tables at most this often
+    STAT_RECONCILE_SECONDS = int(os.getenv("STAT_RECONCILE_SECONDS", 3600))
+    STAT_COMPACT_SECONDS = int(os.getenv("STAT_COMPACT_SECONDS", 60))  # fold counter deltas into base rows
+
+    # /api/metrics is only served to a logged-in admin or with an X-Metrics-Token header
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "false").lower() == "true"
+
+    # Models loaded in the background at startup: comma list of registry names, "all", or "" (lazy)
+    WARMUP_MODELS = os.getenv("WARMUP_MODELS", "")
+
+    # Shared Gemini client (connection pool, timeouts, retries)
+    LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 20))
+    LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", 60))
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+    LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", 0.5))
+    LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", 8))
+
+    # Background jobs (/api/jobs)
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+    JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 5))
+    JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", 30))
+    JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", 180))  # no heartbeat for this long = worker died
+    JOB_WORKERS_AUTOSTART = os.getenv("JOB_WORKERS_AUTOSTART", "true").lower() == "true"  # server processes only
+    JOB_CALLBACK_TIMEOUT = float(os.getenv("JOB_CALLBACK_TIMEOUT", 10))
+    JOB_CALLBACK_ALLOWED_HOSTS = os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "")  # comma list; empty = any public host
+    JOB_UPLOAD_DIR = os.getenv("JOB_UPLOAD_DIR", "instance/job_uploads")
+
+    # Response caches (memory | sqlite | redis | none)
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 2048))
+    CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "instance/cache.db")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    GEMINI_CACHE_BACKEND = os.getenv("GEMINI_CACHE_BACKEND")  # defaults to CACHE_BACKEND
+    GEMINI_CACHE_TTL = int(os.getenv("GEMINI_CACHE_TTL", 7 * 24 * 3600))
+    # Lessons/quizzes; defaults to CACHE_BACKEND. Versions always use a shared backend (sqlite unless redis)
+    CONTENT_CACHE_BACKEND = os.getenv("CONTENT_CACHE_BACKEND")
+    CONTENT_CACHE_TTL = int(os.getenv("CONTENT_CACHE_TTL", 3600))
+
+    # Practice tests prefer questions not answered in the user's last N sessions (0 = off)
+    PRACTICE_RECENT_SESSIONS = int(os.getenv("PRACTICE_RECENT_SESSIONS", 3))
+
+    # Full test layout: default blueprint name, plus extra blueprints as inline JSON or a JSON file path
+    TEST_BLUEPRINT = os.getenv("TEST_BLUEPRINT", "ielts")
+    TEST_BLUEPRINTS = os.getenv("TEST_BLUEPRINTS")
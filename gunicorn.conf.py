@@ -0,0 +1,11 @@
+"""
+Gunicorn settings, loaded automatically from the working directory:
+
+    gunicorn -w 4 -b 0.0.0.0:5000 wsgi:app
+"""
+
+
+def post_worker_init(worker):
+    # Each worker runs its own job workers and labeller; the master never does
+    from app import start_background_services
+    start_background_services()
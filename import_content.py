@@ -0,0 +1,56 @@
+"""
+Load lessons, sections, quizzes, quiz questions and test questions from
+bank-materi-and-soal (alysa_<dataset>.csv or .parquet) into the database.
+
+    python import_content.py                               # everything in bank-materi-and-soal/
+    python import_content.py --only test_questions         # just the question bank
+    python import_content.py --dir exports/ --dry-run      # validate only, write nothing
+"""
+import argparse
+import os
+import sys
+
+# Add parent directory to sys.path to import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from app import create_app
+from app.models.database import db
+from app.utils.content_import import DATASETS, import_directory
+
+MAX_ERRORS_SHOWN = 10
+
+
+def run(directory, names, batch_size, dry_run):
+    reports = import_directory(directory, names=names, batch_size=batch_size, dry_run=dry_run)
+    if not reports:
+        print(f"No alysa_*.csv / .parquet files found in {directory}")
+        return 1
+
+    for report in reports:
+        print(report.summary())
+        for line, error in report.errors[:MAX_ERRORS_SHOWN]:
+            print(f"  line {line}: {error}")
+        if len(report.errors) > MAX_ERRORS_SHOWN:
+            print(f"  ... and {len(report.errors) - MAX_ERRORS_SHOWN} more")
+
+    rows = sum(r.rows for r in reports)
+    seconds = sum(r.seconds for r in reports)
+    print(f"Total: {rows} rows in {seconds:.2f}s ({rows / seconds if seconds else 0:,.0f} rows/s)"
+          + (" - dry run, nothing written" if dry_run else ""))
+    return 1 if any(r.errors for r in reports) else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Bulk import learning content and test questions")
+    parser.add_argument('--dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                      'bank-materi-and-soal'))
+    parser.add_argument('--only', help="comma-separated datasets: " + ", ".join(d.name for d in DATASETS))
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--dry-run', action='store_true', help="validate only")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        names = [n.strip() for n in args.only.split(',')] if args.only else None
+        sys.exit(run(args.dir, names, args.batch_size, args.dry_run))
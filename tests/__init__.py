@@ -1 +1,7 @@
 # Tests package
+import os
+import tempfile
+
+# Shared caches (content versions) use sqlite; keep the test run's out of instance/
+_cache_dir = tempfile.TemporaryDirectory()
+os.environ.setdefault("CACHE_SQLITE_PATH", os.path.join(_cache_dir.name, "cache.db"))
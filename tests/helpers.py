@@ -0,0 +1,70 @@
+"""
+Shared fixture for tests that run a Flask app on a temporary SQLite database.
+"""
+import os
+import tempfile
+import unittest
+
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+from sqlalchemy import event
+
+from app.models.database import User, db
+
+
+class AppTestCase(unittest.TestCase):
+    """
+    A Flask app with `blueprints` registered, a fresh SQLite database, JWT and
+    user 1 (`self.headers` authenticates as them). Override seed() to add rows.
+    With push_context, an app context stays pushed for the whole test.
+    """
+    blueprints = ()
+    push_context = False
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config.update(
+            SQLALCHEMY_DATABASE_URI='sqlite:///' + os.path.join(self.tmp.name, 'test.db'),
+            JWT_SECRET_KEY='test-secret-key-with-enough-length',
+            SECRET_KEY='test-session-secret',
+        )
+        db.init_app(self.app)
+        JWTManager(self.app)
+        for blueprint in self.blueprints:
+            self.app.register_blueprint(blueprint)
+
+        with self.app.app_context():
+            db.create_all()
+            db.session.add(User(id=1, username='u1', email='u1@example.com'))
+            self.seed()
+            db.session.commit()
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+        self.client = self.app.test_client()
+        if self.push_context:
+            self.ctx = self.app.app_context()
+            self.ctx.push()
+
+    def seed(self):
+        """Add rows to db.session; they are committed together with the user."""
+
+    def tearDown(self):
+        if self.push_context:
+            db.session.remove()
+            self.ctx.pop()
+        with self.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        self.tmp.cleanup()
+
+    def run_recording_sql(self, call, *args, **kwargs):
+        """(call's result, lower-cased SQL statements it ran)"""
+        statements = []
+        with self.app.app_context():
+            listener = lambda *event_args: statements.append(event_args[2].lower())
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                result = call(*args, **kwargs)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+        return result, statements
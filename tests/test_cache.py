@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.utils.cache import Cache, MemoryBackend, SQLiteBackend
+
+
+class TestCacheBackends(unittest.TestCase):
+
+    def test_memory_lru_eviction(self):
+        """Least recently used entry is evicted first"""
+        backend = MemoryBackend(max_entries=2)
+        backend.set("a", "1")
+        backend.set("b", "2")
+        backend.get("a")
+        backend.set("c", "3")
+        self.assertEqual(backend.get("a"), "1")
+        self.assertIsNone(backend.get("b"))
+
+    def test_memory_ttl_expiry(self):
+        backend = MemoryBackend()
+        backend.set("a", "1", ttl=0.05)
+        time.sleep(0.1)
+        self.assertIsNone(backend.get("a"))
+
+    def test_sqlite_roundtrip_and_clear(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = SQLiteBackend(os.path.join(tmp, "cache.db"))
+            backend.set("ns:a", "1")
+            backend.set("other:b", "2")
+            self.assertEqual(backend.get("ns:a"), "1")
+            backend.clear("ns:")
+            self.assertIsNone(backend.get("ns:a"))
+            self.assertEqual(backend.get("other:b"), "2")
+
+    def test_counters_and_copy_semantics(self):
+        """Hits/misses are counted and callers get independent copies"""
+        cache = Cache("test", MemoryBackend(), "memory")
+        self.assertIsNone(cache.get("k"))
+        cache.set("k", {"score": 7.0})
+        first = cache.get("k")
+        first["score"] = 0
+        self.assertEqual(cache.get("k"), {"score": 7.0})
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+
+
+class TestGeminiFeedbackCache(unittest.TestCase):
+
+    def setUp(self):
+        import app.ai_models.gemini as gemini
+        self.gemini = gemini
+        gemini._cache.clear()
+
+    def test_repeat_submission_skips_api(self):
+        """Second identical (whitespace-normalised) essay is served from cache"""
+        response = MagicMock()
+        response.text = json.dumps({"status": "correct", "title": "Mantap!"})
+
+        with patch.object(self.gemini.llm_client, "generate_content", return_value=response) as call:
+            first = self.gemini.ai_toefl_feedback("I  am happy.", mode="learning")
+            second = self.gemini.ai_toefl_feedback("I am happy. ", mode="learning")
+
+        self.assertEqual(first, second)
+        self.assertEqual(call.call_count, 1)
+
+    def test_stream_pushes_fields_before_completion(self):
+        """status/title are emitted while Gemini is still generating, then cached"""
+        reply = json.dumps({"status": "almost", "title": "Sedikit lagi!", "corrected_text": "I am happy."})
+        consumed = []
+
+        def chunks(prompt, model=None):
+            for i in range(0, len(reply), 10):
+                consumed.append(i)
+                yield reply[i:i + 10]
+
+        with patch.object(self.gemini.llm_client, "generate_content_stream", side_effect=chunks):
+            stream = self.gemini.stream_toefl_feedback("I happy.", mode="learning")
+            event, data = next(stream)
+            self.assertEqual((event, data), ("status", {"status": "almost"}))
+            self.assertLess(len(consumed), len(range(0, len(reply), 10)))
+            rest = list(stream)
+
+        self.assertEqual([e for e, _ in rest], ["title", "corrected_text", "result"])
+        self.assertEqual(rest[-1][1]["corrected_text"], "I am happy.")
+        self.assertEqual(self.gemini.ai_toefl_feedback("I happy.", mode="learning"), rest[-1][1])
+
+    def test_mode_is_part_of_the_key(self):
+        self.assertNotEqual(
+            self.gemini.feedback_cache_key("text", "test"),
+            self.gemini.feedback_cache_key("text", "learning"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from app.utils import concurrency
+from app.utils.concurrency import map_bounded
+
+
+class TestMapBounded(unittest.TestCase):
+
+    def test_results_keep_input_order(self):
+        """Slow early items must not reorder the results"""
+        def work(x):
+            time.sleep(0.05 * (5 - x))
+            return x * 10
+
+        self.assertEqual(map_bounded(work, range(5)), [0, 10, 20, 30, 40])
+
+    def test_runs_concurrently(self):
+        """Wall-clock time approaches the slowest single call"""
+        start = time.monotonic()
+        map_bounded(lambda _: time.sleep(0.2), range(5))
+        self.assertLess(time.monotonic() - start, 0.6)
+
+    def test_timeout_uses_fallback(self):
+        """A call exceeding the timeout is replaced by the fallback result"""
+        def work(x):
+            if x == 1:
+                time.sleep(1)
+            return x
+
+        start = time.monotonic()
+        result = map_bounded(work, [0, 1, 2], timeout=0.2,
+                             fallback=lambda item, e: f'timeout:{item}')
+        self.assertEqual(result, [0, 'timeout:1', 2])
+        self.assertLess(time.monotonic() - start, 0.8)
+
+    def test_deadline_covers_time_spent_queued(self):
+        """Items stuck behind a saturated pool time out with the batch deadline"""
+        pool = ThreadPoolExecutor(max_workers=1)
+        try:
+            with patch.object(concurrency, 'get_executor', return_value=pool):
+                start = time.monotonic()
+                result = map_bounded(lambda x: time.sleep(0.3) or x, [0, 1, 2, 3], timeout=1, deadline=0.5,
+                                     fallback=lambda item, e: f'timeout:{item}')
+                elapsed = time.monotonic() - start
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        # Each call is under its own timeout, but only the first finishes within the deadline
+        self.assertEqual(result[0], 0)
+        self.assertEqual(result[2:], ['timeout:2', 'timeout:3'])
+        self.assertLess(elapsed, 0.8)
+
+    def test_exception_uses_fallback(self):
+        def work(x):
+            raise ValueError('boom')
+
+        result = map_bounded(work, [1], fallback=lambda item, e: str(e))
+        self.assertEqual(result, ['boom'])
+
+    def test_exception_without_fallback_raises(self):
+        def work(x):
+            raise ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            map_bounded(work, [1])
+
+    def test_empty_input(self):
+        self.assertEqual(map_bounded(lambda x: x, []), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from app.models.database import Lesson, LessonSection, Quiz, QuizQuestion, UserLessonProgress, db
+from app.routes.admin import admin_bp
+from app.routes.learning import learning_bp
+from app.utils import content_cache, lesson_completion
+from app.utils.cache import Cache, SQLiteBackend
+from config import Config
+from tests.helpers import AppTestCase
+
+
+class TestContentCache(AppTestCase):
+    blueprints = (learning_bp, admin_bp)
+
+    def setUp(self):
+        content_cache._cache.clear()
+        content_cache.invalidate()
+        super().setUp()
+
+    def seed(self):
+        db.session.add(Quiz(id='q1', title='Quiz 1'))
+        db.session.add_all([Lesson(id='l1', title='Lesson 1', category='Writing'),
+                            Lesson(id='l2', title='Lesson 2', category='Speaking')])
+        db.session.add(LessonSection(lesson_id='l1', title='Intro', quiz_id='q1'))
+        db.session.add(QuizQuestion(quiz_id='q1', question_text='2+2?', options='["3", "4"]',
+                                    correct_option_index=1))
+        db.session.add(UserLessonProgress(user_id=1, lesson_id='l2', is_completed=True))
+
+    def get(self, url, **kwargs):
+        """(response, number of SQL statements it ran)"""
+        response, statements = self.run_recording_sql(self.client.get, url, **kwargs)
+        return response, len(statements)
+
+    def test_detail_and_quiz_are_served_from_cache(self):
+        for url in ('/api/lessons/l1', '/api/quizzes/q1'):
+            first, queries = self.get(url)
+            self.assertGreater(queries, 0)
+            second, queries = self.get(url)
+            self.assertEqual(queries, 0)
+            self.assertEqual(first.get_json(), second.get_json())
+
+        quiz = self.client.get('/api/quizzes/q1').get_json()
+        self.assertEqual(quiz['questions'][0]['options'], ['3', '4'])
+        self.assertEqual(self.client.get('/api/lessons/nope').status_code, 404)
+
+    def test_catalog_keeps_per_user_completion(self):
+        anonymous = self.client.get('/api/lessons').get_json()['lessons']
+        self.assertEqual({l['id']: l['isCompleted'] for l in anonymous}, {'l1': False, 'l2': False})
+
+        self.get('/api/lessons', headers=self.headers)  # builds the user's completion bitmap
+        response, queries = self.get('/api/lessons', headers=self.headers)
+        self.assertEqual(queries, 0)
+        self.assertEqual({l['id']: l['isCompleted'] for l in response.get_json()['lessons']},
+                         {'l1': False, 'l2': True})
+        self.assertIn('private', response.headers['Cache-Control'])
+
+        bad_token = self.client.get('/api/lessons', headers={'Authorization': 'Bearer nope'})
+        self.assertEqual(bad_token.status_code, 200)
+
+        writing = self.client.get('/api/lessons?category=writing').get_json()['lessons']
+        self.assertEqual([l['id'] for l in writing], ['l1'])
+
+    def test_progress_updates_flip_cached_bits(self):
+        self.client.get('/api/lessons', headers=self.headers)
+        self.client.post('/api/learning/progress', headers=self.headers, json={'lesson_id': 'l1'})
+        self.client.post('/api/learning/progress/sync', headers=self.headers,
+                         json={'progress': [{'lesson_id': 'l2', 'is_completed': False}]})
+
+        response, queries = self.get('/api/lessons', headers=self.headers)
+        self.assertEqual(queries, 0)
+        self.assertEqual({l['id']: l['isCompleted'] for l in response.get_json()['lessons']},
+                         {'l1': True, 'l2': False})
+
+    def test_progress_recorded_by_another_worker_is_seen(self):
+        self.client.get('/api/lessons', headers=self.headers)  # this worker caches the bitmap
+        self.assertEqual(lesson_completion._cache.backend_name, 'sqlite')
+
+        # Another worker handles the progress POST: it updates the same shared store
+        other_worker = Cache('lesson_completion', SQLiteBackend(Config.CACHE_SQLITE_PATH), 'sqlite')
+        with patch.object(lesson_completion, '_cache', other_worker):
+            self.client.post('/api/learning/progress', headers=self.headers, json={'lesson_id': 'l1'})
+
+        lessons = self.client.get('/api/lessons', headers=self.headers).get_json()['lessons']
+        self.assertEqual({l['id']: l['isCompleted'] for l in lessons}, {'l1': True, 'l2': True})
+
+    def test_conditional_requests_get_304(self):
+        first = self.client.get('/api/lessons/l1')
+        self.assertTrue(first.headers['ETag'])
+        self.assertTrue(first.headers['Last-Modified'])
+
+        revalidated = self.client.get('/api/lessons/l1', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.get_data(), b'')
+
+    def test_admin_edit_invalidates(self):
+        before = self.client.get('/api/quizzes/q1')
+        with self.client.session_transaction() as session:
+            session['admin_logged_in'] = True
+        self.client.post('/admin/quiz/edit/q1', data={'title': 'Renamed'})
+
+        after = self.client.get('/api/quizzes/q1', headers={'If-None-Match': before.headers['ETag']})
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(json.loads(after.get_data())['title'], 'Renamed')
+
+    def test_edit_in_another_process_invalidates_this_one(self):
+        first = self.client.get('/api/quizzes/q1')
+        with self.app.app_context():
+            db.session.get(Quiz, 'q1').title = 'Edited elsewhere'
+            db.session.commit()
+
+        # Another worker's invalidate(): its own connection to the shared version store
+        self.assertEqual(content_cache._versions.backend_name, 'sqlite')
+        other_worker = Cache('content_version', SQLiteBackend(Config.CACHE_SQLITE_PATH), 'sqlite')
+        other_worker.set('version', {'id': 'other', 'modified': 1.0})
+
+        after = self.client.get('/api/quizzes/q1', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(after.get_json()['title'], 'Edited elsewhere')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import unittest
+
+from app.models.database import Lesson, LessonSection, Quiz, QuizQuestion, TestQuestion, db
+from app.utils import content_cache
+from app.utils.content_import import import_directory
+from tests.helpers import AppTestCase
+
+BANK = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bank-materi-and-soal')
+
+
+class TestContentImport(AppTestCase):
+    push_context = True
+
+    def counts(self):
+        return [model.query.count() for model in (Lesson, Quiz, LessonSection, QuizQuestion, TestQuestion)]
+
+    def test_imports_bank_and_is_idempotent(self):
+        version = content_cache.current_version()
+        reports = import_directory(BANK, batch_size=7)
+        self.assertEqual([r.errors for r in reports], [[]] * 5)
+        self.assertEqual(self.counts(), [20, 20, 60, 60, 30])
+        self.assertNotEqual(content_cache.current_version(), version)
+
+        import_directory(BANK)
+        self.assertEqual(self.counts(), [20, 20, 60, 60, 30])
+
+        section = db.session.get(LessonSection, 1)
+        self.assertIsNone(section.quiz_id)  # "NULL" in the CSV
+        question = TestQuestion.query.first()
+        self.assertTrue(question.keywords.startswith('["'))
+
+    def test_dry_run_writes_nothing(self):
+        reports = import_directory(BANK, dry_run=True)
+        self.assertEqual(sum(r.rows for r in reports), 190)
+        self.assertEqual(self.counts(), [0, 0, 0, 0, 0])
+        self.assertEqual([r.written for r in reports], [0] * 5)
+        self.assertEqual(sum(r.would_write for r in reports), 190)
+        self.assertIn('would be written', reports[0].summary())
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        with open(os.path.join(self.tmp.name, 'alysa_quiz_questions.csv'), 'w') as f:
+            f.write('id,quiz_id,question_text,options,correct_option_index\n'
+                    '1,quiz_x,Q?,"[""a"", ""b""]",1\n'
+                    '2,quiz_missing,Q?,"[""a"", ""b""]",1\n'
+                    '3,quiz_x,Q?,"[""a"", ""b""]",5\n'
+                    '4,quiz_x,Q?,not json,0\n')
+        with open(os.path.join(self.tmp.name, 'alysa_quizzes.csv'), 'w') as f:
+            f.write('id,title\nquiz_x,Quiz X\n')
+
+        reports = import_directory(self.tmp.name)
+        questions = reports[-1]
+        self.assertEqual((questions.rows, questions.written), (4, 1))
+        self.assertEqual([line for line, _ in questions.errors], [3, 4, 5])
+        self.assertIn('quiz_missing', questions.errors[0][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
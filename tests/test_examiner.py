@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+import app.ai_models.Alysa.examiner as examiner
+
+
+class FakeEmbedder:
+    """Deterministic 2-d embedding per text; records every encode() call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, convert_to_tensor=False):
+        self.calls.append(list(texts))
+        return np.array([[len(text), 1.0] for text in texts])
+
+
+def pairwise_cos_sim(a, b):
+    return np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+
+class TestExaminerBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.embedder = FakeEmbedder()
+        self.tool = MagicMock()
+        self.tool.check.side_effect = lambda answer: ['error'] * answer.count('bad')
+        self.model = MagicMock()
+        # Raw score = grammar errors column, so each answer maps to a distinct score
+        self.model.predict.side_effect = lambda features: [min(5, row[0]) for row in features]
+
+        patches = [
+            patch.object(examiner, 'get_embedder', return_value=self.embedder),
+            patch.object(examiner, 'get_language_tool', return_value=self.tool),
+            patch.object(examiner, 'get_examiner_model', return_value=self.model),
+            patch.object(examiner, 'pairwise_cos_sim', pairwise_cos_sim),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_results_keep_input_order(self):
+        pairs = [('Q', 'bad ' * n + 'answer') for n in (3, 0, 5, 1)]
+        results = examiner.evaluate_batch(pairs)
+        expected = [examiner.build_result(n, examiner.extract_features(*pair)[1], pair[1])['score']
+                    for n, pair in zip((3, 0, 5, 1), pairs)]
+        self.assertEqual([r['score'] for r in results], expected)
+
+    def test_batch_makes_one_encode_and_one_predict_call(self):
+        examiner.evaluate_batch([('Q1', 'first answer'), ('Q2', 'second answer'), ('Q1', 'third')])
+        self.assertEqual(len(self.embedder.calls), 1)
+        self.assertEqual(self.model.predict.call_count, 1)
+        self.assertEqual(len(self.model.predict.call_args[0][0]), 3)
+
+    def test_duplicate_inputs_are_deduplicated(self):
+        pairs = [('Q', 'same bad answer'), ('Q', 'other'), ('Q', 'same bad answer')]
+        results = examiner.evaluate_batch(pairs)
+
+        # Texts are embedded once each, and the repeated pair is featurised and predicted once
+        self.assertEqual(self.embedder.calls, [['Q', 'same bad answer', 'other']])
+        self.assertEqual(self.tool.check.call_count, 2)
+        self.assertEqual(len(self.model.predict.call_args[0][0]), 2)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0], results[2])
+        self.assertIsNot(results[0], results[2])
+
+    def test_empty_batch(self):
+        self.assertEqual(examiner.evaluate_batch([]), [])
+        self.model.predict.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
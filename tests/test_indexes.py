@@ -0,0 +1,96 @@
+import unittest
+from datetime import datetime
+
+from sqlalchemy import event, text
+
+from app.models.database import (OCRTranslation, TestAnswer, TestSession, UserAttempt, UserFeedback,
+                                 UserLessonProgress, db)
+from app.models.migrations import backfill_timestamps, ensure_columns, ensure_indexes, missing_indexes
+from app.utils.pagination import encode_cursor, keyset_page
+from tests.helpers import AppTestCase
+
+
+class TestIndexes(AppTestCase):
+    push_context = True
+
+    def plan(self, run):
+        """EXPLAIN QUERY PLAN for the first statement `run()` executes."""
+        executed = []
+        listener = lambda conn, cursor, statement, params, *args: executed.append((statement, params))
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            run()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        statement, params = executed[0]
+        rows = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, params).fetchall()
+        return ' | '.join(row[-1] for row in rows)
+
+    def test_ensure_indexes_adds_missing_ones_once(self):
+        db.session.execute(text('DROP INDEX ix_ocr_translations_user_created'))
+        db.session.commit()
+        self.assertEqual([i.name for i in missing_indexes(db.engine)], ['ix_ocr_translations_user_created'])
+
+        self.assertEqual(ensure_indexes(db.engine), ['ix_ocr_translations_user_created'])
+        self.assertEqual(ensure_indexes(db.engine), [])
+
+    def test_ensure_columns_adds_new_nullable_columns(self):
+        db.session.execute(text('ALTER TABLE jobs DROP COLUMN heartbeat_at'))
+        db.session.commit()
+
+        self.assertEqual(ensure_columns(db.engine), ['jobs.heartbeat_at'])
+        self.assertEqual(ensure_columns(db.engine), [])
+
+    def test_null_keyset_timestamps_are_backfilled(self):
+        # test_sessions as older databases created it, with a nullable started_at
+        db.session.execute(text('PRAGMA foreign_keys=OFF'))
+        db.session.execute(text('DROP TABLE test_sessions'))
+        db.session.execute(text('CREATE TABLE test_sessions (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, '
+                                'total_score FLOAT NOT NULL, ai_feedback TEXT NOT NULL, '
+                                'started_at DATETIME, finished_at DATETIME)'))
+        db.session.execute(text("INSERT INTO test_sessions VALUES "
+                                "(1, 1, 0, '{}', '2025-01-02 00:00:00.000000', NULL), "
+                                "(2, 1, 0, '{}', NULL, '2025-01-01 00:00:00.000000'), "
+                                "(3, 1, 0, '{}', NULL, NULL), "
+                                "(4, 1, 0, '{}', '2025-01-01 00:00:00.000000', NULL)"))
+        db.session.commit()
+
+        filled = backfill_timestamps(db.engine)
+        self.assertEqual(filled['test_sessions.started_at'], 2)
+        self.assertEqual(backfill_timestamps(db.engine)['test_sessions.started_at'], 0)
+
+        # Every row is now reachable by the cursor walk, exactly once
+        seen, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(TestSession.query.filter_by(user_id=1), TestSession.started_at,
+                                       TestSession.id, 1, cursor)
+            seen += [row.id for row in rows]
+            if not cursor:
+                break
+        self.assertEqual(seen, [3, 1, 4, 2])
+
+    def test_history_queries_use_indexes(self):
+        cursor = encode_cursor(datetime(2025, 1, 1), 10)
+        history = [
+            (OCRTranslation, OCRTranslation.created_at, 'ix_ocr_translations_user_created'),
+            (UserAttempt, UserAttempt.created_at, 'ix_user_attempts_user_created'),
+            (TestSession, TestSession.started_at, 'ix_test_sessions_user_started'),
+        ]
+        for model, ts_column, index in history:
+            query = model.query.filter_by(user_id=1)
+            plan = self.plan(lambda: keyset_page(query, ts_column, model.id, 20, cursor))
+            self.assertIn(index, plan)
+            self.assertNotIn('TEMP B-TREE', plan)  # ORDER BY is served by the index
+
+        answers = TestAnswer.query.filter(TestAnswer.test_session_id.in_([1, 2, 3]))
+        self.assertIn('ix_test_answers_session', self.plan(answers.all))
+
+        feedback = UserFeedback.query.order_by(UserFeedback.created_at.desc()).limit(10)
+        self.assertIn('ix_user_feedback_created', self.plan(feedback.all))
+
+        progress = UserLessonProgress.query.filter_by(user_id=1, lesson_id='l1')
+        self.assertIn('uq_user_lesson_progress_user_lesson', self.plan(progress.all))
+
+
+if __name__ == "__main__":
+    unittest.main()
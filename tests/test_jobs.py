@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+from flask_jwt_extended import create_access_token
+
+from app.models.database import Job, User, db
+from app.routes.jobs import jobs_bp
+from app.utils import jobs
+from tests.helpers import AppTestCase
+
+
+class TestJobQueue(AppTestCase):
+    blueprints = (jobs_bp,)
+
+    def setUp(self):
+        super().setUp()
+        self.app.config['TESTING'] = True
+        jobs.init_app(self.app)
+        jobs.register_handler('echo', lambda p: ({'echo': p['value']}, 200))
+        jobs.register_handler('invalid', lambda p: ({'error': 'bad input'}, 400))
+
+    def seed(self):
+        db.session.add(User(id=2, username='u2', email='u2@example.com'))
+
+    def _token(self, user_id):
+        with self.app.app_context():
+            return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+
+    def _wait(self, job_id, headers, timeout=5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            body = self.client.get(f'/api/jobs/{job_id}', headers=headers).get_json()
+            if body['status'] in ('done', 'failed'):
+                return body
+            time.sleep(0.05)
+        self.fail('job did not finish')
+
+    def test_job_runs_and_result_is_pollable(self):
+        with self.app.test_request_context():
+            job = jobs.enqueue('echo', {'value': 42}, user_id=1)
+
+        body = self._wait(job.id, self._token(1))
+        self.assertEqual(body['status'], 'done')
+        self.assertEqual(body['status_code'], 200)
+        self.assertEqual(body['result'], {'echo': 42})
+
+    def test_error_response_marks_job_failed(self):
+        with self.app.test_request_context():
+            job = jobs.enqueue('invalid', {}, user_id=1)
+
+        body = self._wait(job.id, self._token(1))
+        self.assertEqual(body['status'], 'failed')
+        self.assertEqual(body['status_code'], 400)
+
+    def test_other_users_cannot_see_job(self):
+        with self.app.test_request_context():
+            job = jobs.enqueue('echo', {'value': 1}, user_id=1)
+
+        response = self.client.get(f'/api/jobs/{job.id}', headers=self._token(2))
+        self.assertEqual(response.status_code, 404)
+        self._wait(job.id, self._token(1))
+
+    def test_job_is_claimed_once(self):
+        """A second run of an already-claimed job is a no-op"""
+        with self.app.app_context():
+            db.session.add(Job(id='abc', kind='echo', status='queued', payload='{"value": 1}'))
+            db.session.commit()
+            jobs.run_job('abc')
+            finished_at = Job.query.get('abc').finished_at
+            jobs.run_job('abc')
+            self.assertEqual(Job.query.get('abc').finished_at, finished_at)
+            self.assertEqual(Job.query.get('abc').status, 'done')
+
+    def test_running_job_with_heartbeat_is_not_requeued(self):
+        """Only jobs whose heartbeat stopped go back to the queue"""
+        long_ago = datetime.utcnow() - timedelta(hours=1)
+        with self.app.app_context():
+            db.session.add(Job(id='alive', kind='echo', status='running', payload='{}',
+                               started_at=long_ago, heartbeat_at=datetime.utcnow()))
+            db.session.add(Job(id='dead', kind='echo', status='running', payload='{}',
+                               started_at=long_ago, heartbeat_at=long_ago))
+            db.session.add(Job(id='legacy', kind='echo', status='running', payload='{}', started_at=long_ago))
+            db.session.commit()
+
+            self.assertEqual(jobs.requeue_abandoned(), 2)
+            statuses = {job.id: job.status for job in Job.query.all()}
+        self.assertEqual(statuses, {'alive': 'running', 'dead': 'queued', 'legacy': 'queued'})
+
+    def test_callback_url_must_be_public(self):
+        for url in ['http://127.0.0.1/hook', 'http://localhost:8080/', 'http://10.1.2.3/',
+                    'http://169.254.169.254/latest/meta-data/', 'http://[::1]/', 'http://[::ffff:127.0.0.1]/',
+                    'ftp://93.184.216.34/', 'http://user:pw@93.184.216.34/']:
+            with self.assertRaises(ValueError, msg=url):
+                jobs.check_callback_url(url)
+
+        self.assertEqual(jobs.check_callback_url('https://93.184.216.34/hook?x=1'),
+                         ('https', '93.184.216.34', 443, '/hook?x=1', '93.184.216.34'))
+
+        with self.app.test_request_context():
+            response, status = jobs.enqueue_response('echo', {'value': 1}, user_id=1,
+                                                     callback_url='http://169.254.169.254/')
+        self.assertEqual(status, 400)
+        with self.app.app_context():
+            self.assertEqual(Job.query.count(), 0)
+
+    def test_callback_is_posted_to_allowed_host(self):
+        received = []
+
+        class Hook(BaseHTTPRequestHandler):
+            def do_POST(self):
+                received.append(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), Hook)
+        threading.Thread(target=server.handle_request, daemon=True).start()
+        try:
+            with patch.object(jobs.Config, 'JOB_CALLBACK_ALLOWED_HOSTS', '127.0.0.1'):
+                with self.app.app_context():
+                    db.session.add(Job(id='cb', kind='echo', status='queued', payload='{"value": 7}',
+                                       callback_url=f'http://127.0.0.1:{server.server_port}/hook'))
+                    db.session.commit()
+                    jobs.run_job('cb')
+        finally:
+            server.server_close()
+        self.assertEqual(received[0]['job_id'], 'cb')
+        self.assertEqual(received[0]['result'], {'echo': 7})
+
+
+if __name__ == "__main__":
+    unittest.main()
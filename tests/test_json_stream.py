@@ -0,0 +1,47 @@
+import json
+import unittest
+
+from app.utils.json_stream import JsonStreamParser
+
+DOC = {
+    "translation": "I am \"happy\", {really}",
+    "sentence_analysis": [
+        {"sentence": "a, b]", "grammar_point": "x", "explanation": "y"},
+        {"sentence": "c", "grammar_point": "z", "explanation": "w"},
+    ],
+    "score": 7,
+}
+
+
+def feed_in_chunks(text, size):
+    parser = JsonStreamParser()
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i:i + size]))
+    return parser, events
+
+
+class TestJsonStreamParser(unittest.TestCase):
+
+    def test_fields_and_items_any_chunk_size(self):
+        text = "```json\n" + json.dumps(DOC, indent=2) + "\n```"
+        for size in (1, 2, 5, 64, len(text)):
+            parser, events = feed_in_chunks(text, size)
+            self.assertEqual(events[0], ('field', 'translation', DOC['translation']))
+            items = [value for kind, key, value in events if kind == 'item']
+            self.assertEqual(items, DOC['sentence_analysis'])
+            self.assertEqual(parser.fields, DOC)
+            self.assertTrue(parser.done)
+
+    def test_field_is_emitted_before_the_object_closes(self):
+        parser = JsonStreamParser()
+        self.assertEqual(parser.feed('{"status": "correct", "title": "Man'), [('field', 'status', 'correct')])
+        self.assertEqual(parser.feed('tap!", '), [('field', 'title', 'Mantap!')])
+
+    def test_malformed_values_are_skipped(self):
+        _, events = feed_in_chunks('{"a": tru, "b": 1}', 3)
+        self.assertEqual(events, [('field', 'b', 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from google.genai import errors
+
+import app.ai_models.llm_client as llm_client
+
+
+def api_error(code):
+    return errors.APIError(code, {"error": {"message": f"HTTP {code}", "status": "ERR"}})
+
+
+class TestLLMClient(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MagicMock()
+        patcher = patch.object(llm_client, "get_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        sleeper = patch.object(llm_client.time, "sleep")
+        self.sleep = sleeper.start()
+        self.addCleanup(sleeper.stop)
+
+    def test_retries_on_rate_limit(self):
+        """429 is retried with backoff, then the successful response is returned"""
+        self.client.models.generate_content.side_effect = [api_error(429), api_error(503), "ok"]
+        retries_before = llm_client.stats.retries
+
+        self.assertEqual(llm_client.generate_content("hi"), "ok")
+        self.assertEqual(self.client.models.generate_content.call_count, 3)
+        self.assertEqual(self.sleep.call_count, 2)
+        self.assertEqual(llm_client.stats.retries - retries_before, 2)
+
+    def test_client_errors_are_not_retried(self):
+        self.client.models.generate_content.side_effect = api_error(400)
+        with self.assertRaises(errors.APIError):
+            llm_client.generate_content("hi")
+        self.assertEqual(self.client.models.generate_content.call_count, 1)
+
+    def test_gives_up_after_max_retries(self):
+        self.client.models.generate_content.side_effect = api_error(500)
+        with self.assertRaises(errors.APIError):
+            llm_client.generate_content("hi")
+        self.assertEqual(
+            self.client.models.generate_content.call_count,
+            llm_client.Config.LLM_MAX_RETRIES + 1
+        )
+
+    def test_latency_recorded(self):
+        self.client.models.generate_content.return_value = "ok"
+        calls_before = llm_client.stats.calls
+        llm_client.generate_content("hi")
+        snapshot = llm_client.stats.snapshot()
+        self.assertEqual(snapshot["calls"], calls_before + 1)
+        self.assertIsNotNone(snapshot["latency_seconds"]["p50"])
+
+    def test_stream_retries_before_first_chunk(self):
+        chunk = MagicMock(text="{}")
+        self.client.models.generate_content_stream.side_effect = [api_error(503), iter([chunk])]
+        self.assertEqual(list(llm_client.generate_content_stream("hi")), ["{}"])
+        self.assertEqual(self.client.models.generate_content_stream.call_count, 2)
+
+    def test_stream_not_replayed_after_first_chunk(self):
+        def broken_stream():
+            yield MagicMock(text='{"a"')
+            raise api_error(503)
+
+        self.client.models.generate_content_stream.return_value = broken_stream()
+        stream = llm_client.generate_content_stream("hi")
+        self.assertEqual(next(stream), '{"a"')
+        with self.assertRaises(errors.APIError):
+            next(stream)
+        self.assertEqual(self.client.models.generate_content_stream.call_count, 1)
+
+
+class TestSharedClient(unittest.TestCase):
+
+    def test_client_is_reused(self):
+        llm_client.reset_client()
+        with patch("google.genai.Client", side_effect=lambda **kw: object()) as ctor:
+            first = llm_client.get_client()
+            second = llm_client.get_client()
+        self.assertIs(first, second)
+        self.assertEqual(ctor.call_count, 1)
+        llm_client.reset_client()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import threading
+import time
+import unittest
+
+from app.ai_models.registry import ModelRegistry
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = ModelRegistry()
+        self.load_calls = 0
+        self.closed = []
+
+        def loader():
+            self.load_calls += 1
+            time.sleep(0.05)
+            return object()
+
+        self.registry.register("dummy", loader, closer=self.closed.append)
+
+    def test_lazy_until_first_get(self):
+        """Model is not loaded until someone asks for it"""
+        self.assertFalse(self.registry.is_loaded("dummy"))
+        self.assertEqual(self.load_calls, 0)
+        self.registry.get("dummy")
+        self.assertTrue(self.registry.is_loaded("dummy"))
+
+    def test_concurrent_get_loads_once(self):
+        """Concurrent first requests share a single instance"""
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.registry.get("dummy")))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(self.load_calls, 1)
+        self.assertEqual(len({id(r) for r in results}), 1)
+
+    def test_unload_calls_closer_and_allows_reload(self):
+        """unload() releases the model; the next get() loads a fresh copy"""
+        first = self.registry.get("dummy")
+        self.registry.unload("dummy")
+        self.assertEqual(self.closed, [first])
+        self.assertFalse(self.registry.is_loaded("dummy"))
+
+        self.registry.get("dummy")
+        self.assertEqual(self.load_calls, 2)
+
+    def test_unload_unknown_name_is_reported(self):
+        """unload() of an unregistered name does not raise"""
+        self.registry.get("dummy")
+        self.assertEqual(self.registry.unload("nope"), [])
+        self.assertTrue(self.registry.is_loaded("dummy"))
+        self.assertEqual(self.registry.unload(), ["dummy"])
+
+    def test_warm_up_reports_errors(self):
+        """warm_up() returns failures instead of raising"""
+        def broken():
+            raise RuntimeError("no model file")
+
+        self.registry.register("broken", broken)
+        errors = self.registry.warm_up()
+        self.assertIn("broken", errors)
+        self.assertTrue(self.registry.is_loaded("dummy"))
+
+    def test_stats_report_load_info(self):
+        self.registry.get("dummy")
+        stats = self.registry.stats()
+        self.assertTrue(stats["models"]["dummy"]["loaded"])
+        self.assertIn("load_seconds", stats["models"]["dummy"])
+
+    def test_background_warm_up(self):
+        """Warm-up runs off the calling thread and reports its progress"""
+        self.assertEqual(self.registry.warm_up_state()["status"], "disabled")
+        thread = self.registry.start_background_warm_up()
+        thread.join(timeout=5)
+        self.assertEqual(self.registry.warm_up_state()["status"], "done")
+        self.assertTrue(self.registry.is_loaded("dummy"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,26 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from PIL import Image
+from PIL import Image, ImageDraw
 import numpy as np
 import json
+import os
 import re
+import tempfile
+from io import BytesIO
+
+from flask import Flask
+from flask_jwt_extended import JWTManager
+
 import app.ai_models.ocr as ocr
+from app.models.database import db
+from app.routes.ocr import ocr_bp
 
 
 class TestOCRWhiteBox(unittest.TestCase):
 
+    def setUp(self):
+        ocr.ocr_cache.clear()
+
     # ---------- 1. preprocess_image ----------
     def test_preprocess_image_valid(self):
         """Statement + Branch: input gambar valid"""
@@ -28,6 +40,30 @@ class TestOCRWhiteBox(unittest.TestCase):
         with self.assertRaises(ValueError):
             ocr.preprocess_image(FakeImage())
 
+    def test_preprocess_image_downscales_large_photo(self):
+        """Sisi terpanjang dibatasi max_side, rasio dipertahankan"""
+        img = Image.new('RGB', (4000, 3000), color='white')
+        result = ocr.preprocess_image(img, max_side=1000, grayscale=True)
+        self.assertEqual(result.shape, (750, 1000))
+
+    def test_preprocess_image_applies_exif_rotation(self):
+        """Orientation EXIF 6 (rotasi 90°) diterapkan sebelum OCR"""
+        img = Image.new('RGB', (40, 20), color='white')
+        img.getexif()[0x0112] = 6
+        result = ocr.preprocess_image(img, max_side=0, grayscale=False)
+        self.assertEqual(result.shape, (40, 20, 3))
+
+    def test_crop_to_text(self):
+        """Crop ke area tulisan, dengan margin"""
+        img = Image.new('L', (200, 100), color=255)
+        img.paste(0, (50, 40, 100, 60))
+        cropped = ocr.crop_to_text(img, margin=0)
+        self.assertEqual(cropped.size, (50, 20))
+
+    def test_crop_to_text_blank_image(self):
+        img = Image.new('L', (50, 50), color=255)
+        self.assertEqual(ocr.crop_to_text(img).size, (50, 50))
+
     # ---------- 2. extract_text ----------
     @patch.object(ocr.reader, 'readtext', return_value=["Halo", "Dunia"])
     def test_extract_text_valid(self, mock_ocr):
@@ -85,5 +121,128 @@ class TestOCRWhiteBox(unittest.TestCase):
         self.assertIn("error", result)
 
 
+class TestOCRCache(unittest.TestCase):
+
+    def setUp(self):
+        ocr.ocr_cache.clear()
+        rng = np.random.default_rng(0)
+        self.page = (rng.random((60, 80)) * 255).astype(np.uint8)
+
+    @staticmethod
+    def text_page(lines):
+        """Gray page with the same layout (margins, line positions) for any text."""
+        page = Image.new('L', (320, 120), color=255)
+        draw = ImageDraw.Draw(page)
+        for i, line in enumerate(lines):
+            draw.text((10, 10 + 25 * i), line, fill=0)
+        return np.asarray(page)
+
+    def test_same_layout_different_text_is_not_a_hit(self):
+        """Dua halaman teks berbeda dengan tata letak sama tidak boleh berbagi hasil"""
+        first = self.text_page(["The meeting starts at nine.", "Bring your notes."])
+        second = self.text_page(["The lecture ends at eleven.", "Submit your essay."])
+        self.assertNotEqual(ocr.ocr_cache.image_digest(first), ocr.ocr_cache.image_digest(second))
+
+        responses = [json.dumps({"translation": "Rapat mulai jam sembilan."}),
+                     json.dumps({"translation": "Kuliah selesai jam sebelas."})]
+        with patch("app.ai_models.ocr.extract_text", side_effect=["meeting", "lecture"]) as mock_ext, \
+                patch("app.ai_models.ocr.query_gemini", side_effect=responses):
+            with patch("app.ai_models.ocr.preprocess_image", return_value=first):
+                ocr.process_image(Image.new('RGB', (10, 10)))
+            with patch("app.ai_models.ocr.preprocess_image", return_value=second):
+                result = ocr.process_image(Image.new('RGB', (10, 10)))
+        self.assertEqual(result, {"translation": "Kuliah selesai jam sebelas."})
+        self.assertEqual(mock_ext.call_count, 2)
+
+    @patch("app.ai_models.ocr.query_gemini", return_value=json.dumps({"translation": "OK"}))
+    def test_near_duplicate_reruns_ocr_and_reuses_matching_text(self, mock_query):
+        """Foto mirip dibaca ulang; hasil dipakai lagi hanya jika teksnya sama"""
+        brighter = np.clip(self.page.astype(int) + 3, 0, 255).astype(np.uint8)
+        with patch("app.ai_models.ocr.extract_text", return_value="Hello world") as mock_ext:
+            for page in (self.page, brighter):
+                with patch("app.ai_models.ocr.preprocess_image", return_value=page):
+                    ocr.process_image(Image.new('RGB', (10, 10)))
+        self.assertEqual(mock_ext.call_count, 2)
+        self.assertEqual(mock_query.call_count, 1)
+
+    @patch("app.ai_models.ocr.query_gemini", return_value=json.dumps({"translation": "OK"}))
+    @patch("app.ai_models.ocr.extract_text", return_value="Hello world")
+    def test_repeat_upload_skips_ocr_and_llm(self, mock_ext, mock_query):
+        with patch("app.ai_models.ocr.preprocess_image", return_value=self.page):
+            first = ocr.process_image(Image.new('RGB', (10, 10)))
+            second = ocr.process_image(Image.new('RGB', (10, 10)))
+        self.assertEqual(first, second)
+        self.assertEqual(mock_ext.call_count, 1)
+        self.assertEqual(mock_query.call_count, 1)
+
+    @patch("app.ai_models.ocr.query_gemini", return_value=json.dumps({"translation": "OK"}))
+    def test_same_text_different_photo_skips_llm(self, mock_query):
+        text_hits = ocr.ocr_cache.stats()["text"]["hits"]
+        with patch("app.ai_models.ocr.extract_text", side_effect=["Hello  world", "hello world"]):
+            with patch("app.ai_models.ocr.preprocess_image", return_value=self.page):
+                ocr.process_image(Image.new('RGB', (10, 10)))
+            with patch("app.ai_models.ocr.preprocess_image", return_value=np.flipud(self.page)):
+                result = ocr.process_image(Image.new('RGB', (10, 10)))
+        self.assertEqual(result, {"translation": "OK"})
+        self.assertEqual(mock_query.call_count, 1)
+        self.assertEqual(ocr.ocr_cache.stats()["text"]["hits"], text_hits + 1)
+
+    @patch("app.ai_models.ocr.query_gemini", return_value="{invalid json}")
+    @patch("app.ai_models.ocr.extract_text", return_value="Hello world")
+    def test_errors_are_not_cached(self, mock_ext, mock_query):
+        with patch("app.ai_models.ocr.preprocess_image", return_value=self.page):
+            ocr.process_image(Image.new('RGB', (10, 10)))
+            ocr.process_image(Image.new('RGB', (10, 10)))
+        self.assertEqual(mock_query.call_count, 2)
+
+
+class TestOCRStreaming(unittest.TestCase):
+
+    def setUp(self):
+        ocr.ocr_cache.clear()
+        self.page = (np.random.default_rng(1).random((60, 80)) * 255).astype(np.uint8)
+        response = json.dumps({
+            "translation": "Good morning",
+            "sentence_analysis": [{"sentence": "Good morning", "grammar_point": "greeting", "explanation": "-"}]
+        })
+        self.chunks = [response[i:i + 7] for i in range(0, len(response), 7)]
+
+    def test_events_arrive_in_pipeline_order(self):
+        with patch("app.ai_models.ocr.preprocess_image", return_value=self.page), \
+                patch("app.ai_models.ocr.extract_text", return_value="Selamat pagi"), \
+                patch("app.ai_models.ocr.query_gemini_stream", return_value=iter(self.chunks)):
+            events = list(ocr.stream_process_image(Image.new('RGB', (10, 10))))
+
+        self.assertEqual([e for e, _ in events], ["ocr", "translation", "sentence", "result"])
+        self.assertEqual(events[0][1], {"text": "Selamat pagi"})
+        self.assertEqual(events[-1][1]["translation"], "Good morning")
+
+    def test_sse_endpoint(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        app = Flask(__name__)
+        app.config.update(SQLALCHEMY_DATABASE_URI='sqlite:///' + os.path.join(tmp.name, 'ocr.db'),
+                          JWT_SECRET_KEY='test-secret-key-with-enough-length')
+        db.init_app(app)
+        JWTManager(app)
+        app.register_blueprint(ocr_bp)
+
+        upload = BytesIO()
+        Image.new('RGB', (10, 10)).save(upload, 'PNG')
+        upload.seek(0)
+        with patch("app.ai_models.ocr.preprocess_image", return_value=self.page), \
+                patch("app.ai_models.ocr.extract_text", return_value="Selamat pagi"), \
+                patch("app.ai_models.ocr.query_gemini_stream", return_value=iter(self.chunks)):
+            response = app.test_client().post('/api/ocr/translate/stream',
+                                              data={'image': (upload, 'page.png')})
+            body = response.get_data(as_text=True)
+
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        names = [line[len('event: '):] for line in body.splitlines() if line.startswith('event: ')]
+        self.assertEqual(names, ["ocr", "translation", "sentence", "done"])
+        with app.app_context():
+            db.engine.dispose()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,78 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.ai_models.ocr_engine import OCREngine, group_for_batching, pad_to_common_size
+
+
+class TestBatchingHelpers(unittest.TestCase):
+
+    def test_pad_to_common_size(self):
+        padded = pad_to_common_size([np.zeros((10, 20), np.uint8), np.zeros((15, 5, 3), np.uint8)])
+        self.assertEqual([p.shape for p in padded], [(15, 20, 3), (15, 20, 3)])
+        self.assertEqual(padded[0][14, 19, 0], 255)
+
+    def test_similar_sizes_are_grouped(self):
+        """Very different sizes are not padded into the same batch"""
+        images = [np.zeros((100, 100)), np.zeros((1000, 1000)), np.zeros((98, 100)), np.zeros((990, 1000))]
+        groups = group_for_batching(images)
+        self.assertEqual(sorted(sorted(g) for g in groups), [[0, 2], [1, 3]])
+
+
+class TestOCREngine(unittest.TestCase):
+
+    def setUp(self):
+        self.batches = []
+        self.release = threading.Event()
+
+        def fake_batch(images):
+            self.release.wait(5)
+            self.batches.append(len(images))
+            return [[f"text-{int(image[0, 0])}"] for image in images], {'inference': 0.01}
+
+        self.engine = OCREngine(
+            workers=1, max_batch=4, batch_wait=0.01,
+            executor_factory=lambda: ThreadPoolExecutor(max_workers=1),
+            batch_fn=fake_batch
+        )
+        self.addCleanup(self.engine.shutdown)
+
+    def test_results_match_inputs(self):
+        self.release.set()
+        futures = [self.engine.submit(np.full((8, 8), i, np.uint8)) for i in range(6)]
+        self.assertEqual([f.result(5) for f in futures], [[f"text-{i}"] for i in range(6)])
+
+    def test_requests_are_batched_while_worker_is_busy(self):
+        """While the only worker is busy, queued images go out as one batch"""
+        first = self.engine.submit(np.zeros((8, 8), np.uint8))
+        deadline = time.time() + 5
+        while self.engine.stats()['in_flight_batches'] == 0 and time.time() < deadline:
+            time.sleep(0.005)
+        rest = [self.engine.submit(np.full((8, 8), i, np.uint8)) for i in range(1, 5)]
+        self.release.set()
+        first.result(5)
+        [f.result(5) for f in rest]
+
+        self.assertEqual(self.batches, [1, 4])
+        stats = self.engine.stats()
+        self.assertEqual(stats['images'], 5)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertIn('queue_wait', stats['timings_seconds'])
+
+    def test_batch_errors_reach_every_caller(self):
+        engine = OCREngine(
+            workers=1, max_batch=4, batch_wait=0.01,
+            executor_factory=lambda: ThreadPoolExecutor(max_workers=1),
+            batch_fn=lambda images: 1 / 0
+        )
+        self.addCleanup(engine.shutdown)
+        with self.assertRaises(ZeroDivisionError):
+            engine.readtext(np.zeros((8, 8), np.uint8), timeout=5)
+        self.assertEqual(engine.stats()['errors'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import threading
+import unittest
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.models.database import Lesson, UserLessonProgress, db
+from app.models.migrations import dedupe_lesson_progress, ensure_indexes
+from app.routes.learning import learning_bp
+from tests.helpers import AppTestCase
+
+
+class TestLessonProgress(AppTestCase):
+    blueprints = (learning_bp,)
+
+    def seed(self):
+        db.session.add_all([Lesson(id=f'l{i}', title=f'Lesson {i}') for i in range(3)])
+
+    def progress_rows(self):
+        with self.app.app_context():
+            return [(p.lesson_id, p.is_completed)
+                    for p in UserLessonProgress.query.order_by(UserLessonProgress.lesson_id).all()]
+
+    def test_concurrent_updates_leave_one_row(self):
+        def tap(completed):
+            self.app.test_client().post('/api/learning/progress', headers=self.headers,
+                                        json={'lesson_id': 'l0', 'is_completed': completed})
+
+        threads = [threading.Thread(target=tap, args=(True,)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        tap(False)
+        self.assertEqual(self.progress_rows(), [('l0', False)])
+
+    def test_sync_upserts_batch_and_skips_unknown_lessons(self):
+        client = self.app.test_client()
+        client.post('/api/learning/progress', headers=self.headers, json={'lesson_id': 'l1', 'is_completed': False})
+
+        response = client.post('/api/learning/progress/sync', headers=self.headers, json={'progress': [
+            {'lesson_id': 'l0', 'is_completed': False},
+            {'lesson_id': 'l1'},
+            {'lesson_id': 'nope'},
+            {'lesson_id': 'l0', 'is_completed': True},  # later entry wins
+        ]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['skipped'], ['nope'])
+        self.assertEqual(self.progress_rows(), [('l0', True), ('l1', True)])
+
+        bad = client.post('/api/learning/progress/sync', headers=self.headers, json={'progress': [{}]})
+        self.assertEqual(bad.status_code, 400)
+
+    def test_migration_dedupes_before_adding_unique_index(self):
+        with self.app.app_context():
+            # An existing database from before the constraint
+            db.session.execute(text('DROP INDEX uq_user_lesson_progress_user_lesson'))
+            db.session.add_all([
+                UserLessonProgress(user_id=1, lesson_id='l0', is_completed=True,
+                                   last_accessed_at=datetime(2025, 1, 1)),
+                UserLessonProgress(user_id=1, lesson_id='l0', is_completed=False,
+                                   last_accessed_at=datetime(2025, 2, 1)),
+            ])
+            db.session.commit()
+
+            self.assertEqual(dedupe_lesson_progress(db.session), 1)
+            self.assertEqual(ensure_indexes(db.engine), ['uq_user_lesson_progress_user_lesson'])
+
+            row = UserLessonProgress.query.one()
+            self.assertTrue(row.is_completed)
+            self.assertEqual(row.last_accessed_at, datetime(2025, 2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from app.models.database import TestAnswer, TestQuestion, TestSession, db
+from app.routes.test import test_bp
+from app.utils import question_sampler
+from app.utils.cache import Cache, SQLiteBackend
+from config import Config
+from tests.helpers import AppTestCase
+
+
+class TestQuestionSampler(AppTestCase):
+    blueprints = (test_bp,)
+
+    def setUp(self):
+        super().setUp()
+        question_sampler.invalidate()
+
+    def seed(self):
+        for i in range(12):
+            db.session.add(TestQuestion(id=i + 1, section='Speaking', task_type=f'Part {i % 2 + 1}', prompt='s'))
+            db.session.add(TestQuestion(id=i + 101, section='Writing', task_type='Task 2', prompt='w'))
+
+    def start(self, **body):
+        response, statements = self.run_recording_sql(self.client.post, '/api/test/practice/start',
+                                                      json=body, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()['questions'], statements
+
+    def test_practice_start_samples_without_order_by_random(self):
+        questions, statements = self.start()
+        sections = sorted(q['section'] for q in questions)
+        self.assertEqual(sections, ['Speaking'] * 5 + ['Writing'] * 5)
+        self.assertEqual(len({q['question_id'] for q in questions}), 10)
+        self.assertFalse([s for s in statements if 'random()' in s])
+
+    def test_recently_seen_questions_are_avoided(self):
+        with self.app.app_context():
+            seen = list(range(1, 8)) + list(range(101, 108))
+            session = TestSession(user_id=1, total_score=0, ai_feedback='{}')
+            session.test_answers = [TestAnswer(section='Speaking', task_type='Practice',
+                                               combined_question_ids=json.dumps([qid]), user_inputs='[]',
+                                               ai_feedback='{}', score=1)
+                                    for qid in seen]
+            db.session.add(session)
+            db.session.commit()
+
+        questions, _ = self.start()
+        self.assertFalse({q['question_id'] for q in questions} & set(seen))
+
+        questions, _ = self.start(avoid_recent=False)
+        self.assertEqual(len(questions), 10)
+
+    def test_questions_deleted_behind_the_index_are_redrawn(self):
+        self.start()  # builds the sampler index
+        with self.app.app_context():
+            # Deleted without invalidate(), as by manual SQL
+            TestQuestion.query.filter(TestQuestion.id.in_(range(1, 6))).delete()
+            db.session.commit()
+
+        questions, _ = self.start(avoid_recent=False)
+        self.assertEqual(len(questions), 10)
+        self.assertFalse({q['question_id'] for q in questions} & set(range(1, 6)))
+
+        with patch.object(question_sampler, 'fetch', return_value=[]):
+            response = self.client.post('/api/test/practice/start', json={}, headers=self.headers)
+        self.assertEqual(response.status_code, 503)
+
+    def test_section_and_bank_pools_are_built_with_the_index(self):
+        with self.app.app_context():
+            self.assertEqual(sorted(question_sampler.question_ids('Speaking')), list(range(1, 13)))
+            self.assertEqual(len(question_sampler.question_ids()), 24)
+            # Served straight from the index, not flattened per call
+            self.assertIs(question_sampler.question_ids('speaking'), question_sampler.question_ids('SPEAKING'))
+            self.assertIs(question_sampler.question_ids(), question_sampler.question_ids(task_type='part 1'))
+            self.assertEqual(len(question_sampler.sample_ids(k=30)), 24)
+
+    def test_task_type_pools_and_invalidate(self):
+        with self.app.app_context():
+            self.assertEqual(sorted(question_sampler.question_ids('speaking', 'part 1')), [1, 3, 5, 7, 9, 11])
+            self.assertEqual(question_sampler.sample_ids('listening', 3), [])
+
+            db.session.add(TestQuestion(id=500, section='Listening', task_type='Part 1', prompt='l'))
+            db.session.commit()
+            self.assertEqual(question_sampler.question_ids('listening'), [])  # index not refreshed yet
+            question_sampler.invalidate()
+            self.assertEqual(question_sampler.sample_ids('listening', 3), [500])
+
+    def test_invalidate_in_another_process_refreshes_this_one(self):
+        with self.app.app_context():
+            self.assertEqual(question_sampler.question_ids('listening'), [])
+            db.session.add(TestQuestion(id=500, section='Listening', task_type='Part 1', prompt='l'))
+            db.session.commit()
+
+            # Another worker's invalidate(), through its own connection to the shared store
+            self.assertEqual(question_sampler._versions.backend_name, 'sqlite')
+            Cache('question_sampler', SQLiteBackend(Config.CACHE_SQLITE_PATH), 'sqlite').set('version', 'other')
+            self.assertEqual(question_sampler.question_ids('listening'), [500])
+
+
+if __name__ == "__main__":
+    unittest.main()
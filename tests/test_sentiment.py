@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.utils import sentiment_analyzer
+from app.utils.sentiment_analyzer import LexiconClassifier, RemoteSentimentClient
+
+
+class TestLexiconClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.classifier = LexiconClassifier()
+
+    def test_english_and_indonesian(self):
+        self.assertEqual(self.classifier.predict_one("I love this app, it is so helpful!"), "Positive")
+        self.assertEqual(self.classifier.predict_one("Aplikasinya lemot dan sering error"), "Negative")
+        self.assertEqual(self.classifier.predict_one("Hello!!"), "Neutral")
+
+    def test_negation(self):
+        self.assertEqual(self.classifier.predict_one("tidak bagus"), "Negative")
+        self.assertEqual(self.classifier.predict_one("not bad at all"), "Positive")
+
+
+class TestAnalyzeSentiment(unittest.TestCase):
+
+    def setUp(self):
+        self.remote = RemoteSentimentClient("test/space")
+        patcher = patch.object(sentiment_analyzer, "remote", self.remote)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = MagicMock()
+        self.remote._client = self.client
+
+    def test_client_is_reused(self):
+        self.client.submit.return_value.result.return_value = {"sentiment": "positive", "confidence": 0.9}
+        self.assertEqual(sentiment_analyzer.analyze_sentiment("great"), "Positive")
+        self.assertEqual(sentiment_analyzer.analyze_sentiment("great"), "Positive")
+        self.assertEqual(self.client.submit.call_count, 2)
+        self.assertEqual(self.remote.connects, 0)
+
+    def test_timeout_falls_back_to_local_and_skips_remote(self):
+        """A slow Space is cancelled; the local classifier answers, and the Space is skipped for a while"""
+        job = self.client.submit.return_value
+        job.result.side_effect = TimeoutError()
+        fallbacks = sentiment_analyzer.stats()["fallbacks"]
+
+        self.assertEqual(sentiment_analyzer.analyze_sentiment("jelek sekali"), "Negative")
+        job.cancel.assert_called_once()
+        self.assertFalse(self.remote.available())
+        self.assertIsNone(self.remote._client)
+
+        sentiment_analyzer.analyze_sentiment("bagus")
+        self.assertEqual(self.client.submit.call_count, 1)
+        self.assertEqual(sentiment_analyzer.stats()["fallbacks"], fallbacks + 2)
+
+    def test_failed_health_check_falls_back_without_predicting(self):
+        """After the retry window the Space is probed first; a failed handshake skips it again"""
+        self.remote._client = None
+        gradio_client = MagicMock()
+        gradio_client.Client.side_effect = ConnectionError("Space is sleeping")
+        with patch.dict("sys.modules", {"gradio_client": gradio_client}):
+            self.assertEqual(sentiment_analyzer.analyze_sentiment("bagus"), "Positive")
+            self.assertEqual(self.remote.failures, 1)
+            self.assertFalse(self.remote.available())
+
+            sentiment_analyzer.analyze_sentiment("bagus")
+        self.assertEqual(gradio_client.Client.call_count, 1)
+        self.client.submit.assert_not_called()
+
+    def test_local_backend_never_calls_remote(self):
+        with patch.object(sentiment_analyzer.Config, "SENTIMENT_BACKEND", "local"):
+            self.assertEqual(sentiment_analyzer.analyze_sentiment("mantap"), "Positive")
+        self.client.submit.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
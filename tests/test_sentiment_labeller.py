@@ -0,0 +1,68 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from app.models.database import UserFeedback, db
+from app.routes.feedback import feedback_bp
+from app.utils import sentiment_labeller
+from tests.helpers import AppTestCase
+
+
+class TestSentimentLabeller(AppTestCase):
+    blueprints = (feedback_bp,)
+
+    def setUp(self):
+        super().setUp()
+        sentiment_labeller.init_app(self.app)
+
+    def test_submit_does_not_wait_for_the_model(self):
+        """The row is saved as Pending; the labeller fills in the label afterwards"""
+        with patch.object(sentiment_labeller, 'analyze_sentiment', return_value='Positive'):
+            response = self.app.test_client().post('/api/feedback', json={'feedback_text': 'Mantap!'},
+                                                   headers=self.headers)
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.get_json()['sentiment'], 'Pending')
+
+            deadline = time.time() + 5
+            with self.app.app_context():
+                while time.time() < deadline:
+                    db.session.expire_all()
+                    if UserFeedback.query.first().sentiment != 'Pending':
+                        break
+                    time.sleep(0.05)
+                self.assertEqual(UserFeedback.query.first().sentiment, 'Positive')
+
+    def test_start_labels_rows_left_pending(self):
+        """Rows saved before a restart are labelled without a new submission"""
+        with self.app.app_context():
+            for i in range(3):
+                db.session.add(UserFeedback(user_id=1, feedback_text=f'left over {i}', sentiment='Pending'))
+            db.session.commit()
+
+            with patch.object(sentiment_labeller, 'analyze_sentiment', return_value='Neutral'):
+                sentiment_labeller.start()
+                deadline = time.time() + 5
+                while time.time() < deadline:
+                    db.session.expire_all()
+                    if not UserFeedback.query.filter_by(sentiment='Pending').count():
+                        break
+                    time.sleep(0.05)
+            self.assertEqual({row.sentiment for row in UserFeedback.query.all()}, {'Neutral'})
+
+    def test_backfill_batches_and_skips_rows_still_unknown(self):
+        with self.app.app_context():
+            for i in range(5):
+                db.session.add(UserFeedback(user_id=1, feedback_text=f'text {i}', sentiment='Unknown'))
+            db.session.commit()
+
+            with patch.object(sentiment_labeller, 'analyze_sentiment', return_value='Unknown') as model:
+                first = sentiment_labeller.label_batch(status='Unknown', batch_size=3)
+                second = sentiment_labeller.label_batch(status='Unknown', batch_size=3, after_id=first[-1][0])
+                third = sentiment_labeller.label_batch(status='Unknown', batch_size=3, after_id=second[-1][0])
+
+            self.assertEqual((len(first), len(second), third), (3, 2, []))
+            self.assertEqual(model.call_count, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
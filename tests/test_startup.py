@@ -0,0 +1,114 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous default so slow CI machines pass; heavy model imports take several seconds
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", 3))
+
+HEAVY_MODULES = [
+    "torch", "easyocr", "gradio", "gradio_client",
+    "sentence_transformers", "language_tool_python", "google.genai",
+]
+
+SCRIPT = """
+import json, sys, threading, time
+start = time.perf_counter()
+import app
+app.initialize_firebase = lambda: None
+flask_app = app.create_app()
+elapsed = time.perf_counter() - start
+client = flask_app.test_client()
+health = client.get('/api/health').get_json()
+metrics = [client.get('/api/metrics').status_code,
+           client.get('/api/metrics', headers={'X-Metrics-Token': 'metrics-token'}).status_code]
+print(json.dumps({
+    'seconds': elapsed,
+    'loaded': [m for m in %r if m in sys.modules],
+    'health': health,
+    'metrics': metrics,
+    'threads': [t.name for t in threading.enumerate()],
+}))
+""" % (HEAVY_MODULES,)
+
+
+class TestStartup(unittest.TestCase):
+    """create_app() must not import or load any AI model"""
+
+    @classmethod
+    def setUpClass(cls):
+        env = dict(os.environ, DATABASE_URL="sqlite://", JWT_SECRET_KEY="test-secret", WARMUP_MODELS="",
+                   METRICS_TOKEN="metrics-token", METRICS_PUBLIC="false")
+        out = subprocess.run(
+            [sys.executable, "-c", SCRIPT], cwd=ROOT, env=env,
+            capture_output=True, text=True, timeout=120
+        )
+        if out.returncode != 0:
+            raise AssertionError(out.stderr)
+        cls.result = json.loads(out.stdout.strip().splitlines()[-1])
+
+    def test_no_heavy_imports(self):
+        self.assertEqual(self.result["loaded"], [])
+
+    def test_startup_time_budget(self):
+        self.assertLess(self.result["seconds"], STARTUP_BUDGET_SECONDS)
+
+    def test_ocr_pipeline_is_importable_without_gradio(self):
+        """The API imports the OCR pipeline; only ocr_demo needs gradio"""
+        script = "import sys, app.ai_models.ocr; print('gradio' in sys.modules or 'easyocr' in sys.modules)"
+        out = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, timeout=120)
+        self.assertEqual(out.stdout.strip(), "False", out.stderr)
+
+    def test_no_background_threads(self):
+        """Job workers and the labeller start from the server entry points only"""
+        threads = self.result["threads"]
+        self.assertFalse([t for t in threads if t.startswith(("job-", "sentiment-labeller"))], threads)
+
+    def test_health_reports_subsystems(self):
+        subsystems = self.result["health"]["subsystems"]
+        self.assertEqual(subsystems["database"], "ready")
+        self.assertEqual(subsystems["models"]["embedder"], "not_loaded")
+        self.assertEqual(subsystems["warm_up"]["status"], "disabled")
+
+    def test_metrics_need_token_or_admin(self):
+        self.assertEqual(self.result["metrics"], [401, 200])
+
+
+class TestServerEntryPoints(unittest.TestCase):
+    """Spawned children (OCR pool workers) must not build an app or start services"""
+
+    def test_app_py_builds_no_app_when_reimported(self):
+        # A spawn child re-imports the parent's main module as __mp_main__
+        script = ("import runpy, sys, app\n"
+                  "app.create_app = lambda: sys.exit(3)\n"
+                  "runpy.run_path('app.py', run_name='__mp_main__')\n"
+                  "print('ok')")
+        out = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, timeout=120,
+                             env=dict(os.environ, DATABASE_URL="sqlite://", JWT_SECRET_KEY="test-secret"))
+        self.assertEqual(out.stdout.strip(), "ok", out.stderr)
+
+    def test_background_services_skip_child_processes(self):
+        import app
+        with patch.object(app.Config, 'JOB_WORKERS_AUTOSTART', True), \
+                patch.object(app.Config, 'SENTIMENT_LABEL_ON_START', True), \
+                patch.object(app.Config, 'WARMUP_MODELS', 'all'), \
+                patch.object(app.jobs, 'start_workers') as start_workers, \
+                patch.object(app.sentiment_labeller, 'start') as start_labeller, \
+                patch.object(app.registry, 'start_background_warm_up') as warm_up:
+            with patch('multiprocessing.parent_process', return_value=object()):
+                app.start_background_services()
+            self.assertFalse(start_workers.called or start_labeller.called or warm_up.called)
+
+            with patch.object(app.Config, 'WARMUP_MODELS', ''):
+                app.start_background_services()
+            start_workers.assert_called_once()
+            start_labeller.assert_called_once()
+            warm_up.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
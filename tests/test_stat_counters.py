@@ -0,0 +1,119 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from app.models.database import StatCounter, StatCounterDelta, User, UserFeedback, db
+from app.utils import stat_counters
+from tests.helpers import AppTestCase
+
+
+class TestStatCounters(AppTestCase):
+    push_context = True
+
+    def setUp(self):
+        super().setUp()
+        stat_counters.reconcile()
+
+    def counters(self):
+        return stat_counters.current_values()
+
+    def test_insert_update_delete_keep_counters_exact(self):
+        db.session.add(User(id=2, username='u2', email='u2@example.com'))
+        feedback = [UserFeedback(user_id=1, feedback_text=f't{i}', sentiment='Pending') for i in range(3)]
+        db.session.add_all(feedback)
+        db.session.commit()
+
+        feedback[0].sentiment = 'Positive'
+        db.session.commit()
+        db.session.delete(feedback[1])
+        db.session.commit()
+
+        counters = self.counters()
+        self.assertEqual(counters['users'], 2)
+        self.assertEqual(counters['feedback'], 2)
+        self.assertEqual(counters['sentiment:Pending'], 1)
+        self.assertEqual(stat_counters.sentiment_counts(counters), {'Pending': 1, 'Positive': 1})
+
+    def test_rollback_discards_increments(self):
+        db.session.add(User(id=3, username='u3', email='u3@example.com'))
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(self.counters()['users'], 1)
+
+    def test_reconcile_fixes_drift_from_bulk_writes(self):
+        db.session.add(UserFeedback(user_id=1, feedback_text='t', sentiment='Negative'))
+        db.session.commit()
+        UserFeedback.query.delete()  # bypasses the ORM events
+        db.session.commit()
+        self.assertEqual(self.counters()['feedback'], 1)
+
+        stat_counters.reconcile()
+        counters = self.counters()
+        self.assertEqual(counters['feedback'], 0)
+        self.assertEqual(counters['sentiment:Negative'], 0)
+
+    def test_writers_append_deltas_instead_of_updating_counter_rows(self):
+        base = {c.name: c.value for c in StatCounter.query.all()}
+        deltas = StatCounterDelta.query.count()
+        for i in range(3):
+            db.session.add(User(id=10 + i, username=f'w{i}', email=f'w{i}@example.com'))
+            db.session.commit()
+
+        self.assertEqual({c.name: c.value for c in StatCounter.query.all()}, base)
+        self.assertEqual(StatCounterDelta.query.count(), deltas + 3)
+        self.assertEqual(self.counters()['users'], 4)
+
+        self.assertEqual(stat_counters.compact(), deltas + 3)
+        self.assertEqual(StatCounterDelta.query.count(), 0)
+        self.assertEqual(StatCounter.query.get('users').value, 4)
+        self.assertEqual(self.counters()['users'], 4)
+
+    def test_reconcile_keeps_increments_committed_while_it_runs(self):
+        db.session.add(UserFeedback(user_id=1, feedback_text='t', sentiment='Negative'))
+        db.session.commit()
+        UserFeedback.query.delete()  # drift: the counter still says 1
+        db.session.commit()
+
+        original = stat_counters.snapshot
+
+        def snapshot_then_concurrent_write(names):
+            snap = original(names)
+            other = db.session.session_factory()
+            other.add(UserFeedback(user_id=1, feedback_text='new', sentiment='Positive'))
+            other.commit()
+            other.close()
+            return snap
+
+        with patch.object(stat_counters, 'snapshot', snapshot_then_concurrent_write):
+            stat_counters.reconcile()
+
+        counters = self.counters()
+        self.assertEqual(counters['feedback'], 1)
+        self.assertEqual(counters['sentiment:Negative'], 0)
+        self.assertEqual(counters['sentiment:Positive'], 1)
+
+    def test_correction_is_applied_once(self):
+        """A second reconciler working from the same snapshot backs off (compare-and-set)"""
+        db.session.add(UserFeedback(user_id=1, feedback_text='t', sentiment='Neutral'))
+        db.session.commit()
+        UserFeedback.query.delete()
+        db.session.commit()
+
+        snap = stat_counters.snapshot(stat_counters.counter_names())
+        self.assertEqual(stat_counters.apply_corrections(snap), [])
+        self.assertEqual(sorted(stat_counters.apply_corrections(snap)), ['feedback', 'sentiment:Neutral'])
+        self.assertEqual(self.counters()['feedback'], 0)
+
+    def test_bulk_statements_schedule_a_reconcile(self):
+        stat_counters._last_reconcile = time.time()
+        UserFeedback.query.filter_by(user_id=99).delete()
+        self.assertEqual(stat_counters._last_reconcile, 0)
+
+    def test_missing_counters_are_computed_on_read(self):
+        StatCounter.query.delete()
+        db.session.commit()
+        self.assertEqual(stat_counters.read_counters()['users'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
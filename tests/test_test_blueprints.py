@@ -0,0 +1,162 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from app.models.database import TestQuestion, TestSession, db
+from app.routes.test import test_bp
+from app.utils import question_sampler, test_blueprints
+from tests.helpers import AppTestCase
+
+TOEFL_LAYOUT = [('speaking', 'independent'), ('speaking', 'integrated'), ('speaking', 'integrated'),
+                ('speaking', 'integrated'), ('writing', 'integrated'), ('writing', 'independent')]
+
+
+class TestTestBlueprints(AppTestCase):
+    blueprints = (test_bp,)
+
+    def setUp(self):
+        super().setUp()
+        question_sampler.invalidate()
+        test_blueprints._blueprints = None
+
+    def seed(self):
+        # A bank far larger than one test, mixing both layouts
+        qid = 0
+        for section, task_type in set(TOEFL_LAYOUT) | {('Speaking', 'Part 1'), ('Speaking', 'Part 2'),
+                                                       ('Writing', 'Task 2')}:
+            for _ in range(50):
+                qid += 1
+                db.session.add(TestQuestion(id=qid, section=section, task_type=task_type,
+                                            prompt=f'{section} {task_type}'))
+
+    def tearDown(self):
+        test_blueprints._blueprints = None
+        super().tearDown()
+
+    def start(self, **body):
+        return self.run_recording_sql(self.client.post, '/api/test/start', json=body, headers=self.headers)
+
+    def submit(self, session_id, tasks):
+        task_answers = [{'task_id': t['task_id'], 'section': t['section'], 'task_type': t['task_type'],
+                         'answers': [{'question_id': q['question_id'], 'answer': 'my answer'}
+                                     for q in t['questions']]}
+                        for t in tasks]
+        results = [{'score': 6, 'feedback': []} for _ in tasks]
+        with patch('app.ai_models.gemini.evaluate_many', return_value=results):
+            return self.client.post('/api/test/submit', json={'session_id': session_id, 'task_answers': task_answers},
+                                    headers=self.headers)
+
+    def test_toefl_blueprint_keeps_toefl_layout_on_a_large_bank(self):
+        response, statements = self.start(blueprint='toefl_ibt')
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        tasks = body['tasks']
+        self.assertEqual([(t['section'], t['task_type']) for t in tasks], TOEFL_LAYOUT)
+        self.assertEqual([t['task_id'] for t in tasks], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(len({t['question_id'] for t in tasks}), 6)
+        self.assertEqual(body['test_info']['task_breakdown'], {'speaking_tasks': 4, 'writing_tasks': 2})
+
+        # Question rows come from a single IN query, never from loading the whole table
+        full_rows = [s for s in statements if 'from test_questions' in s and 'test_questions.prompt' in s]
+        self.assertEqual(len(full_rows), 1)
+        self.assertIn('test_questions.id in (', full_rows[0])
+
+        response = self.submit(body['session_id'], tasks)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        self.assertEqual(response.get_json()['test_results']['total_tasks_evaluated'], 6)
+
+    def test_default_ielts_blueprint_with_multi_question_task(self):
+        response, _ = self.start()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['test_info']['blueprint'], 'ielts')
+        tasks = response.get_json()['tasks']
+        self.assertEqual([(t['section'], t['task_type'], len(t['questions'])) for t in tasks],
+                         [('Speaking', 'Part 1', 3), ('Speaking', 'Part 2', 1), ('Writing', 'Task 2', 1)])
+
+        session_id = response.get_json()['session_id']
+        # The stored blueprint drives validation: a TOEFL-shaped submission is rejected
+        wrong = [{'task_id': i + 1, 'section': s, 'task_type': t, 'questions': [{'question_id': 1}]}
+                 for i, (s, t) in enumerate(TOEFL_LAYOUT[:3])]
+        self.assertEqual(self.submit(session_id, wrong).status_code, 400)
+
+        response = self.submit(session_id, tasks)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        with self.app.app_context():
+            feedback = json.loads(db.session.get(TestSession, session_id).ai_feedback)
+        self.assertEqual(feedback['blueprint'], 'ielts')
+        self.assertEqual(feedback['detailed_feedback'][0]['question_count'], 3)
+
+        # A resubmission is still validated against the IELTS tasks
+        self.assertEqual(self.submit(session_id, wrong).status_code, 400)
+        self.assertEqual(self.submit(session_id, tasks).status_code, 200)
+
+    def test_answers_must_match_the_assigned_questions(self):
+        response, _ = self.start()
+        body = response.get_json()
+        tasks = body['tasks']
+        other = next(qid for qid in range(1, 400) if qid not in {q['question_id'] for t in tasks for q in t['questions']})
+
+        swapped = [dict(t, questions=list(t['questions'])) for t in tasks]
+        swapped[1]['questions'][0] = {'question_id': other}
+        response = self.submit(body['session_id'], swapped)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('not assigned', response.get_json()['error'])
+
+        # Ids may arrive as numeric strings
+        as_strings = [dict(t, questions=[{'question_id': str(q['question_id'])} for q in t['questions']])
+                      for t in tasks]
+        self.assertEqual(self.submit(body['session_id'], as_strings).status_code, 200)
+
+    def test_unknown_blueprint_and_small_bank(self):
+        response, _ = self.start(blueprint='nope')
+        self.assertEqual(response.status_code, 400)
+
+        with patch.object(test_blueprints.Config, 'TEST_BLUEPRINTS', json.dumps({
+                'huge': {'slots': [{'section': 'Writing', 'task_type': 'Task 2', 'count': 51}]}})):
+            test_blueprints._blueprints = None
+            response, _ = self.start(blueprint='huge')
+        self.assertEqual(response.status_code, 500)
+        self.assertIn('Found 50', response.get_json()['error'])
+
+    def test_questions_deleted_behind_the_index_are_redrawn(self):
+        self.start()  # builds the sampler index
+        with self.app.app_context():
+            writing = [q.id for q in TestQuestion.query.filter_by(section='Writing', task_type='Task 2')]
+            # Deleted without invalidate(), as by another worker or manual SQL
+            TestQuestion.query.filter(TestQuestion.id.in_(writing[1:])).delete()
+            db.session.commit()
+
+        response, _ = self.start(avoid_recent=False)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        self.assertEqual(response.get_json()['tasks'][2]['question_id'], writing[0])
+
+        with patch.object(question_sampler, 'fetch', return_value=[]):
+            response, _ = self.start()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('try again', response.get_json()['error'])
+
+    def test_legacy_session_falls_back_to_toefl_layout(self):
+        response, _ = self.start(blueprint='toefl_ibt')
+        tasks = response.get_json()['tasks']
+        with self.app.app_context():
+            session = TestSession(user_id=1, total_score=0.0, ai_feedback='TOEFL iBT test in progress')
+            db.session.add(session)
+            db.session.commit()
+            session_id = session.id
+        self.assertEqual(self.submit(session_id, tasks).status_code, 200)
+        self.assertEqual(self.submit(session_id, tasks[:5]).status_code, 400)
+
+    def test_overrides_are_validated(self):
+        overrides = json.dumps({
+            'speaking_only': {'title': 'Speaking', 'slots': [{'section': 'Speaking', 'task_type': 'Part 2'}]},
+            'broken': {'slots': [{'section': 'Speaking', 'count': 0}]},
+        })
+        with patch.object(test_blueprints.Config, 'TEST_BLUEPRINTS', overrides):
+            blueprints = test_blueprints.load_blueprints()
+        self.assertEqual(set(blueprints), {'toefl_ibt', 'ielts', 'speaking_only'})
+        self.assertEqual(blueprints['speaking_only']['slots'],
+                         [{'task_id': 1, 'section': 'Speaking', 'task_type': 'Part 2', 'count': 1}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.models.database import OCRTranslation, TestAnswer, TestSession, UserAttempt, db
+from app.routes.ocr import ocr_bp
+from app.routes.user import user_bp
+from tests.helpers import AppTestCase
+
+
+class TestUserHistory(AppTestCase):
+    blueprints = (ocr_bp, user_bp)
+
+    def add_sessions(self, count, answers_each=3):
+        with self.app.app_context():
+            start = datetime(2025, 1, 1)
+            for i in range(count):
+                session = TestSession(user_id=1, total_score=20, ai_feedback='{"overall": "ok"}',
+                                      started_at=start + timedelta(minutes=i // 2))  # pairs share a timestamp
+                session.test_answers = [
+                    TestAnswer(section='Writing', task_type='Email', combined_question_ids='[1]',
+                               user_inputs='["answer"]', ai_feedback='not json', score=4)
+                    for _ in range(answers_each)
+                ]
+                db.session.add(session)
+            db.session.commit()
+
+    def count_queries(self, url):
+        response, statements = self.run_recording_sql(self.client.get, url, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return len(statements), response.get_json()
+
+    def test_query_count_does_not_grow_with_sessions(self):
+        self.add_sessions(3)
+        few, body = self.count_queries('/api/user/test-sessions?limit=100')
+        self.assertEqual(len(body['test_sessions']), 3)
+
+        self.add_sessions(40)
+        many, body = self.count_queries('/api/user/test-sessions?limit=100')
+        self.assertEqual(len(body['test_sessions']), 43)
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 2)
+
+    def test_cursor_walks_every_session_once(self):
+        self.add_sessions(7)
+        seen, cursor = [], None
+        while True:
+            url = '/api/user/test-sessions?limit=3' + (f'&cursor={cursor}' if cursor else '')
+            body = self.client.get(url, headers=self.headers).get_json()
+            seen += [s['id'] for s in body['test_sessions']]
+            cursor = body['pagination']['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, [7, 6, 5, 4, 3, 2, 1])
+
+    def test_summary_skips_blobs(self):
+        self.add_sessions(1)
+        body = self.client.get('/api/user/test-sessions?summary=1', headers=self.headers).get_json()
+        session = body['test_sessions'][0]
+        self.assertNotIn('feedback', session)
+        self.assertEqual(set(session['test_answers'][0]),
+                         {'id', 'section', 'task_type', 'score', 'created_at'})
+
+        full = self.client.get('/api/user/test-sessions', headers=self.headers).get_json()
+        self.assertEqual(full['test_sessions'][0]['test_answers'][0]['feedback'], {'message': 'not json'})
+
+    def walk(self, url, key):
+        seen, cursor = [], None
+        while True:
+            body = self.client.get(url + (f'&cursor={cursor}' if cursor else ''), headers=self.headers).get_json()
+            seen += [row['id'] for row in body[key]]
+            cursor = body['pagination']['next_cursor']
+            if not cursor:
+                return seen
+
+    def test_ocr_history_and_attempts_use_keyset(self):
+        with self.app.app_context():
+            created = datetime(2025, 1, 1)
+            for i in range(5):
+                db.session.add(OCRTranslation(user_id=1, original_text='x', created_at=created,
+                                              translated_and_explained='{"translation": "t"}'))
+                db.session.add(UserAttempt(user_id=1, question_type='practice', question_id=str(i),
+                                           user_input='a', ai_feedback='{}', score=1, created_at=created))
+            db.session.commit()
+
+        self.assertEqual(self.walk('/api/user/ocr-history?limit=2', 'history'), [5, 4, 3, 2, 1])
+        self.assertEqual(self.walk('/api/user/attempts?limit=2', 'attempts'), [5, 4, 3, 2, 1])
+
+        # A deep page is a range scan from the cursor: no COUNT(*), no skipped rows
+        cursor = self.client.get('/api/user/ocr-history?limit=3', headers=self.headers)\
+            .get_json()['pagination']['next_cursor']
+        with self.app.app_context():
+            executed = []
+            listener = lambda conn, cur, statement, params, *args: executed.append((statement.lower(), params))
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            self.client.get(f'/api/user/ocr-history?limit=2&cursor={cursor}', headers=self.headers)
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        (statement, params), = executed
+        self.assertNotIn('count(', statement)
+        self.assertIn('ocr_translations.created_at <', statement)
+        self.assertEqual(params[-1], 0)  # OFFSET
+
+    def test_ocr_history_legacy_page_keeps_counts(self):
+        with self.app.app_context():
+            for i in range(3):
+                db.session.add(OCRTranslation(user_id=1, original_text='x',
+                                              translated_and_explained='{"translation": "t"}'))
+            db.session.commit()
+        body = self.client.get('/api/user/ocr-history?page=2&per_page=2', headers=self.headers).get_json()
+        self.assertEqual([row['id'] for row in body['history']], [1])
+        self.assertEqual(body['pagination'], {'page': 2, 'per_page': 2, 'total_pages': 2, 'total_items': 3,
+                                              'has_next': False, 'has_prev': True})
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/user/test-sessions?cursor=garbage', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 from app import create_app, db
+from app.models.migrations import backfill_timestamps, dedupe_lesson_progress, ensure_columns, ensure_indexes
 from sqlalchemy import text
 
 app = create_app()
@@ -26,7 +27,25 @@ def update_schema():
                 print(f"test_date might already exist: {e}")
             
             conn.commit()
-            print("Schema update finished.")
+
+        print("Creating missing tables...")
+        db.create_all()
+
+        print("Adding missing columns...")
+        for name in ensure_columns(db.engine):
+            print(f"Added {name}")
+
+        print("Filling missing history timestamps...")
+        for name, rows in backfill_timestamps(db.engine).items():
+            print(f"{name}: {rows} row(s) filled")
+
+        print("Removing duplicate lesson progress rows...")
+        print(f"Deleted {dedupe_lesson_progress(db.session)} duplicate row(s)")
+
+        print("Adding missing indexes...")
+        created = ensure_indexes(db.engine)
+        print(f"Created {len(created)} index(es)")
+        print("Schema update finished.")
 
 if __name__ == "__main__":
     update_schema()
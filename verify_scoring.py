@@ -13,7 +13,7 @@ def test_scoring():
     # Test individual evaluation scaling
     # We'll mock the model.predict to return different scores (0-5)
     import app.ai_models.Alysa.examiner as examiner
-    original_model = examiner.model
+    from unittest.mock import patch
     
     test_cases = [
         (0, 0.0),   # 0/5 * 9 = 0.0
@@ -24,9 +24,10 @@ def test_scoring():
     ]
     
     for predicted, expected in test_cases:
-        examiner.model = MagicMock()
-        examiner.model.predict.return_value = [predicted]
-        result = evaluate("dummy question", "dummy answer")
+        mock_model = MagicMock()
+        mock_model.predict.return_value = [predicted]
+        with patch.object(examiner, "get_examiner_model", return_value=mock_model):
+            result = evaluate("dummy question", "dummy answer")
         actual = result['score']
         print(f"Predicted raw: {predicted} -> Actual IELTS: {actual} (Expected: {expected})")
         assert actual == expected, f"Failed: predicted {predicted}, expected {expected}, actual {actual}"
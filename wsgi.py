@@ -0,0 +1,12 @@
+"""
+WSGI entry point for production servers:
+
+    gunicorn -w 4 -b 0.0.0.0:5000 wsgi:app
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app
+
+app = create_app()